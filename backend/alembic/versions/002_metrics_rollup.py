@@ -0,0 +1,39 @@
+"""Metrics rollup: sessions.updated_at, metrics_daily upsert key, rollup_state
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Existing rows get the migration time, so the first incremental rollup
+    # covers every session written so far
+    op.add_column('sessions',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True)
+    )
+    op.create_index(op.f('ix_sessions_updated_at'), 'sessions', ['updated_at'], unique=False)
+    op.create_index('ix_sessions_institution_started_at', 'sessions', ['institution_id', 'started_at'], unique=False)
+    
+    op.create_unique_constraint('uq_metrics_daily_institution_date', 'metrics_daily', ['institution_id', 'date'])
+    
+    op.create_table('rollup_state',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('high_water_mark', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+def downgrade() -> None:
+    op.drop_table('rollup_state')
+    op.drop_constraint('uq_metrics_daily_institution_date', 'metrics_daily', type_='unique')
+    op.drop_index('ix_sessions_institution_started_at', table_name='sessions')
+    op.drop_index(op.f('ix_sessions_updated_at'), table_name='sessions')
+    op.drop_column('sessions', 'updated_at')
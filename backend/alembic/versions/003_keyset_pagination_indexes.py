@@ -0,0 +1,36 @@
+"""Keyset pagination indexes on users (created_at, id) and sessions (started_at, id)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 15:00:00
+
+"""
+from alembic import op
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # CONCURRENTLY so listings and writes keep running while the indexes build;
+    # it cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_institution_created_at_id', 'users',
+                        ['institution_id', 'created_at', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], postgresql_concurrently=True)
+        # Supersedes (institution_id, started_at): same leading columns, plus
+        # the tie-breaker so pages come straight from the index in order
+        op.create_index('ix_sessions_institution_started_at_id', 'sessions',
+                        ['institution_id', 'started_at', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_sessions_started_at_id', 'sessions', ['started_at', 'id'], postgresql_concurrently=True)
+        op.drop_index('ix_sessions_institution_started_at', table_name='sessions', postgresql_concurrently=True)
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_sessions_institution_started_at', 'sessions',
+                        ['institution_id', 'started_at'], postgresql_concurrently=True)
+        op.drop_index('ix_sessions_started_at_id', table_name='sessions', postgresql_concurrently=True)
+        op.drop_index('ix_sessions_institution_started_at_id', table_name='sessions', postgresql_concurrently=True)
+        op.drop_index('ix_users_created_at_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_institution_created_at_id', table_name='users', postgresql_concurrently=True)
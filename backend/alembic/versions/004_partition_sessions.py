@@ -0,0 +1,130 @@
+"""Partition sessions by month on started_at, with BRIN indexes on time columns
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 18:00:00
+
+The table is rebuilt: the old heap is renamed, a partitioned `sessions` is
+created with one partition per month from the oldest session to
+MONTHS_AHEAD months from now (plus a DEFAULT partition for anything else),
+the rows are copied and the old table is dropped. Plan a maintenance window:
+the copy holds locks on sessions for its whole duration.
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key becomes (id, started_at); ids still come from sessions_id_seq
+and stay unique. started_at becomes NOT NULL (it always had a default).
+Later months are created by app.services.session_partitions.
+"""
+from datetime import date, datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, institution_id, operator_id, started_at, ended_at, updated_at, turns_count, stt_attempts, "
+    "lsp_attempts, lsp_failed_attempts, text_fallback_count, avg_confidence, total_duration_seconds, "
+    "operator_notes"
+)
+
+COLUMN_DEFINITIONS = """
+    id integer NOT NULL DEFAULT nextval('sessions_id_seq'::regclass),
+    institution_id integer NOT NULL REFERENCES institutions(id) ON DELETE CASCADE,
+    operator_id integer REFERENCES users(id) ON DELETE SET NULL,
+    started_at timestamptz NOT NULL DEFAULT now(),
+    ended_at timestamptz,
+    updated_at timestamptz DEFAULT now(),
+    turns_count integer,
+    stt_attempts integer,
+    lsp_attempts integer,
+    lsp_failed_attempts integer,
+    text_fallback_count integer,
+    avg_confidence double precision,
+    total_duration_seconds integer,
+    operator_notes text
+"""
+
+
+def _add_months(month: date, months: int) -> date:
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def _create_indexes() -> None:
+    # Built after the copy (one pass per partition instead of per-row upkeep)
+    op.create_index('ix_sessions_updated_at', 'sessions', ['updated_at'])
+    op.create_index('ix_sessions_institution_started_at_id', 'sessions', ['institution_id', 'started_at', 'id'])
+    op.create_index('ix_sessions_started_at_id', 'sessions', ['started_at', 'id'])
+    # Rows arrive in time order, so block ranges summarize well: a few pages
+    # of BRIN per partition serve range scans of any length
+    op.create_index('ix_sessions_started_at_brin', 'sessions', ['started_at'], postgresql_using='brin')
+    op.create_index('ix_sessions_ended_at_brin', 'sessions', ['ended_at'], postgresql_using='brin')
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.execute("ALTER TABLE sessions RENAME TO sessions_unpartitioned")
+    op.execute("ALTER INDEX sessions_pkey RENAME TO sessions_unpartitioned_pkey")
+    for index in ('ix_sessions_id', 'ix_sessions_updated_at', 'ix_sessions_institution_started_at_id', 'ix_sessions_started_at_id'):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+
+    op.execute(f"""
+        CREATE TABLE sessions ({COLUMN_DEFINITIONS},
+            CONSTRAINT sessions_pkey PRIMARY KEY (id, started_at)
+        ) PARTITION BY RANGE (started_at)
+    """)
+
+    oldest = conn.execute(sa.text("SELECT min(started_at) FROM sessions_unpartitioned")).scalar()
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    month = (oldest.astimezone(timezone.utc).date().replace(day=1) if oldest else current)
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE sessions_p{month:%Y_%m} PARTITION OF sessions "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+    op.execute("CREATE TABLE sessions_default PARTITION OF sessions DEFAULT")
+
+    op.execute(f"""
+        INSERT INTO sessions ({COLUMNS})
+        SELECT id, institution_id, operator_id, COALESCE(started_at, updated_at, now()), ended_at, updated_at,
+               turns_count, stt_attempts, lsp_attempts, lsp_failed_attempts, text_fallback_count,
+               avg_confidence, total_duration_seconds, operator_notes
+        FROM sessions_unpartitioned
+    """)
+    # Keep the sequence when the old table (its owner) is dropped
+    op.execute("ALTER SEQUENCE sessions_id_seq OWNED BY sessions.id")
+    op.execute("DROP TABLE sessions_unpartitioned")
+
+    _create_indexes()
+    op.execute("ANALYZE sessions")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE sessions RENAME TO sessions_partitioned")
+    op.execute("ALTER INDEX sessions_pkey RENAME TO sessions_partitioned_pkey")
+    for index in ('ix_sessions_updated_at', 'ix_sessions_institution_started_at_id', 'ix_sessions_started_at_id',
+                  'ix_sessions_started_at_brin', 'ix_sessions_ended_at_brin'):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+
+    op.execute(f"""
+        CREATE TABLE sessions ({COLUMN_DEFINITIONS},
+            CONSTRAINT sessions_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"INSERT INTO sessions ({COLUMNS}) SELECT {COLUMNS} FROM sessions_partitioned")
+    op.execute("ALTER SEQUENCE sessions_id_seq OWNED BY sessions.id")
+    op.execute("DROP TABLE sessions_partitioned")  # Drops every partition with it
+    op.execute("ALTER TABLE sessions ALTER COLUMN started_at DROP NOT NULL")
+
+    op.create_index(op.f('ix_sessions_id'), 'sessions', ['id'], unique=False)
+    op.create_index('ix_sessions_updated_at', 'sessions', ['updated_at'])
+    op.create_index('ix_sessions_institution_started_at_id', 'sessions', ['institution_id', 'started_at', 'id'])
+    op.create_index('ix_sessions_started_at_id', 'sessions', ['started_at', 'id'])
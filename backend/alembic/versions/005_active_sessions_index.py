@@ -0,0 +1,24 @@
+"""Partial index on active sessions for the timeout sweeper
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Only rows with ended_at IS NULL: a handful per kiosk, whatever the history.
+    # Built on the partitioned parent (CONCURRENTLY is not available there);
+    # each partition is indexed with a brief lock
+    op.create_index('ix_sessions_active_started_at', 'sessions', ['started_at'],
+                    postgresql_where=sa.text('ended_at IS NULL'))
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_active_started_at', table_name='sessions')
@@ -0,0 +1,33 @@
+"""Registry of issued device tokens (revocation by jti)
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Tokens issued before this revision have no row and cannot be revoked by
+    # jti; they lapse at their own expiry
+    op.create_table('device_tokens',
+        sa.Column('jti', sa.String(length=64), nullable=False),
+        sa.Column('institution_id', sa.Integer(), nullable=False),
+        sa.Column('device_id', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['institution_id'], ['institutions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_device_tokens_institution_id'), 'device_tokens', ['institution_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_device_tokens_institution_id'), table_name='device_tokens')
+    op.drop_table('device_tokens')
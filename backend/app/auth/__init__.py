@@ -2,14 +2,35 @@
 Authentication module
 """
 from app.auth.security import verify_password, get_password_hash, validate_password_strength
-from app.auth.jwt import create_access_token, create_refresh_token, decode_token, verify_token_type
+from app.auth.jwt import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    decode_token_of_type,
+    verify_token_type,
+    token_cache
+)
+from app.auth.hashing_pool import PasswordHashingUnavailable, get_hashing_pool
+from app.auth.device_tokens import (
+    DevicePrincipal,
+    create_device_token,
+    verify_device_token,
+    revoke_device_token
+)
+from app.auth.revocation import revoke_token, is_token_revoked
+from app.auth.principal_cache import AuthenticatedPrincipal, principal_cache, invalidate_principal
 from app.auth.middleware import (
     get_current_user,
     get_current_active_user,
+    LSPCaller,
+    get_lsp_caller,
+    rate_limit_lsp,
+    rate_limit_sessions,
     require_role,
     require_admin,
     require_superadmin,
-    verify_institution_access
+    verify_institution_access,
+    institution_scope
 )
 
 __all__ = [
@@ -19,11 +40,29 @@ __all__ = [
     "create_access_token",
     "create_refresh_token",
     "decode_token",
+    "decode_token_of_type",
     "verify_token_type",
+    "token_cache",
+    "PasswordHashingUnavailable",
+    "get_hashing_pool",
+    "DevicePrincipal",
+    "create_device_token",
+    "verify_device_token",
+    "revoke_device_token",
+    "revoke_token",
+    "is_token_revoked",
+    "AuthenticatedPrincipal",
+    "principal_cache",
+    "invalidate_principal",
     "get_current_user",
     "get_current_active_user",
+    "LSPCaller",
+    "get_lsp_caller",
+    "rate_limit_lsp",
+    "rate_limit_sessions",
     "require_role",
     "require_admin",
     "require_superadmin",
     "verify_institution_access",
+    "institution_scope",
 ]
@@ -0,0 +1,94 @@
+"""
+Stateless device tokens for kiosks
+Signed with SECRET_KEY, scoped to one institution and to the LSP routes, and
+verified entirely in memory (no DB access). Issued tokens are recorded in
+device_tokens so an admin can revoke one by jti; revocation goes through the
+shared token revocation list (app.auth.revocation).
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from jose import jwt
+from app.auth.jwt import decode_token_of_type
+from app.auth.revocation import is_token_revoked, revoke_token
+from app.config import settings
+
+DEVICE_TOKEN_TYPE = "device"
+LSP_SCOPE = "lsp"
+
+
+@dataclass(frozen=True)
+class DevicePrincipal:
+    """Caller identified by a device token"""
+    device_id: str
+    institution_id: int
+    jti: str
+    scope: str
+
+
+def create_device_token(
+    institution_id: int,
+    device_id: str,
+    expires_delta: Optional[timedelta] = None
+) -> Tuple[str, str, datetime]:
+    """
+    Create a device token for a kiosk
+    
+    Args:
+        institution_id: Institution the device belongs to
+        device_id: Free-form device identifier (kiosk name, serial...)
+        expires_delta: Optional lifetime (defaults to DEVICE_TOKEN_EXPIRE_DAYS)
+    
+    Returns:
+        (encoded token, jti, expiration datetime in UTC)
+    """
+    expire = datetime.utcnow() + (expires_delta or timedelta(days=settings.DEVICE_TOKEN_EXPIRE_DAYS))
+    jti = uuid.uuid4().hex
+    to_encode = {
+        "type": DEVICE_TOKEN_TYPE,
+        "inst": institution_id,
+        "dev": device_id,
+        "scope": LSP_SCOPE,
+        "jti": jti,
+        "exp": expire,
+    }
+    token = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return token, jti, expire
+
+
+def verify_device_token(token: str, scope: str = LSP_SCOPE) -> Optional[DevicePrincipal]:
+    """
+    Verify a device token in memory
+    
+    Args:
+        token: Encoded token
+        scope: Scope the caller needs
+    
+    Returns:
+        Device principal, or None if the token is invalid, expired, revoked or out of scope
+    """
+    payload = decode_token_of_type(token, DEVICE_TOKEN_TYPE)
+    if not payload or payload.get("scope") != scope:
+        return None
+    jti = payload.get("jti")
+    if not jti or is_token_revoked(jti):
+        return None
+    return DevicePrincipal(
+        device_id=payload.get("dev", ""),
+        institution_id=payload.get("inst"),
+        jti=jti,
+        scope=scope
+    )
+
+
+def revoke_device_token(jti: str, expires_at: datetime):
+    """
+    Revoke a device token in this and every other worker
+    
+    Args:
+        jti: Token id returned when the token was issued
+        expires_at: Token expiration as recorded at issue time (timezone-aware);
+            the revocation lasts until then
+    """
+    revoke_token(jti, expires_at.timestamp())
@@ -0,0 +1,213 @@
+"""
+Bounded process pool for bcrypt
+bcrypt is CPU-bound for ~100-300ms per call; running it in separate processes
+keeps a login storm from stalling unrelated requests in this worker.
+Submissions beyond the pool's queue are rejected instead of piling up.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional
+from app.auth.security import get_password_hash, verify_password
+from app.config import settings
+from app.utils.logger import log_info, log_warning
+from app.utils.metrics import LatencyHistogram, register_stats
+
+
+class PasswordHashingUnavailable(Exception):
+    """Raised when the hashing pool is saturated or a hash did not finish in time"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _hash_many(passwords: List[str]) -> List[str]:
+    return [get_password_hash(p) for p in passwords]
+
+
+class PasswordHashingPool:
+    """Size-limited ProcessPoolExecutor with a bounded queue and per-call timeouts"""
+
+    def __init__(self, workers: int = 2, max_pending: int = 64, timeout: float = 5.0):
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        # hash_many chunks in flight (subset of _slots), see hash_many
+        self._bulk_slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "rejected": 0, "timeouts": 0}
+        self._in_use = 0
+        self.latency = LatencyHistogram()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn: never fork a process that already runs TF and thread pools
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                    log_info(f"Password hashing pool started (workers={self.workers}, max_pending={self.max_pending})")
+        return self._executor
+
+    def _submit(self, fn, *args, wait: bool = False) -> Future:
+        acquired = self._slots.acquire(timeout=self.timeout) if wait else self._slots.acquire(blocking=False)
+        if not acquired:
+            self._count("rejected")
+            raise PasswordHashingUnavailable("queue_full")
+        with self._lock:
+            self._in_use += 1
+            self._counters["submitted"] += 1
+
+        submitted_at = time.monotonic()
+
+        def release(_future):
+            self.latency.observe(time.monotonic() - submitted_at)
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        return future
+
+    def _result(self, future: Future, timeout: Optional[float] = None):
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._count("timeouts")
+            raise PasswordHashingUnavailable("timeout")
+
+    # ------------------------------------------------------------------ #
+    # Blocking API (request threads)
+    # ------------------------------------------------------------------ #
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._result(self._submit(verify_password, plain_password, hashed_password))
+
+    def hash(self, password: str) -> str:
+        return self._result(self._submit(get_password_hash, password))
+
+    def hash_many(self, passwords: List[str], chunk_size: int = 16) -> List[str]:
+        """
+        Hash many passwords spread over all workers (chunks amortize IPC).
+        At most `workers` chunks are in flight across all bulk callers, so an
+        import keeps every worker busy without taking the max_pending slots
+        that logins rely on; it throttles itself on its own chunks instead.
+        """
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        futures = []
+        for chunk in chunks:
+            if not self._bulk_slots.acquire(timeout=self.timeout * chunk_size):
+                self._count("rejected")
+                raise PasswordHashingUnavailable("queue_full")
+            try:
+                future = self._submit(_hash_many, chunk, wait=True)
+            except Exception:
+                self._bulk_slots.release()
+                raise
+            future.add_done_callback(lambda _future: self._bulk_slots.release())
+            futures.append(future)
+        hashes: List[str] = []
+        for future, chunk in zip(futures, chunks):
+            hashes.extend(self._result(future, timeout=self.timeout * len(chunk)))
+        return hashes
+
+    # ------------------------------------------------------------------ #
+    # Async API (event loop)
+    # ------------------------------------------------------------------ #
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        future = self._submit(verify_password, plain_password, hashed_password)
+        return await self._await(future)
+
+    async def hash_async(self, password: str) -> str:
+        future = self._submit(get_password_hash, password)
+        return await self._await(future)
+
+    async def _await(self, future: Future):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise PasswordHashingUnavailable("timeout")
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle / stats
+    # ------------------------------------------------------------------ #
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _count(self, key: str):
+        with self._lock:
+            self._counters[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_use": self._in_use,
+                "latency": self.latency.snapshot(),
+            }
+
+
+class InlineHashing:
+    """Same API, hashing in the calling thread (PASSWORD_HASH_POOL_ENABLED=False)"""
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return verify_password(plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        return get_password_hash(password)
+
+    def hash_many(self, passwords: List[str], chunk_size: int = 16) -> List[str]:
+        return [get_password_hash(p) for p in passwords]
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.to_thread(get_password_hash, password)
+
+    def shutdown(self):
+        pass
+
+
+_pool = None
+
+
+def get_hashing_pool():
+    """Get the process-wide password hashing pool"""
+    global _pool
+    if _pool is None:
+        if settings.PASSWORD_HASH_POOL_ENABLED:
+            _pool = PasswordHashingPool(
+                workers=settings.PASSWORD_HASH_WORKERS,
+                max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+                timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS
+            )
+            register_stats("password_hashing", _pool.stats)
+        else:
+            log_warning("PASSWORD_HASH_POOL_ENABLED=False: bcrypt runs in request threads")
+            _pool = InlineHashing()
+    return _pool
+
+
+def shutdown_hashing_pool():
+    if _pool is not None:
+        _pool.shutdown()
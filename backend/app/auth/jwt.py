@@ -1,10 +1,86 @@
 """
 JWT token creation and validation (FIXED - sub as string)
+Verified tokens are kept in a small LRU so repeated requests with the same
+token skip signature verification until the token's own `exp`.
 """
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.metrics import register_stats
+
+auth_logger = get_logger("auth")
+
+
+class VerifiedTokenCache:
+    """LRU of verified token payloads keyed by SHA-256 of the token"""
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                del self._entries[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        # Callers may mutate the payload; never hand out the cached dict
+        return dict(payload)
+
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if self.max_size <= 0 or exp is None:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), float(exp))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+token_cache = VerifiedTokenCache(max_size=settings.AUTH_TOKEN_CACHE_SIZE)
+register_stats("token_cache", token_cache.stats)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -29,7 +105,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    # jti lets a single token be revoked (logout)
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
@@ -53,7 +130,7 @@ def create_refresh_token(data: dict) -> str:
     
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
@@ -61,7 +138,7 @@ def create_refresh_token(data: dict) -> str:
 
 def decode_token(token: str) -> Optional[dict]:
     """
-    Decode and validate a JWT token
+    Decode and validate a JWT token (served from the verified-token cache when possible)
     
     Args:
         token: JWT token to decode
@@ -69,6 +146,10 @@ def decode_token(token: str) -> Optional[dict]:
     Returns:
         Decoded token payload or None if invalid
     """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         
@@ -76,13 +157,31 @@ def decode_token(token: str) -> Optional[dict]:
         if 'sub' in payload:
             payload['sub'] = int(payload['sub'])
         
+        token_cache.put(token, payload)
         return payload
     except JWTError as e:
-        print(f"❌ JWT Error: {type(e).__name__}: {str(e)}")
+        auth_logger.debug("JWT rejected", extra={"error": type(e).__name__, "reason": str(e)})
         return None
     except Exception as e:
-        print(f"❌ Error: {type(e).__name__}: {str(e)}")
+        auth_logger.warning("Unexpected error decoding JWT", extra={"error": type(e).__name__, "reason": str(e)})
+        return None
+
+
+def decode_token_of_type(token: str, expected_type: str) -> Optional[dict]:
+    """
+    Decode a JWT token and check its type in a single pass
+    
+    Args:
+        token: JWT token to decode
+        expected_type: Expected token type ("access" or "refresh")
+        
+    Returns:
+        Decoded token payload, or None if invalid or of another type
+    """
+    payload = decode_token(token)
+    if not payload or payload.get("type") != expected_type:
         return None
+    return payload
 
 
 def verify_token_type(token: str, expected_type: str) -> bool:
@@ -96,8 +195,4 @@ def verify_token_type(token: str, expected_type: str) -> bool:
     Returns:
         True if token type matches, False otherwise
     """
-    payload = decode_token(token)
-    if not payload:
-        return False
-    
-    return payload.get("type") == expected_type
\ No newline at end of file
+    return decode_token_of_type(token, expected_type) is not None
\ No newline at end of file
@@ -1,38 +1,48 @@
 """
 Authentication and authorization middleware (FIXED VERSION)
 """
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.auth.jwt import decode_token
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.auth.jwt import decode_token_of_type
+from app.auth.device_tokens import DevicePrincipal, verify_device_token
+from app.auth.revocation import is_token_revoked
+from app.config import settings
+from app.auth.principal_cache import AuthenticatedPrincipal, principal_cache
 from app.models.user import User, UserRole
+from app.utils.logger import get_logger
+from app.utils.rate_limiter import limiter
 from typing import Optional
 
+auth_logger = get_logger("auth")
+
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedPrincipal:
     """
     Get current authenticated user from JWT token
     
+    The users row is only read on a principal cache miss, through the async
+    engine so the event loop is never blocked; the session is lazy, so a
+    cache hit never checks out a connection.
+    
     Args:
         credentials: HTTP authorization credentials
-        db: Database session
+        db: Async database session
         
     Returns:
-        Current user object
+        Authenticated principal (id, role, institution_id, is_active)
         
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    print(f"\n{'='*60}")
-    print(f"🔐 MIDDLEWARE: Validando token...")
-    print(f"Token recibido (primeros 50 chars): {credentials.credentials[:50]}...")
-    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -42,53 +52,124 @@ async def get_current_user(
     token = credentials.credentials
     
     # Decode token
-    print(f"🔓 Decodificando token...")
-    payload = decode_token(token)
+    payload = decode_token_of_type(token, "access")
     
-    if payload is None:
-        print(f"❌ ERROR: Token inválido o expirado")
-        print(f"{'='*60}\n")
+    if payload is None or is_token_revoked(payload.get("jti")):
+        auth_logger.debug("Access token rejected (invalid, expired, revoked or wrong type)")
         raise credentials_exception
     
-    print(f"✅ Token decodificado correctamente")
-    print(f"Payload: {payload}")
-    
     # Get user ID from token
     user_id: int = payload.get("sub")
     if user_id is None:
-        print(f"❌ ERROR: No hay user_id en el payload")
-        print(f"{'='*60}\n")
+        auth_logger.debug("Access token without subject")
         raise credentials_exception
     
-    print(f"👤 Buscando usuario ID: {user_id}")
-    
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        print(f"❌ ERROR: Usuario {user_id} no encontrado en la base de datos")
-        print(f"{'='*60}\n")
-        raise credentials_exception
-    
-    print(f"✅ Usuario encontrado: {user.email}")
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        # Get user from database
+        user = await db.get(User, user_id)
+        if user is None:
+            auth_logger.debug("Access token for unknown user", extra={"user_id": user_id})
+            raise credentials_exception
+        
+        principal = AuthenticatedPrincipal.from_user(user)
+        principal_cache.put(principal)
     
     # Check if user is active
-    if not user.is_active:
-        print(f"❌ ERROR: Usuario {user.email} está inactivo")
-        print(f"{'='*60}\n")
+    if not principal.is_active:
+        auth_logger.debug("Inactive user rejected", extra={"user_id": principal.id})
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
     
-    print(f"✅ Usuario activo y autenticado")
-    print(f"{'='*60}\n")
+    return principal
+
+
+@dataclass(frozen=True)
+class LSPCaller:
+    """Caller of an LSP route, verified once per request"""
+    device: Optional[DevicePrincipal] = None  # Kiosk device token
+    user_id: Optional[int] = None  # Staff access token (sub)
+    institution_id: Optional[int] = None  # Claim of the token, if any
+    
+    @property
+    def authenticated(self) -> bool:
+        return self.device is not None or self.user_id is not None
+
+
+ANONYMOUS_LSP_CALLER = LSPCaller()
+
+
+async def get_lsp_caller(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> LSPCaller:
+    """
+    Verify the bearer token of an LSP request once, in memory only (no DB access)
+    
+    Accepts a kiosk device token or a staff access token. Unless
+    LSP_REQUIRE_TOKEN is set, anonymous requests (and invalid tokens) are
+    still allowed as an anonymous caller. FastAPI caches the result per
+    request, so the rate limiter and the route share one verification.
     
-    return user
+    Args:
+        credentials: Optional HTTP authorization credentials
+        
+    Returns:
+        The verified caller (anonymous if there is no valid token)
+        
+    Raises:
+        HTTPException: If a token is required and missing or invalid
+    """
+    token = credentials.credentials if credentials else None
+    caller = ANONYMOUS_LSP_CALLER
+    if token:
+        device = verify_device_token(token)
+        if device is not None:
+            caller = LSPCaller(device=device, institution_id=device.institution_id)
+        else:
+            payload = decode_token_of_type(token, "access")
+            if payload and payload.get("sub") is not None and not is_token_revoked(payload.get("jti")):
+                caller = LSPCaller(user_id=payload["sub"], institution_id=payload.get("inst"))
+    
+    if settings.LSP_REQUIRE_TOKEN and not caller.authenticated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Valid device or access token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return caller
+
+
+async def rate_limit_lsp(request: Request, caller: LSPCaller = Depends(get_lsp_caller)):
+    """
+    Per-caller budget for LSP prediction
+    
+    Kiosks are keyed by device, staff by user and anonymous callers by client
+    address; an institution-wide budget applies on top when configured.
+    
+    Args:
+        request: Incoming request (client address of anonymous callers)
+        caller: Verified caller from get_lsp_caller
+        
+    Raises:
+        HTTPException: 429 if the caller or its institution is over budget
+    """
+    if caller.device is not None:
+        key = f"dev:{caller.device.institution_id}:{caller.device.device_id}"
+    elif caller.user_id is not None:
+        key = f"user:{caller.user_id}"
+    else:
+        key = f"ip:{request.client.host if request.client else 'unknown'}"
+    
+    await limiter.check_async("predict", key)
+    if caller.institution_id is not None:
+        await limiter.check_async("predict_institution", f"inst:{caller.institution_id}")
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthenticatedPrincipal = Depends(get_current_user)
+) -> AuthenticatedPrincipal:
     """
     Get current active user
     
@@ -111,8 +192,8 @@ async def get_current_active_user(
 
 async def require_role(
     required_roles: list[UserRole],
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
+) -> AuthenticatedPrincipal:
     """
     Require user to have specific role(s)
     
@@ -134,7 +215,26 @@ async def require_role(
     return current_user
 
 
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+async def rate_limit_sessions(
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
+) -> AuthenticatedPrincipal:
+    """
+    Per-user budget for session routes
+    
+    Args:
+        current_user: Current active user
+        
+    Returns:
+        Current user if within budget
+        
+    Raises:
+        HTTPException: 429 if the user is over budget
+    """
+    await limiter.check_async("sessions", f"user:{current_user.id}")
+    return current_user
+
+
+def require_admin(current_user: AuthenticatedPrincipal = Depends(get_current_active_user)) -> AuthenticatedPrincipal:
     """
     Require user to be an admin or superadmin
     
@@ -152,7 +252,9 @@ def require_admin(current_user: User = Depends(get_current_active_user)) -> User
     return current_user
 
 
-def require_superadmin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_superadmin(
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
+) -> AuthenticatedPrincipal:
     """
     Require user to be a superadmin
     
@@ -171,7 +273,7 @@ def require_superadmin(current_user: User = Depends(get_current_active_user)) ->
 
 
 def verify_institution_access(
-    user: User,
+    user: AuthenticatedPrincipal,
     institution_id: int,
     allow_superadmin: bool = True
 ) -> bool:
@@ -191,4 +293,31 @@ def verify_institution_access(
         return True
     
     # User must belong to the institution
-    return user.institution_id == institution_id
\ No newline at end of file
+    return user.institution_id == institution_id
+
+
+def institution_scope(user: AuthenticatedPrincipal, institution_id: Optional[int] = None) -> Optional[int]:
+    """
+    Institution a request is confined to
+    
+    Superadmins get the requested institution (None = all institutions);
+    everyone else gets their own, and only their own.
+    
+    Args:
+        user: Caller
+        institution_id: Institution asked for, if any
+        
+    Returns:
+        Institution ID to filter on, or None for all (superadmin only)
+        
+    Raises:
+        HTTPException: 403 if a non-superadmin asks for another institution
+            or has no institution at all
+    """
+    if user.role == UserRole.SUPERADMIN:
+        return institution_id
+    if user.institution_id is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not assigned to an institution")
+    if institution_id is not None and institution_id != user.institution_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return user.institution_id
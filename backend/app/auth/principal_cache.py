@@ -0,0 +1,114 @@
+"""
+Authenticated-principal cache
+Keeps the user fields routes need for authorization (id, role, institution,
+active flag) so most authenticated requests skip the users lookup.
+Entries expire after AUTH_PRINCIPAL_CACHE_TTL_SECONDS and are invalidated on
+user updates, across workers when Redis is configured.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from app.config import settings
+from app.models.user import User, UserRole
+from app.utils.metrics import register_stats
+from app.utils.pubsub import get_broadcaster
+
+INVALIDATE_TOPIC = "principal.invalidate"
+
+
+@dataclass(frozen=True)
+class AuthenticatedPrincipal:
+    """Authorization view of a user, safe to share between requests"""
+    id: int
+    role: UserRole
+    institution_id: Optional[int]
+    is_active: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedPrincipal":
+        return cls(
+            id=user.id,
+            role=user.role,
+            institution_id=user.institution_id,
+            is_active=user.is_active
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU of principals with a per-entry TTL"""
+
+    def __init__(self, max_size: int = 10_000, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[AuthenticatedPrincipal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, user_id: int) -> Optional[AuthenticatedPrincipal]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, principal: AuthenticatedPrincipal):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+            }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
+register_stats("principal_cache", principal_cache.stats)
+
+
+def _on_invalidate(data: dict):
+    user_id = data.get("user_id")
+    if user_id is not None:
+        principal_cache.discard(int(user_id))
+
+
+get_broadcaster().subscribe(INVALIDATE_TOPIC, _on_invalidate)
+
+
+def invalidate_principal(user_id: int):
+    """Drop a user's cached principal in this and every other worker"""
+    get_broadcaster().publish(INVALIDATE_TOPIC, {"user_id": user_id})
@@ -0,0 +1,222 @@
+"""
+Token revocation (logout, device token revocation)
+Revoked token ids (jti) live in an in-process Bloom filter backed by an exact
+set. Most requests carry a token that was never revoked, and the Bloom filter
+answers those with a few bit probes; only possible hits are confirmed against
+the exact set. Entries are dropped once the token would have expired anyway,
+so memory stays bounded by the tokens revoked within one token lifetime.
+Revocations reach every worker through the broadcaster and are persisted in a
+Redis sorted set (score = expiry) when Redis is configured. Revoked device
+tokens are also recorded in the device_tokens registry, which is the source
+of truth: it is loaded at startup and, without Redis (no cross-worker
+broadcast), re-read every AUTH_REVOCATION_REFRESH_SECONDS.
+"""
+import hashlib
+import math
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy import func, select
+from app.config import settings
+from app.database import SessionLocal
+from app.models.device import DeviceToken
+from app.utils.logger import log_info, log_warning
+from app.utils.metrics import register_stats
+from app.utils.periodic import PeriodicTask
+from app.utils.pubsub import get_broadcaster
+from app.utils.redis_client import get_redis
+
+REVOKE_TOPIC = "token.revoke"
+REDIS_REVOKED_KEY = "inclutalk:revoked_tokens"
+
+# How often expired entries are dropped (and the Bloom filter rebuilt)
+PRUNE_INTERVAL_SECONDS = 60.0
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one BLAKE2b digest)"""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(1, capacity)
+        self.num_bits = max(64, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationList:
+    """Bloom filter + exact jti -> expiry (epoch seconds) map"""
+
+    def __init__(self, capacity: int = 100_000, fp_rate: float = 0.001):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self._bloom = BloomFilter(capacity, fp_rate)
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+        self._checks = 0
+        self._bloom_hits = 0
+        self._rejected = 0
+
+    def add(self, jti: str, expires_at: float):
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[jti] = max(expires_at, self._entries.get(jti, 0.0))
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        now = time.time()
+        if now >= self._next_prune:
+            self.prune(now)
+        self._checks += 1
+        if jti not in self._bloom:
+            return False
+        with self._lock:
+            self._bloom_hits += 1
+            exp = self._entries.get(jti)
+            if exp is None or exp <= now:
+                return False
+            self._rejected += 1
+            return True
+
+    def prune(self, now: Optional[float] = None):
+        """Drop expired entries; rebuild the Bloom filter if anything was dropped"""
+        now = now or time.time()
+        with self._lock:
+            self._next_prune = now + PRUNE_INTERVAL_SECONDS
+            expired = [jti for jti, exp in self._entries.items() if exp <= now]
+            if not expired:
+                return
+            for jti in expired:
+                del self._entries[jti]
+            # Readers probe the filter without the lock: build a new one and swap
+            bloom = BloomFilter(self.capacity, self.fp_rate)
+            for jti in self._entries:
+                bloom.add(jti)
+            self._bloom = bloom
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bloom_bits": self._bloom.num_bits,
+                "bloom_hashes": self._bloom.num_hashes,
+                "checks": self._checks,
+                "bloom_hits": self._bloom_hits,
+                "rejected": self._rejected,
+                "false_positives": self._bloom_hits - self._rejected,
+            }
+
+
+revocations = RevocationList(
+    capacity=settings.AUTH_REVOCATION_CAPACITY,
+    fp_rate=settings.AUTH_REVOCATION_FP_RATE
+)
+register_stats("token_revocations", revocations.stats)
+
+
+def _on_revoke(data: dict):
+    jti = data.get("jti")
+    if jti:
+        revocations.add(jti, float(data.get("exp", 0)))
+
+
+get_broadcaster().subscribe(REVOKE_TOPIC, _on_revoke)
+
+
+def revoke_token(jti: str, expires_at: float):
+    """
+    Revoke a token in this and every other worker
+    
+    Args:
+        jti: Token id (the `jti` claim)
+        expires_at: Token expiry as epoch seconds (the `exp` claim)
+    """
+    if not jti or expires_at <= time.time():
+        return
+
+    client = get_redis()
+    if client is not None:
+        try:
+            client.zadd(REDIS_REVOKED_KEY, {jti: expires_at})
+        except Exception as e:
+            log_warning(f"Could not persist token revocation to Redis: {str(e)}")
+
+    get_broadcaster().publish(REVOKE_TOPIC, {"jti": jti, "exp": expires_at})
+
+
+def is_token_revoked(jti: Optional[str]) -> bool:
+    """True if the token id was revoked and the token has not expired yet"""
+    return revocations.is_revoked(jti)
+
+
+def load_registry_revocations() -> int:
+    """
+    Load revoked, unexpired device tokens from the device_tokens registry
+    
+    Returns:
+        Number of revoked tokens read
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(DeviceToken.jti, DeviceToken.expires_at).where(
+                DeviceToken.revoked_at.isnot(None),
+                DeviceToken.expires_at > func.now(),
+            )
+        ).all()
+    finally:
+        db.close()
+    for jti, expires_at in rows:
+        revocations.add(jti, expires_at.timestamp())
+    return len(rows)
+
+
+def load_revocations():
+    """Load persisted revocations (device token registry, Redis) into memory; called at startup"""
+    try:
+        load_registry_revocations()
+    except Exception as e:
+        log_warning(f"Could not load device token revocations from the registry: {str(e)}")
+    
+    client = get_redis()
+    if client is not None:
+        now = time.time()
+        try:
+            client.zremrangebyscore(REDIS_REVOKED_KEY, "-inf", now)
+            for jti, exp in client.zrangebyscore(REDIS_REVOKED_KEY, now, "+inf", withscores=True):
+                revocations.add(jti, exp)
+        except Exception as e:
+            log_warning(f"Could not load token revocations from Redis: {str(e)}")
+    log_info(f"Token revocations loaded ({revocations.stats()['size']} revoked tokens)")
+
+
+_refresh_task = None
+
+
+def get_revocation_refresh_task() -> PeriodicTask:
+    """Re-read the device token registry every AUTH_REVOCATION_REFRESH_SECONDS (workers without Redis)"""
+    global _refresh_task
+    if _refresh_task is None:
+        _refresh_task = PeriodicTask(
+            "token-revocations", settings.AUTH_REVOCATION_REFRESH_SECONDS, load_registry_revocations
+        )
+        register_stats("token_revocation_refresh", _refresh_task.stats)
+    return _refresh_task
@@ -2,7 +2,7 @@
 Application configuration using Pydantic Settings
 """
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 
@@ -11,7 +11,7 @@ class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
     model_config = SettingsConfigDict(
-        env_file=".env",
+        env_file=(".env", "ml_tuning.env"),  # ml_tuning.env is written by scripts/tune_inference.py
         env_file_encoding="utf-8",
         case_sensitive=False
     )
@@ -20,18 +20,35 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 0
+    DATABASE_ASYNC_POOL_SIZE: int = 20  # asyncpg pool, used by event-loop routes
+    DB_QUERY_STATS_HEADERS: bool = False  # Add X-DB-Queries / Server-Timing to responses
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0  # 0 disables the cache
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # Verified JWTs kept in memory; 0 disables
+    DEVICE_TOKEN_EXPIRE_DAYS: int = 365
+    AUTH_REVOCATION_CAPACITY: int = 100000  # Bloom filter sizing (revoked, unexpired tokens)
+    AUTH_REVOCATION_FP_RATE: float = 0.001
+    AUTH_REVOCATION_REFRESH_SECONDS: float = 30.0  # Registry re-read without Redis; 0 disables
+    LSP_REQUIRE_TOKEN: bool = False  # /lsp/* requires a device or access token
+    
+    # Password hashing (bcrypt in a separate process pool)
+    PASSWORD_HASH_POOL_ENABLED: bool = True
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued hashes beyond the workers before 503
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 5.0
     
     # API
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "IncluTalk"
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
+    WEB_CONCURRENCY: int = 1  # uvicorn worker processes
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = '["http://localhost:3000","http://localhost:5173"]'
@@ -58,9 +75,19 @@ class Settings(BaseSettings):
     REDIS_URL: Optional[str] = None
     REDIS_ENABLED: bool = False
     
-    # Rate Limiting
+    # Rate Limiting (token buckets: sustained <per minute>, up to <burst> at once)
     RATE_LIMIT_ENABLED: bool = True
-    RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_PER_MINUTE: int = 60  # Session routes, per user
+    RATE_LIMIT_SESSIONS_BURST: int = 20
+    RATE_LIMIT_PREDICT_PER_MINUTE: int = 120  # /lsp/predict, per device / user / client address
+    RATE_LIMIT_PREDICT_BURST: int = 30
+    RATE_LIMIT_PREDICT_INSTITUTION_PER_MINUTE: int = 0  # /lsp/predict, per institution; 0 disables
+    RATE_LIMIT_PREDICT_INSTITUTION_BURST: int = 200
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10  # /auth/login, per email
+    RATE_LIMIT_LOGIN_BURST: int = 5
+    RATE_LIMIT_LOGIN_IP_PER_MINUTE: int = 30  # /auth/login, per client address (any email)
+    RATE_LIMIT_LOGIN_IP_BURST: int = 15
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 100000  # In-process buckets (no Redis) per worker
     
     # ML
     ML_MODEL_PATH: str = "app/ml/models/lsp_model.h5"
@@ -69,23 +96,91 @@ class Settings(BaseSettings):
     ML_SEQUENCE_LENGTH: int = 30
     ML_FEATURE_DIM: int = 126
     
+    # ML inference admission control
+    ML_INFERENCE_WORKERS: int = 2
+    ML_MAX_QUEUE_DEPTH: int = 64
+    ML_DEFAULT_DEADLINE_MS: int = 3000  # 0 = no deadline unless the client sends one
+    ML_BATCH_MAX_SIZE: int = 8
+    
+    # ML CPU threading (0 = library default)
+    ML_TF_INTRA_OP_THREADS: int = 0
+    ML_TF_INTER_OP_THREADS: int = 0
+    ML_BLAS_THREADS: int = 0
+    
+    # Executors (threads per workload class)
+    EXECUTOR_INFERENCE_WORKERS: int = 4
+    EXECUTOR_PASSWORD_WORKERS: int = 4
+    EXECUTOR_DB_WORKERS: int = 16
+    EXECUTOR_BACKGROUND_WORKERS: int = 2
+    
+    # ML per-institution fair scheduling
+    # JSON: {"<institution_id>": {"weight": 2.0, "min_slots": 1, "max_queue": 64}}
+    ML_TENANT_POLICIES: Dict[str, Dict[str, float]] = {}
+    ML_TENANT_DEFAULT_WEIGHT: float = 1.0
+    ML_TENANT_DEFAULT_MAX_QUEUE: int = 32
+    
+    @field_validator("ML_TENANT_POLICIES", mode="before")
+    @classmethod
+    def parse_tenant_policies(cls, v):
+        if isinstance(v, str):
+            v = v.strip()
+            return json.loads(v) if v else {}
+        return v
+    
     # STT
     WHISPER_MODEL_SIZE: str = "base"
     WHISPER_ENABLED: bool = False
     STT_DEMO_MODE: bool = True
     
+    # Bulk user import
+    USER_IMPORT_MAX_ROWS: int = 5000
+    
     # Session
-    SESSION_TIMEOUT_MINUTES: int = 30
+    SESSION_TIMEOUT_MINUTES: int = 30  # Inactivity after which the sweeper ends a session
+    SESSION_SWEEP_ENABLED: bool = True
+    SESSION_SWEEP_INTERVAL_SECONDS: float = 60.0
+    SESSION_SWEEP_BATCH_SIZE: int = 1000  # Sessions closed per UPDATE (one transaction each)
     MAX_SESSION_TURNS: int = 100
     
     # Privacy
     SAVE_CONVERSATION_TEXT: bool = False
     SAVE_AUDIO_VIDEO: bool = False
     COLLECT_METRICS: bool = True
+    LSP_ATTEMPT_FLUSH_INTERVAL_SECONDS: float = 1.0  # Write-behind of /lsp/predict attempts into sessions
+    LSP_ATTEMPT_BUFFER_MAX_SESSIONS: int = 10000  # Sessions buffered per worker; extra events are dropped
+    
+    # Daily metrics rollup (metrics_daily)
+    METRICS_TIMEZONE: str = "America/Lima"  # Days are cut at local midnight
+    METRICS_ROLLUP_ENABLED: bool = True  # In-process scheduler (one worker at a time runs it)
+    METRICS_ROLLUP_INTERVAL_SECONDS: float = 300.0
+    METRICS_ROLLUP_LAG_SECONDS: float = 120.0  # Writes newer than this wait for the next run
+    SESSION_STATS_CACHE_TTL_SECONDS: float = 5.0  # /sessions/stats results per (institution, range); 0 disables
+    SESSION_EXPORT_BATCH_ROWS: int = 2000  # Rows per server-side cursor fetch (and per streamed chunk)
+    SESSION_PARTITIONS_ENABLED: bool = True  # Create monthly sessions partitions ahead of time (after migration 004)
+    SESSION_PARTITION_MONTHS_AHEAD: int = 3
+    SESSION_PARTITION_CHECK_INTERVAL_SECONDS: float = 21600.0
+    SESSION_RETENTION_DAYS: int = 0  # Delete sessions older than this (0 keeps them forever; metrics_daily is kept)
+    SESSION_RETENTION_CHECK_INTERVAL_SECONDS: float = 86400.0
+    PURGE_CHUNK_SIZE: int = 5000  # Rows per DELETE transaction (retention, institution purge)
+    PURGE_CHUNK_PAUSE_SECONDS: float = 0.05  # Breathing room between chunks for other writers and replicas
     
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "app.log"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_MAX_BYTES: int = 10485760  # Rotate the log file at this size; 0 disables rotation
+    LOG_BACKUP_COUNT: int = 5
+    LOG_QUEUE_SIZE: int = 10000  # Records waiting for the writer thread; extra records are dropped
+    # JSON: {"<logger name prefix>": <fraction of DEBUG records kept>}
+    LOG_SAMPLING: Dict[str, float] = {}
+    
+    @field_validator("LOG_SAMPLING", mode="before")
+    @classmethod
+    def parse_log_sampling(cls, v):
+        if isinstance(v, str):
+            v = v.strip()
+            return json.loads(v) if v else {}
+        return v
     
     # Superadmin
     SUPERADMIN_EMAIL: str = "admin@inclutalk.com"
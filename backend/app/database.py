@@ -1,10 +1,15 @@
 """
 Database configuration and session management
+Sync engine (psycopg2) for scripts, migrations and thread-pool routes, and an
+async engine (asyncpg) for routes that run on the event loop
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.query_stats import instrument_engine
 
 # Create database engine
 engine = create_engine(
@@ -22,6 +27,34 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver switched to asyncpg (postgresql+asyncpg://...)"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Async engine; its pool is separate from the sync one
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_size=settings.DATABASE_ASYNC_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    echo=settings.DEBUG
+)
+
+# expire_on_commit=False: returned ORM objects stay readable after commit
+# without a lazy refresh (which would need an implicit await)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Per-request query counting and timing (app.utils.query_stats)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -36,3 +69,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency to get an async database session
+    Yields an AsyncSession (no connection is checked out until first use)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -4,12 +4,23 @@ B2B SaaS for inclusive attention with LSP (Peruvian Sign Language)
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.config import settings
-from app.utils.rate_limiter import limiter
-from app.utils.logger import log_info
-from app.routers import auth, lsp, sessions
+from app.database import async_engine
+from app.utils.logger import log_info, shutdown_logging
+from app.utils.metrics import collect_stats
+from app.utils.query_stats import begin_request, endpoint_query_stats
+from app.utils.executors import shutdown_executors
+from app.auth.hashing_pool import shutdown_hashing_pool
+from app.auth.revocation import get_revocation_refresh_task, load_revocations
+from app.ml.inference_queue import get_inference_queue
+from app.services.attempt_recorder import get_attempt_recorder
+from app.services.metrics_rollup import get_rollup_task
+from app.services.purge import get_retention_task
+from app.services.session_partitions import get_partition_task
+from app.services.session_sweeper import get_session_sweeper
+from app.routers import auth, devices, lsp, sessions, users
 
 # Create FastAPI app
 app = FastAPI(
@@ -20,10 +31,6 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
-# Add rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # Configure CORS - FIXED VERSION
 # Allow all origins for development (you can restrict this in production)
 app.add_middleware(
@@ -40,10 +47,52 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+class QueryStatsMiddleware:
+    """
+    Count the database statements each request runs, per endpoint
+    
+    Pure ASGI (not @app.middleware("http")): BaseHTTPMiddleware wraps
+    `receive`, which hides client disconnects from request.is_disconnected().
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = begin_request()
+        
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start" and settings.DB_QUERY_STATS_HEADERS:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(stats.count)
+                headers["Server-Timing"] = f"db;dur={stats.elapsed * 1000:.2f};desc=\"{stats.count} queries\""
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+        
+        # Routing stores the matched route in the (shared) scope
+        route = scope.get("route")
+        endpoint = scope.get("endpoint")
+        if route is not None:
+            label = f"{scope['method']} {route.path}"
+        elif endpoint is not None:
+            label = f"{scope['method']} {endpoint.__name__}"
+        else:
+            label = "unmatched"
+        endpoint_query_stats.observe(label, stats)
+
+app.add_middleware(QueryStatsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(lsp.router, prefix=settings.API_V1_PREFIX)
 app.include_router(sessions.router, prefix=settings.API_V1_PREFIX)
+app.include_router(devices.router, prefix=settings.API_V1_PREFIX)
+app.include_router(users.router, prefix=settings.API_V1_PREFIX)
 
 @app.get("/")
 def root():
@@ -63,6 +112,15 @@ def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics (queues, caches, executors)"""
+    return collect_stats()
+
+def _revocation_refresh_enabled() -> bool:
+    redis_configured = settings.REDIS_ENABLED and settings.REDIS_URL
+    return not redis_configured and settings.AUTH_REVOCATION_REFRESH_SECONDS > 0
+
 @app.on_event("startup")
 async def startup_event():
     """Startup event"""
@@ -71,7 +129,52 @@ async def startup_event():
     log_info(f"ML Demo Mode: {settings.ML_DEMO_MODE}")
     log_info(f"STT Demo Mode: {settings.STT_DEMO_MODE}")
     log_info("CORS enabled for: http://localhost:3000, http://localhost:5173")
+    load_revocations()
+    if _revocation_refresh_enabled():
+        # Without Redis, revocations made by other workers only reach this one via the registry
+        get_revocation_refresh_task().start()
+    get_inference_queue().start()
+    if settings.COLLECT_METRICS:
+        get_attempt_recorder().start()
+    if settings.METRICS_ROLLUP_ENABLED:
+        get_rollup_task().start()
+    if settings.SESSION_PARTITIONS_ENABLED:
+        # Long interval: check once at startup too, so restarts never postpone it
+        get_partition_task().start(run_now=True)
+    if settings.SESSION_SWEEP_ENABLED:
+        get_session_sweeper().task.start()
+    if settings.SESSION_RETENTION_DAYS > 0:
+        get_retention_task().start(run_now=True)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Shutdown event"""
+    await get_inference_queue().stop()
+    if settings.COLLECT_METRICS:
+        # Final flush of buffered LSP attempts, before the engines go away
+        get_attempt_recorder().stop()
+    if settings.METRICS_ROLLUP_ENABLED:
+        get_rollup_task().stop(run_final=False)
+    if settings.SESSION_PARTITIONS_ENABLED:
+        get_partition_task().stop(run_final=False)
+    if settings.SESSION_SWEEP_ENABLED:
+        get_session_sweeper().task.stop(run_final=False)
+    if settings.SESSION_RETENTION_DAYS > 0:
+        get_retention_task().stop(run_final=False)
+    if _revocation_refresh_enabled():
+        get_revocation_refresh_task().stop(run_final=False)
+    shutdown_executors()
+    shutdown_hashing_pool()
+    await async_engine.dispose()
+    log_info("IncluTalk API stopped")
+    shutdown_logging()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=settings.DEBUG)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=settings.DEBUG,
+        workers=None if settings.DEBUG else settings.WEB_CONCURRENCY
+    )
\ No newline at end of file
@@ -7,7 +7,8 @@ from app.ml.feature_extraction import (
     FEATURE_DIM
 )
 from app.ml.model import get_model, LSPModel
-from app.ml.predict import predict_lsp_sequence, get_available_vocabulary
+from app.ml.inference_queue import get_inference_queue, AdmissionRejected
+from app.ml.predict import predict_lsp_sequence, predict_lsp_sequence_queued, get_available_vocabulary
 
 __all__ = [
     "extract_frame_features",
@@ -15,6 +16,9 @@ __all__ = [
     "FEATURE_DIM",
     "get_model",
     "LSPModel",
+    "get_inference_queue",
+    "AdmissionRejected",
     "predict_lsp_sequence",
+    "predict_lsp_sequence_queued",
     "get_available_vocabulary",
 ]
@@ -0,0 +1,494 @@
+"""
+Admission control and fair queueing in front of the LSP model
+- Bounds how many predictions can wait for the model (globally and per institution)
+- Sheds requests whose deadline cannot be met (fast 503 instead of slow 200)
+- Drops requests whose deadline expired while they were queued
+- Shares model capacity across institutions with weighted fair queueing
+- Groups queued predictions into batches that may mix institutions
+- Removes predictions whose client disconnected before they reach the model
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.ml.model import get_model
+from app.utils.executors import Workload, run_in
+from app.utils.logger import log_info, log_error
+from app.utils.metrics import LatencyHistogram, register_stats
+
+
+class AdmissionRejected(Exception):
+    """Raised when a prediction is shed instead of being run"""
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, int(math.ceil(self.retry_after))))
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before its prediction was run"""
+
+
+# Poll interval while a queued job watches for client disconnect
+DISCONNECT_POLL_SECONDS = 0.05
+
+
+@dataclass
+class TenantPolicy:
+    """Scheduling policy for one institution"""
+    weight: float = 1.0
+    min_slots: int = 0  # Batch slots guaranteed while the tenant has work queued
+    max_queue: int = 32
+
+
+@dataclass(eq=False)
+class InferenceJob:
+    """A single prediction waiting for the model"""
+    features: np.ndarray
+    deadline: Optional[float]  # time.monotonic() based, None = no deadline
+    enqueued_at: float
+    future: asyncio.Future
+    tenant: Optional[int] = None
+    finish_tag: float = 0.0
+    cancelled: bool = False  # Plain flag so executor threads can read it
+
+    def expired(self, now: float) -> bool:
+        return self.deadline is not None and now >= self.deadline
+
+
+@dataclass
+class TenantQueue:
+    """Pending jobs and stats for one institution"""
+    tenant: Optional[int]
+    policy: TenantPolicy
+    jobs: Deque[InferenceJob] = field(default_factory=deque)
+    last_finish: float = 0.0
+    counters: Dict[str, int] = field(default_factory=lambda: {
+        "admitted": 0,
+        "completed": 0,
+        "shed": 0,
+        "expired_in_queue": 0,
+    })
+    queue_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def label(self) -> str:
+        return str(self.tenant) if self.tenant is not None else "unattributed"
+
+    def head_tag(self) -> float:
+        return self.jobs[0].finish_tag
+
+
+def _policy_from_settings(tenant: Optional[int]) -> TenantPolicy:
+    raw = settings.ML_TENANT_POLICIES.get(str(tenant), {}) if tenant is not None else {}
+    return TenantPolicy(
+        weight=max(float(raw.get("weight", settings.ML_TENANT_DEFAULT_WEIGHT)), 1e-6),
+        min_slots=int(raw.get("min_slots", 0)),
+        max_queue=int(raw.get("max_queue", settings.ML_TENANT_DEFAULT_MAX_QUEUE)),
+    )
+
+
+class InferenceQueue:
+    """Queue-depth and latency aware, per-institution fair gate in front of LSPModel"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue_depth: int = 64,
+        max_batch_size: int = 8,
+        initial_service_time: float = 0.05,
+        ewma_alpha: float = 0.2,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue_depth = max(1, max_queue_depth)
+        self.max_batch_size = max(1, max_batch_size)
+        self.ewma_alpha = ewma_alpha
+
+        self._tenants: Dict[Optional[int], TenantQueue] = {}
+        self._pending = 0
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._service_time = initial_service_time  # EWMA seconds per batch
+        self._has_work: Optional[asyncio.Event] = None
+        self._tasks: list = []
+        self._lock = threading.Lock()
+
+        self._counters: Dict[str, int] = {
+            "admitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "batches": 0,
+            "shed_queue_full": 0,
+            "shed_tenant_queue_full": 0,
+            "shed_deadline": 0,
+            "expired_in_queue": 0,
+            "cancelled_in_queue": 0,
+            "cancelled_in_batch": 0,
+            "wasted_after_disconnect": 0,
+            "model_ms_saved": 0,
+        }
+        self.queue_time = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Start dispatcher workers on the running event loop"""
+        if self.running:
+            return
+        self._has_work = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"lsp-inference-{i}")
+            for i in range(self.workers)
+        ]
+        log_info(
+            f"Inference queue started (workers={self.workers}, max_depth={self.max_queue_depth}, "
+            f"max_batch={self.max_batch_size})"
+        )
+
+    async def stop(self):
+        """Stop workers and fail whatever is still queued"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+        for tq in self._tenants.values():
+            while tq.jobs:
+                job = tq.jobs.popleft()
+                if not job.future.done():
+                    job.future.set_exception(AdmissionRejected("shutting_down", retry_after=1.0))
+        self._pending = 0
+
+    # ------------------------------------------------------------------ #
+    # Tenants
+    # ------------------------------------------------------------------ #
+    def _tenant_queue(self, tenant: Optional[int]) -> TenantQueue:
+        tq = self._tenants.get(tenant)
+        if tq is None:
+            tq = TenantQueue(tenant=tenant, policy=_policy_from_settings(tenant))
+            self._tenants[tenant] = tq
+        return tq
+
+    def _backlogged(self) -> List[TenantQueue]:
+        return [tq for tq in self._tenants.values() if tq.jobs]
+
+    # ------------------------------------------------------------------ #
+    # Admission
+    # ------------------------------------------------------------------ #
+    def estimated_wait(self, tq: Optional[TenantQueue] = None) -> float:
+        """
+        Estimated seconds before a newly queued job starts running.
+        With a tenant, only the work scheduled ahead of it under its fair share counts.
+        """
+        ahead = self._pending + self._in_flight
+        if tq is not None:
+            active_weight = sum(t.policy.weight for t in self._backlogged() if t is not tq) + tq.policy.weight
+            share = tq.policy.weight / active_weight
+            ahead = min(ahead, (len(tq.jobs) + 1) / share + self._in_flight)
+
+        rounds = ahead / (self.workers * self.max_batch_size)
+        return rounds * self._service_time
+
+    def _admit(self, tq: TenantQueue, deadline: Optional[float], now: float):
+        if self._pending >= self.max_queue_depth:
+            self._count("shed_queue_full")
+            tq.counters["shed"] += 1
+            raise AdmissionRejected("queue_full", retry_after=self.estimated_wait())
+
+        if len(tq.jobs) >= tq.policy.max_queue:
+            self._count("shed_tenant_queue_full")
+            tq.counters["shed"] += 1
+            raise AdmissionRejected("tenant_queue_full", retry_after=self.estimated_wait(tq))
+
+        if deadline is not None:
+            wait = self.estimated_wait(tq)
+            if now + wait + self._service_time > deadline:
+                self._count("shed_deadline")
+                tq.counters["shed"] += 1
+                raise AdmissionRejected("deadline_unreachable", retry_after=wait)
+
+    async def submit(
+        self,
+        features: np.ndarray,
+        deadline: Optional[float] = None,
+        tenant: Optional[int] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+    ) -> Dict:
+        """
+        Queue features for prediction and wait for the result
+
+        Args:
+            features: Feature sequence (sequence_length, feature_dim)
+            deadline: Absolute time.monotonic() deadline, or None
+            tenant: Institution ID the request is attributed to, or None
+            is_disconnected: Async check polled while queued; the job is withdrawn when it returns True
+
+        Returns:
+            Raw LSPModel.predict result
+
+        Raises:
+            AdmissionRejected: If the request was shed or expired in the queue
+            ClientDisconnected: If the client went away while the job was pending
+        """
+        if not self.running:
+            self.start()
+
+        now = time.monotonic()
+        tq = self._tenant_queue(tenant)
+        self._admit(tq, deadline, now)
+
+        # Weighted fair queueing: heavier weights advance their virtual clock slower
+        finish_tag = max(self._virtual_time, tq.last_finish) + 1.0 / tq.policy.weight
+        tq.last_finish = finish_tag
+
+        job = InferenceJob(
+            features=features,
+            deadline=deadline,
+            enqueued_at=now,
+            future=asyncio.get_running_loop().create_future(),
+            tenant=tenant,
+            finish_tag=finish_tag,
+        )
+        tq.jobs.append(job)
+        tq.counters["admitted"] += 1
+        self._pending += 1
+        self._count("admitted")
+        self._has_work.set()
+
+        watcher = None
+        if is_disconnected is not None:
+            watcher = asyncio.create_task(self._watch_disconnect(job, is_disconnected))
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            self.cancel(job)
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    # ------------------------------------------------------------------ #
+    # Cancellation
+    # ------------------------------------------------------------------ #
+    async def _watch_disconnect(self, job: InferenceJob, is_disconnected: Callable[[], Awaitable[bool]]):
+        while not job.future.done():
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+            if await is_disconnected():
+                self.cancel(job)
+                return
+
+    def cancel(self, job: InferenceJob):
+        """Withdraw a job: drop it from its queue, or mark it so a formed batch skips it"""
+        if job.cancelled or job.future.done():
+            return
+        job.cancelled = True
+
+        # If it already left the queue, the batch runner skips it unless the model has started
+        tq = self._tenants.get(job.tenant)
+        if tq is not None and job in tq.jobs:
+            tq.jobs.remove(job)
+            self._pending -= 1
+            self._count("cancelled_in_queue")
+            self._count("model_ms_saved", self._per_job_ms())
+
+        job.future.set_exception(ClientDisconnected())
+
+    def _per_job_ms(self) -> int:
+        return int(self._service_time * 1000 / self.max_batch_size)
+
+    # ------------------------------------------------------------------ #
+    # Dispatch
+    # ------------------------------------------------------------------ #
+    def _pop_live(self, tq: TenantQueue, now: float) -> Optional[InferenceJob]:
+        """Pop the tenant's head job; return None if it is already done or expired"""
+        job = tq.jobs.popleft()
+        self._pending -= 1
+        if job.cancelled or job.future.done():
+            return None
+
+        waited = now - job.enqueued_at
+        self.queue_time.observe(waited)
+        tq.queue_time.observe(waited)
+
+        if job.expired(now):
+            self._count("expired_in_queue")
+            tq.counters["expired_in_queue"] += 1
+            job.future.set_exception(AdmissionRejected("deadline_expired", retry_after=self.estimated_wait(tq)))
+            return None
+
+        self._virtual_time = max(self._virtual_time, job.finish_tag)
+        return job
+
+    def _take_batch(self) -> List[InferenceJob]:
+        """Build the next batch: guaranteed slots first, then smallest finish tag"""
+        now = time.monotonic()
+        batch: List[InferenceJob] = []
+
+        for tq in sorted(self._backlogged(), key=TenantQueue.head_tag):
+            taken = 0
+            while tq.jobs and taken < tq.policy.min_slots and len(batch) < self.max_batch_size:
+                job = self._pop_live(tq, now)
+                if job is not None:
+                    batch.append(job)
+                    taken += 1
+
+        while len(batch) < self.max_batch_size:
+            backlogged = self._backlogged()
+            if not backlogged:
+                break
+            tq = min(backlogged, key=TenantQueue.head_tag)
+            job = self._pop_live(tq, now)
+            if job is not None:
+                batch.append(job)
+
+        return batch
+
+    async def _next_batch(self) -> List[InferenceJob]:
+        while self._pending == 0:
+            self._has_work.clear()
+            await self._has_work.wait()
+        return self._take_batch()
+
+    async def _worker(self):
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                continue
+
+            self._in_flight += len(batch)
+            started = time.monotonic()
+            try:
+                ran = await run_in(Workload.INFERENCE, self._run_batch, batch)
+            except Exception as e:
+                self._count("failed", len(batch))
+                log_error(f"Inference worker error: {str(e)}", exc_info=True)
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                continue
+            finally:
+                self._in_flight -= len(batch)
+
+            if not ran:
+                continue
+            self._observe_service_time(time.monotonic() - started)
+
+            self._count("batches")
+            finished = time.monotonic()
+            for job, result in ran:
+                if job.cancelled:
+                    # Client left while the model was already running on it:
+                    # wasted work, not a completion
+                    self._count("wasted_after_disconnect")
+                    continue
+                self._count("completed")
+                tq = self._tenants[job.tenant]
+                tq.counters["completed"] += 1
+                tq.latency.observe(finished - job.enqueued_at)
+                if not job.future.done():
+                    job.future.set_result(result)
+
+    def _run_batch(self, batch: List[InferenceJob]) -> List[Tuple[InferenceJob, Dict]]:
+        """Executor side: skip jobs cancelled while waiting for a thread, then predict the rest"""
+        live = [job for job in batch if not job.cancelled]
+        skipped = len(batch) - len(live)
+        if skipped:
+            self._count("cancelled_in_batch", skipped)
+            self._count("model_ms_saved", skipped * self._per_job_ms())
+        if not live:
+            return []
+
+        model = get_model()
+        features = np.stack([job.features for job in live])
+        results = model.predict_batch(features, 3)
+        return list(zip(live, results))
+
+    def _observe_service_time(self, elapsed: float):
+        self.service_time.observe(elapsed)
+        self._service_time = (1 - self.ewma_alpha) * self._service_time + self.ewma_alpha * elapsed
+
+    # ------------------------------------------------------------------ #
+    # Stats
+    # ------------------------------------------------------------------ #
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self._counters[key] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        tenants = {
+            tq.label: {
+                **tq.counters,
+                "queue_depth": len(tq.jobs),
+                "weight": tq.policy.weight,
+                "min_slots": tq.policy.min_slots,
+                "max_queue": tq.policy.max_queue,
+                "queue_time": tq.queue_time.snapshot(),
+                "latency": tq.latency.snapshot(),
+            }
+            for tq in list(self._tenants.values())
+        }
+        return {
+            **counters,
+            "queue_depth": self._pending,
+            "in_flight": self._in_flight,
+            "workers": self.workers,
+            "max_queue_depth": self.max_queue_depth,
+            "max_batch_size": self.max_batch_size,
+            "ewma_batch_service_ms": round(self._service_time * 1000, 3),
+            "estimated_wait_ms": round(self.estimated_wait() * 1000, 3),
+            "queue_time": self.queue_time.snapshot(),
+            "service_time": self.service_time.snapshot(),
+            "tenants": tenants,
+        }
+
+
+def deadline_from_budget(budget_ms: Optional[int]) -> Optional[float]:
+    """
+    Convert a relative deadline budget (ms) into an absolute monotonic deadline.
+    Falls back to ML_DEFAULT_DEADLINE_MS; 0 or negative means no deadline.
+    """
+    if budget_ms is None:
+        budget_ms = settings.ML_DEFAULT_DEADLINE_MS
+    if budget_ms <= 0:
+        return None
+    return time.monotonic() + budget_ms / 1000.0
+
+
+_queue_instance: Optional[InferenceQueue] = None
+
+
+def get_inference_queue() -> InferenceQueue:
+    global _queue_instance
+    if _queue_instance is None:
+        _queue_instance = InferenceQueue(
+            workers=settings.ML_INFERENCE_WORKERS,
+            max_queue_depth=settings.ML_MAX_QUEUE_DEPTH,
+            max_batch_size=settings.ML_BATCH_MAX_SIZE,
+        )
+        register_stats("lsp_inference", _queue_instance.stats)
+    return _queue_instance
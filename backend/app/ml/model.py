@@ -2,6 +2,7 @@
 LSTM Model loader and manager (LSP)
 - Loads model from settings.ML_MODEL_PATH
 - Loads vocabulary from etiquetas.json (your trained classes)
+- Applies the CPU threading configuration (see scripts/tune_inference.py) before loading
 """
 
 import os
@@ -20,6 +21,12 @@ except ImportError:
     TENSORFLOW_AVAILABLE = False
     log_warning("TensorFlow not available. Predictions will run in fallback mode.")
 
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
 
 class LSPModel:
     """LSTM Model for LSP (Lengua de Señas Peruana) recognition"""
@@ -31,6 +38,7 @@ class LSPModel:
 
         # Only load the keras model if allowed and TF exists
         if not settings.ML_DEMO_MODE and TENSORFLOW_AVAILABLE:
+            self._apply_threading()
             self._load_model()
         else:
             # If demo mode is ON, keep behavior safe: vocabulary still your 10 words
@@ -83,6 +91,30 @@ class LSPModel:
             log_error(f"Error reading labels file: {e}", exc_info=True)
             return ["UNKNOWN"]
 
+    def _apply_threading(self):
+        """
+        Apply ML_TF_INTRA_OP_THREADS / ML_TF_INTER_OP_THREADS / ML_BLAS_THREADS.
+        0 keeps the library default. TF only accepts this before its runtime starts.
+        """
+        intra = settings.ML_TF_INTRA_OP_THREADS
+        inter = settings.ML_TF_INTER_OP_THREADS
+        try:
+            if intra > 0:
+                tf.config.threading.set_intra_op_parallelism_threads(intra)
+            if inter > 0:
+                tf.config.threading.set_inter_op_parallelism_threads(inter)
+        except RuntimeError as e:
+            log_warning(f"Could not apply TensorFlow thread settings (runtime already initialized): {e}")
+
+        blas = settings.ML_BLAS_THREADS
+        if blas > 0:
+            if THREADPOOLCTL_AVAILABLE:
+                threadpool_limits(limits=blas, user_api="blas")
+            else:
+                log_warning("threadpoolctl not installed; ML_BLAS_THREADS only applies via OMP_NUM_THREADS at startup.")
+
+        log_info(f"ML threading: intra_op={intra or 'default'}, inter_op={inter or 'default'}, blas={blas or 'default'}")
+
     def _load_model(self):
         model_path = settings.ML_MODEL_PATH
 
@@ -118,34 +150,45 @@ class LSPModel:
         returns:
           { label, confidence, alternatives }
         """
+        return self.predict_batch(np.expand_dims(sequence, axis=0), return_top_k=return_top_k)[0]
+
+    def predict_batch(self, sequences: np.ndarray, return_top_k: int = 3) -> List[Dict]:
+        """
+        Predict a batch of feature sequences in a single model call.
+
+        sequences: (batch, sequence_length, feature_dim)
+        returns:
+          one { label, confidence, alternatives } per sequence, in input order
+        """
+        batch_size = len(sequences)
+
         # Safe fallback (NO random words)
         if settings.ML_DEMO_MODE or (not self.is_loaded) or (self.model is None):
-            return self._predict_fallback(return_top_k=return_top_k)
+            return [self._predict_fallback(return_top_k=return_top_k) for _ in range(batch_size)]
 
         try:
-            sequence_batch = np.expand_dims(sequence, axis=0)  # (1, T, D)
-            predictions = self.model.predict(sequence_batch, verbose=0)[0]  # (C,)
+            predictions = self.model.predict(sequences, verbose=0)  # (B, C)
 
             vocab_no_unknown = [w for w in self.vocabulary if w != "UNKNOWN"]
 
             # Guard if mismatch
-            c = min(len(predictions), len(vocab_no_unknown))
-            preds = predictions[:c]
+            c = min(predictions.shape[-1], len(vocab_no_unknown))
             vocab_used = vocab_no_unknown[:c]
 
-            top_k_indices = np.argsort(preds)[-return_top_k:][::-1]
-
-            results = [{"label": vocab_used[idx], "confidence": float(preds[idx])} for idx in top_k_indices]
-
-            return {
-                "label": results[0]["label"],
-                "confidence": results[0]["confidence"],
-                "alternatives": results[1:] if len(results) > 1 else []
-            }
+            outputs = []
+            for preds in predictions[:, :c]:
+                top_k_indices = np.argsort(preds)[-return_top_k:][::-1]
+                results = [{"label": vocab_used[idx], "confidence": float(preds[idx])} for idx in top_k_indices]
+                outputs.append({
+                    "label": results[0]["label"],
+                    "confidence": results[0]["confidence"],
+                    "alternatives": results[1:] if len(results) > 1 else []
+                })
+            return outputs
 
         except Exception as e:
             log_error(f"Error during prediction: {str(e)}", exc_info=True)
-            return self._predict_fallback(return_top_k=return_top_k)
+            return [self._predict_fallback(return_top_k=return_top_k) for _ in range(batch_size)]
 
     def _predict_fallback(self, return_top_k: int = 3) -> Dict:
         """
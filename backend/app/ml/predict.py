@@ -2,35 +2,66 @@
 LSP Prediction service
 Coordinates feature extraction and model prediction
 """
-from typing import Dict, List
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
+import numpy as np
 from app.schemas.lsp import LSPSequence, LSPPrediction, LSPFrame
 from app.ml.feature_extraction import extract_sequence_features
 from app.ml.model import get_model
+from app.ml.inference_queue import get_inference_queue, ClientDisconnected
 from app.config import settings
+from app.utils.executors import Workload, run_in
 from app.utils.logger import log_info, log_debug
+from app.utils.metrics import register_stats
 
+# Work skipped because the client disconnected, per pipeline stage
+_cancellations = {
+    "before_extract": 0,
+    "before_queue": 0,
+}
+_cancellations_lock = threading.Lock()
 
-def predict_lsp_sequence(sequence: LSPSequence) -> LSPPrediction:
+
+def _count_cancellation(stage: str):
+    with _cancellations_lock:
+        _cancellations[stage] += 1
+
+
+def _pipeline_stats() -> dict:
+    with _cancellations_lock:
+        return {"cancelled": dict(_cancellations)}
+
+
+register_stats("lsp_pipeline", _pipeline_stats)
+
+
+def extract_features(sequence: LSPSequence) -> np.ndarray:
     """
-    Predict LSP word from a sequence of frames
+    Extract the model input features from a sequence
     
     Args:
         sequence: LSPSequence with frames and keypoints
         
     Returns:
-        LSPPrediction with label, confidence, and alternatives
+        Feature array (sequence_length, feature_dim)
     """
-    # Extract features from sequence
     log_debug(f"Extracting features from {len(sequence.frames)} frames")
-    feature_sequence = extract_sequence_features(
+    return extract_sequence_features(
         sequence.frames,
         sequence_length=settings.ML_SEQUENCE_LENGTH
     )
+
+
+def build_prediction(prediction_result: Dict) -> LSPPrediction:
+    """
+    Apply the confidence threshold to a raw model result
     
-    # Get model and predict
-    model = get_model()
-    prediction_result = model.predict(feature_sequence, return_top_k=3)
-    
+    Args:
+        prediction_result: Raw result from LSPModel.predict
+        
+    Returns:
+        LSPPrediction with label, confidence, and alternatives
+    """
     # Extract results
     label = prediction_result["label"]
     confidence = prediction_result["confidence"]
@@ -55,6 +86,67 @@ def predict_lsp_sequence(sequence: LSPSequence) -> LSPPrediction:
     )
 
 
+def predict_lsp_sequence(sequence: LSPSequence) -> LSPPrediction:
+    """
+    Predict LSP word from a sequence of frames
+    
+    Args:
+        sequence: LSPSequence with frames and keypoints
+        
+    Returns:
+        LSPPrediction with label, confidence, and alternatives
+    """
+    feature_sequence = extract_features(sequence)
+    
+    # Get model and predict
+    model = get_model()
+    prediction_result = model.predict(feature_sequence, return_top_k=3)
+    
+    return build_prediction(prediction_result)
+
+
+async def predict_lsp_sequence_queued(
+    sequence: LSPSequence,
+    deadline: Optional[float] = None,
+    institution_id: Optional[int] = None,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+) -> LSPPrediction:
+    """
+    Predict LSP word going through the inference admission queue
+    
+    Args:
+        sequence: LSPSequence with frames and keypoints
+        deadline: Absolute time.monotonic() deadline, or None
+        institution_id: Institution the request is scheduled under, or None
+        is_disconnected: Async client-disconnect check, run between pipeline stages
+        
+    Returns:
+        LSPPrediction with label, confidence, and alternatives
+        
+    Raises:
+        AdmissionRejected: If the request is shed or its deadline expires
+        ClientDisconnected: If the client went away before the model ran
+    """
+    if is_disconnected is not None and await is_disconnected():
+        _count_cancellation("before_extract")
+        raise ClientDisconnected()
+    
+    feature_sequence = await run_in(Workload.INFERENCE, extract_features, sequence)
+    
+    if is_disconnected is not None and await is_disconnected():
+        _count_cancellation("before_queue")
+        raise ClientDisconnected()
+    
+    prediction_result = await get_inference_queue().submit(
+        feature_sequence,
+        deadline=deadline,
+        tenant=institution_id,
+        is_disconnected=is_disconnected
+    )
+    
+    return build_prediction(prediction_result)
+
+
 def get_available_vocabulary() -> List[str]:
     """
     Get list of available LSP words
@@ -0,0 +1,75 @@
+"""
+Institution attribution for LSP predictions
+Resolves which institution a prediction belongs to from the verified caller
+(kiosk device token or staff access token, see get_lsp_caller).
+LSPSequence.session_id -> Session.institution_id is only used for
+authenticated callers whose token carries no institution (superadmins);
+an anonymous caller could otherwise
+pick another institution's WFQ weight by sending one of its session ids.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from sqlalchemy import select
+from app.auth.middleware import LSPCaller
+from app.database import AsyncSessionLocal
+from app.models.session import Session as SessionModel
+from app.schemas.lsp import LSPSequence
+
+# session_id -> institution_id (a session never changes institution)
+_SESSION_CACHE_SIZE = 10_000
+_session_institutions: "OrderedDict[int, int]" = OrderedDict()
+# session_id -> monotonic time until which it is known not to exist
+_MISS_TTL_SECONDS = 30.0
+_missing_sessions: "OrderedDict[int, float]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+async def institution_from_session(session_id: int) -> Optional[int]:
+    """Institution of a session (cached, misses for _MISS_TTL_SECONDS), or None if it does not exist"""
+    now = time.monotonic()
+    with _cache_lock:
+        if session_id in _session_institutions:
+            _session_institutions.move_to_end(session_id)
+            return _session_institutions[session_id]
+        if _missing_sessions.get(session_id, 0.0) > now:
+            return None
+
+    async with AsyncSessionLocal() as db:
+        institution_id = (await db.execute(
+            select(SessionModel.institution_id).where(SessionModel.id == session_id)
+        )).scalar_one_or_none()
+
+    with _cache_lock:
+        if institution_id is None:
+            _missing_sessions[session_id] = now + _MISS_TTL_SECONDS
+            _missing_sessions.move_to_end(session_id)
+            if len(_missing_sessions) > _SESSION_CACHE_SIZE:
+                _missing_sessions.popitem(last=False)
+            return None
+        _missing_sessions.pop(session_id, None)
+        _session_institutions[session_id] = institution_id
+        if len(_session_institutions) > _SESSION_CACHE_SIZE:
+            _session_institutions.popitem(last=False)
+    return institution_id
+
+
+async def resolve_institution(caller: LSPCaller, sequence: LSPSequence) -> Tuple[Optional[int], bool]:
+    """
+    Resolve the institution a prediction is attributed to
+    
+    Args:
+        caller: Verified caller from get_lsp_caller
+        sequence: Sequence being predicted (may carry session_id)
+        
+    Returns:
+        (institution ID or None if it cannot be determined, whether it is
+        the claim of a verified token rather than looked up from session_id);
+        always (None, False) for anonymous callers
+    """
+    if not caller.authenticated:
+        return None, False
+    if caller.institution_id is None and sequence.session_id is not None:
+        return await institution_from_session(sequence.session_id), False
+    return caller.institution_id, caller.institution_id is not None
@@ -4,7 +4,8 @@ Models package - exports all database models
 from app.models.institution import Institution, InstitutionSector
 from app.models.user import User, UserRole
 from app.models.session import Session
-from app.models.metrics import MetricsDaily
+from app.models.metrics import MetricsDaily, RollupState
+from app.models.device import DeviceToken
 
 __all__ = [
     "Institution",
@@ -13,4 +14,6 @@ __all__ = [
     "UserRole",
     "Session",
     "MetricsDaily",
+    "RollupState",
+    "DeviceToken",
 ]
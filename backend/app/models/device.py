@@ -0,0 +1,26 @@
+"""
+Device token model - registry of issued kiosk tokens
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class DeviceToken(Base):
+    """
+    Issued device token
+    
+    Only read when a token is revoked (owner institution and real expiry);
+    verifying a device token never touches the database.
+    """
+    __tablename__ = "device_tokens"
+    
+    jti = Column(String(64), primary_key=True)
+    institution_id = Column(Integer, ForeignKey("institutions.id", ondelete="CASCADE"), nullable=False, index=True)
+    device_id = Column(String(64), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<DeviceToken {self.jti} - {self.device_id}>"
@@ -32,8 +32,11 @@ class Institution(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    users = relationship("User", back_populates="institution", cascade="all, delete-orphan")
-    sessions = relationship("Session", back_populates="institution", cascade="all, delete-orphan")
+    # passive_deletes: deleting an institution leaves its users and sessions
+    # to the foreign keys' ON DELETE CASCADE instead of loading and deleting
+    # them one by one (large institutions: app.services.purge, in chunks)
+    users = relationship("User", back_populates="institution", cascade="all, delete-orphan", passive_deletes=True)
+    sessions = relationship("Session", back_populates="institution", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Institution {self.name}>"
@@ -1,7 +1,7 @@
 """
 Metrics model - aggregated metrics for reporting
 """
-from sqlalchemy import Column, Integer, Date, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, Date, DateTime, Float, ForeignKey, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -10,6 +10,10 @@ from app.database import Base
 class MetricsDaily(Base):
     """Daily aggregated metrics per institution"""
     __tablename__ = "metrics_daily"
+    __table_args__ = (
+        # One row per institution and day (rollup upserts on it)
+        UniqueConstraint("institution_id", "date", name="uq_metrics_daily_institution_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     institution_id = Column(Integer, ForeignKey("institutions.id", ondelete="CASCADE"), nullable=False)
@@ -43,3 +47,15 @@ class MetricsDaily(Base):
         if self.lsp_total_attempts > 0:
             return round((self.lsp_successful_attempts / self.lsp_total_attempts) * 100, 2)
         return 0.0
+
+
+class RollupState(Base):
+    """High-water mark of an incremental rollup job"""
+    __tablename__ = "rollup_state"
+    
+    name = Column(String(100), primary_key=True)
+    high_water_mark = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<RollupState {self.name} @ {self.high_water_mark}>"
@@ -1,7 +1,7 @@
 """
 Session model - represents individual service desk attention sessions
 """
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index, Text, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -10,6 +10,20 @@ from app.database import Base
 class Session(Base):
     """Session model for tracking service desk interactions"""
     __tablename__ = "sessions"
+    # In PostgreSQL the table is partitioned by month on started_at (migration
+    # 004, primary key (id, started_at)); partitions are managed by
+    # app.services.session_partitions and are invisible to the ORM
+    __table_args__ = (
+        # Per-institution day ranges (metrics rollup, statistics) and keyset
+        # pagination on (started_at, id), scoped or across institutions
+        Index("ix_sessions_institution_started_at_id", "institution_id", "started_at", "id"),
+        Index("ix_sessions_started_at_id", "started_at", "id"),
+        # Long time-range scans (reports, exports, retention)
+        Index("ix_sessions_started_at_brin", "started_at", postgresql_using="brin"),
+        Index("ix_sessions_ended_at_brin", "ended_at", postgresql_using="brin"),
+        # Active sessions only: the timeout sweeper and "still active" counts
+        Index("ix_sessions_active_started_at", "started_at", postgresql_where=text("ended_at IS NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     institution_id = Column(Integer, ForeignKey("institutions.id", ondelete="CASCADE"), nullable=False)
@@ -18,6 +32,8 @@ class Session(Base):
     # Session metadata
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     ended_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped on every write; the metrics rollup's high-water mark
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # Metrics (collected if COLLECT_METRICS=True)
     turns_count = Column(Integer, default=0)  # Number of interaction turns
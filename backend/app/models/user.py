@@ -1,7 +1,7 @@
 """
 User model - represents users (admins and operators) within institutions
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -18,6 +18,11 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """User model with multi-tenant support"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), per institution or across all
+        Index("ix_users_institution_created_at_id", "institution_id", "created_at", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     institution_id = Column(Integer, ForeignKey("institutions.id", ondelete="CASCADE"), nullable=True)
@@ -34,7 +39,8 @@ class User(Base):
     
     # Relationships
     institution = relationship("Institution", back_populates="users")
-    sessions = relationship("Session", back_populates="operator", cascade="all, delete-orphan")
+    # Sessions outlive their operator: the foreign key sets operator_id to NULL
+    sessions = relationship("Session", back_populates="operator", passive_deletes=True)
     
     def __repr__(self):
         return f"<User {self.username} ({self.role})>"
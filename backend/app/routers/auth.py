@@ -1,34 +1,64 @@
 """Authentication router"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.auth import LoginRequest, Token, RefreshTokenRequest
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.database import get_async_db
+from app.schemas.auth import LoginRequest, LogoutRequest, Token, RefreshTokenRequest
 from app.schemas.user import CurrentUser
-from app.services.auth_service import authenticate_user, create_tokens_for_user, refresh_access_token
-from app.auth.middleware import get_current_active_user
+from app.services.auth_service import (
+    authenticate_user_async,
+    create_tokens_for_user,
+    refresh_access_token_async,
+    revoke_session_tokens
+)
+from app.auth.middleware import get_current_active_user, optional_security
+from app.auth.principal_cache import AuthenticatedPrincipal
 from app.models.user import User
+from app.utils.rate_limiter import limiter
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/login", response_model=Token)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: Request, credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login endpoint"""
-    user = authenticate_user(db, credentials)
+    # Per-client and per-account budgets, checked before any password hashing
+    await limiter.check_async("login_ip", f"ip:{request.client.host if request.client else 'unknown'}")
+    await limiter.check_async("login", f"login:{credentials.email.lower()}")
+    user = await authenticate_user_async(db, credentials)
     return create_tokens_for_user(user)
 
 @router.post("/refresh", response_model=Token)
-def refresh(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh(request: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token"""
-    return refresh_access_token(request.refresh_token, db)
+    return await refresh_access_token_async(request.refresh_token, db)
 
 @router.post("/logout")
-def logout():
-    """Logout endpoint (client-side token removal)"""
+def logout(
+    request: Optional[LogoutRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Logout endpoint: revokes the bearer access token and the refresh token in the body"""
+    revoke_session_tokens(
+        credentials.credentials if credentials else None,
+        request.refresh_token if request else None
+    )
     return {"message": "Logged out successfully"}
 
 @router.get("/me", response_model=CurrentUser)
-def get_me(current_user: User = Depends(get_current_active_user)):
+async def get_me(
+    db: AsyncSession = Depends(get_async_db),
+    principal: AuthenticatedPrincipal = Depends(get_current_active_user)
+):
     """Get current user info"""
+    # Join the institution in the same query (lazy loads are not allowed under asyncio)
+    current_user = (await db.execute(
+        select(User).options(joinedload(User.institution)).where(User.id == principal.id)
+    )).scalar_one_or_none()
+    if current_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return CurrentUser(
         id=current_user.id,
         email=current_user.email,
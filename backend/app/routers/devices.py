@@ -0,0 +1,69 @@
+"""Device tokens router (kiosks)"""
+from datetime import timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.database import get_db
+from app.models.device import DeviceToken
+from app.schemas.device import DeviceTokenCreate, DeviceTokenResponse, DeviceTokenRevoke
+from app.auth.device_tokens import create_device_token, revoke_device_token
+from app.auth.middleware import institution_scope, require_admin, verify_institution_access
+from app.auth.principal_cache import AuthenticatedPrincipal
+from app.config import settings
+from app.utils.logger import log_info
+
+router = APIRouter(prefix="/devices", tags=["Devices"])
+
+@router.post("/tokens", response_model=DeviceTokenResponse, status_code=status.HTTP_201_CREATED)
+def issue_device_token(
+    request: DeviceTokenCreate,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedPrincipal = Depends(require_admin)
+):
+    """Issue a device token scoped to an institution and the LSP endpoints"""
+    # Admins: their own institution; superadmins must name one
+    institution_id = institution_scope(current_user, request.institution_id)
+    if institution_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="institution_id is required")
+    
+    expires_days = min(request.expires_days or settings.DEVICE_TOKEN_EXPIRE_DAYS, settings.DEVICE_TOKEN_EXPIRE_DAYS)
+    token, jti, expires_at = create_device_token(institution_id, request.device_id, timedelta(days=expires_days))
+    
+    # Owner and expiry for revocation; the token itself stays stateless
+    db.add(DeviceToken(
+        jti=jti,
+        institution_id=institution_id,
+        device_id=request.device_id,
+        expires_at=expires_at.replace(tzinfo=timezone.utc)
+    ))
+    db.commit()
+    log_info(f"Device token {jti} issued for device '{request.device_id}' (institution {institution_id}) by user {current_user.id}")
+    
+    return DeviceTokenResponse(
+        device_token=token,
+        jti=jti,
+        device_id=request.device_id,
+        institution_id=institution_id,
+        expires_at=expires_at
+    )
+
+@router.post("/tokens/revoke")
+def revoke_token(
+    request: DeviceTokenRevoke,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedPrincipal = Depends(require_admin)
+):
+    """Revoke a device token of the caller's institution by its jti"""
+    issued = db.get(DeviceToken, request.jti)
+    # Tokens of other institutions are reported as missing, not forbidden
+    if issued is None or not verify_institution_access(current_user, issued.institution_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Device token not found")
+    
+    jti, expires_at = issued.jti, issued.expires_at
+    if issued.revoked_at is None:
+        issued.revoked_at = func.now()
+        db.commit()
+    # Also on repeated calls: re-broadcasts to workers that missed it
+    revoke_device_token(jti, expires_at)
+    log_info(f"Device token {jti} revoked by user {current_user.id}")
+    return {"message": "Device token revoked", "jti": jti, "expires_at": expires_at}
@@ -1,24 +1,64 @@
 """LSP (Lengua de Señas) recognition router"""
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, status
 from app.schemas.lsp import LSPSequence, LSPPrediction, LSPVocabulary
-from app.ml.predict import predict_lsp_sequence, get_available_vocabulary
+from app.ml.predict import predict_lsp_sequence_queued, get_available_vocabulary
+from app.ml.inference_queue import AdmissionRejected, ClientDisconnected, deadline_from_budget
+from app.ml.tenancy import resolve_institution
+from app.auth.middleware import LSPCaller, get_lsp_caller, rate_limit_lsp
+from app.config import settings
+from app.services.attempt_recorder import get_attempt_recorder
+from app.utils.executors import Workload, workload
 from app.utils.logger import log_info, log_error
 
 router = APIRouter(prefix="/lsp", tags=["LSP Recognition"])
 
-@router.post("/predict", response_model=LSPPrediction)
-def predict_sign(sequence: LSPSequence):
+# Non-standard "client closed request" status (nginx convention), only visible in access logs
+CLIENT_CLOSED_REQUEST = 499
+
+@router.post("/predict", response_model=LSPPrediction, dependencies=[Depends(rate_limit_lsp)])
+async def predict_sign(
+    request: Request,
+    sequence: LSPSequence,
+    caller: LSPCaller = Depends(get_lsp_caller),
+    x_request_deadline_ms: Optional[int] = Header(
+        None, description="Time budget in milliseconds; shed with 503 if it cannot be met"
+    )
+):
     """
     Predict sign language word from keypoint sequence
     """
+    deadline = deadline_from_budget(x_request_deadline_ms)
     try:
-        prediction = predict_lsp_sequence(sequence)
+        institution_id, from_token = await resolve_institution(caller, sequence)
+        prediction = await predict_lsp_sequence_queued(
+            sequence,
+            deadline=deadline,
+            institution_id=institution_id,
+            is_disconnected=request.is_disconnected
+        )
+        if settings.COLLECT_METRICS and sequence.session_id is not None and from_token:
+            # Buffered; written to the session by the background flusher, only
+            # if it belongs to the token's institution (anonymous callers and
+            # session-derived attribution never write)
+            get_attempt_recorder().record(
+                sequence.session_id, institution_id, prediction.confidence, prediction.is_confident
+            )
         return prediction
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Prediction shed: {e.reason}",
+            headers={"Retry-After": e.retry_after_header}
+        )
     except Exception as e:
         log_error(f"Error in LSP prediction: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-@router.get("/vocabulary", response_model=LSPVocabulary)
+@router.get("/vocabulary", response_model=LSPVocabulary, dependencies=[Depends(get_lsp_caller)])
+@workload(Workload.INFERENCE)
 def get_vocabulary():
     """Get available LSP vocabulary"""
     words = get_available_vocabulary()
@@ -1,49 +1,135 @@
 """Sessions router"""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.schemas.session import SessionCreate, SessionResponse, SessionEnd, SessionUpdate
-from app.services.session_service import create_session, get_session, end_session, update_session_metrics
-from app.auth.middleware import get_current_active_user
-from app.models.user import User
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
+from app.schemas.session import (
+    SessionCreate,
+    SessionResponse,
+    SessionEnd,
+    SessionMetricsIncrement,
+    SessionPage,
+    SessionStats,
+    SessionUpdate
+)
+from app.services.session_service import (
+    create_session_async,
+    get_session_async,
+    end_session_async,
+    increment_session_metrics_async,
+    list_sessions_async,
+    update_session_metrics_async
+)
+from app.services.session_export import MEDIA_TYPES, ExportFormat, export_query, stream_sessions
+from app.services.session_stats import get_session_stats_async
+from app.auth.middleware import get_current_active_user, institution_scope, rate_limit_sessions, require_admin
+from app.auth.principal_cache import AuthenticatedPrincipal
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
-router = APIRouter(prefix="/sessions", tags=["Sessions"])
+router = APIRouter(prefix="/sessions", tags=["Sessions"], dependencies=[Depends(rate_limit_sessions)])
+
+@router.get("", response_model=SessionPage)
+async def list_sessions(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    institution_id: Optional[int] = Query(None, description="Institution (superadmin only; others get their own)"),
+    operator_id: Optional[int] = Query(None),
+    active: Optional[bool] = Query(None, description="true: not ended yet; false: ended"),
+    started_from: Optional[datetime] = Query(None, description="Started at or after"),
+    started_to: Optional[datetime] = Query(None, description="Started before"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
+):
+    """List sessions, most recently started first (cursor pagination)"""
+    items, next_cursor = await list_sessions_async(
+        db, current_user, cursor, limit,
+        institution_id=institution_id,
+        operator_id=operator_id,
+        active=active,
+        started_from=started_from,
+        started_to=started_to
+    )
+    return SessionPage(items=items, next_cursor=next_cursor)
 
 @router.post("/start", response_model=SessionResponse)
-def start_session(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def start_session(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
 ):
     """Start a new attention session"""
-    session = create_session(db, current_user)
+    session = await create_session_async(db, current_user)
     return session
 
+# Declared before /{session_id} so "export" and "stats" are not parsed as ids
+@router.get("/export", response_class=StreamingResponse)
+async def export_sessions(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    include_details: bool = Query(False, description="Add operator_name and institution_name"),
+    institution_id: Optional[int] = Query(None, description="Institution (superadmin only; others get their own)"),
+    started_from: Optional[datetime] = Query(None, description="Started at or after"),
+    started_to: Optional[datetime] = Query(None, description="Started before"),
+    current_user: AuthenticatedPrincipal = Depends(require_admin)
+):
+    """Stream every matching session as NDJSON or CSV (gzip if the client accepts it)"""
+    institution_id = institution_scope(current_user, institution_id)
+    query = export_query(institution_id, started_from, started_to, include_details)
+    compress = "gzip" in request.headers.get("accept-encoding", "").lower()
+    
+    filename = f"sessions-{institution_id or 'all'}-{datetime.utcnow():%Y%m%d%H%M%S}.{format.value}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(stream_sessions(query, format, compress), media_type=MEDIA_TYPES[format], headers=headers)
+
+@router.get("/stats", response_model=SessionStats)
+async def get_stats(
+    institution_id: Optional[int] = Query(None, description="Institution (superadmin only; others get their own)"),
+    date_from: Optional[date] = Query(None, description="First day, inclusive (default: 30 days before date_to)"),
+    date_to: Optional[date] = Query(None, description="Last day, inclusive (default: today)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
+):
+    """Session statistics for an institution and date range"""
+    return await get_session_stats_async(db, current_user, institution_id, date_from, date_to)
+
 @router.get("/{session_id}", response_model=SessionResponse)
-def get_session_info(
+async def get_session_info(
     session_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
 ):
     """Get session information"""
-    return get_session(db, session_id, current_user)
+    return await get_session_async(db, session_id, current_user)
 
-@router.patch("/{session_id}/metrics")
-def update_metrics(
+@router.patch("/{session_id}/metrics", response_model=SessionResponse)
+async def update_metrics(
     session_id: int,
     metrics: SessionUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
 ):
     """Update session metrics"""
-    return update_session_metrics(db, session_id, metrics)
+    return await update_session_metrics_async(db, session_id, metrics, current_user)
+
+@router.post("/{session_id}/metrics/increment", response_model=SessionResponse)
+async def increment_metrics(
+    session_id: int,
+    deltas: SessionMetricsIncrement,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
+):
+    """Add deltas to session counters atomically (safe with concurrent clients)"""
+    return await increment_session_metrics_async(db, session_id, deltas, current_user)
 
 @router.post("/{session_id}/end", response_model=SessionResponse)
-def end_session_endpoint(
+async def end_session_endpoint(
     session_id: int,
     end_data: SessionEnd,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
 ):
     """End an attention session"""
-    return end_session(db, session_id, end_data)
+    return await end_session_async(db, session_id, end_data, current_user)
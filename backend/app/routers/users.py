@@ -0,0 +1,67 @@
+"""Users router"""
+from typing import Optional
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import get_async_db, get_db
+from app.models.user import UserRole
+from app.schemas.user import UserCreate, UserImportReport, UserPage, UserResponse, UserUpdate
+from app.services.user_import import import_users, parse_user_rows
+from app.services.user_service import create_user_async, get_users_async, update_user_async
+from app.auth.middleware import require_admin
+from app.auth.principal_cache import AuthenticatedPrincipal
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.executors import Workload, workload
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+@router.get("", response_model=UserPage)
+async def list_users(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    institution_id: Optional[int] = Query(None, description="Institution (superadmin only; others get their own)"),
+    role: Optional[UserRole] = Query(None),
+    is_active: Optional[int] = Query(None, ge=0, le=1),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(require_admin)
+):
+    """List users, newest first (cursor pagination)"""
+    items, next_cursor = await get_users_async(
+        db, current_user, cursor, limit,
+        institution_id=institution_id,
+        role=role,
+        is_active=is_active
+    )
+    return UserPage(items=items, next_cursor=next_cursor)
+
+@router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def create_user(
+    user_data: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(require_admin)
+):
+    """Create a user (admins only in their own institution)"""
+    return await create_user_async(db, user_data, current_user)
+
+@router.patch("/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: int,
+    update_data: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedPrincipal = Depends(require_admin)
+):
+    """Update a user (admins only in their own institution)"""
+    return await update_user_async(db, user_id, update_data, current_user)
+
+@router.post("/import", response_model=UserImportReport)
+@workload(Workload.BACKGROUND)
+def import_users_file(
+    file: UploadFile = File(..., description="CSV or JSON list of users"),
+    institution_id: Optional[int] = Query(None, description="Default institution (superadmin only)"),
+    dry_run: bool = Query(False, description="Validate without creating users"),
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedPrincipal = Depends(require_admin)
+):
+    """Bulk import users; returns a per-row report"""
+    rows = parse_user_rows(file.file.read(), file.filename, file.content_type)
+    return import_users(db, rows, current_user, default_institution_id=institution_id, dry_run=dry_run)
@@ -1,16 +1,18 @@
 """
 Schemas package - exports all Pydantic schemas
 """
-from app.schemas.auth import Token, TokenPayload, LoginRequest, RefreshTokenRequest, PasswordChange
+from app.schemas.auth import Token, TokenPayload, LoginRequest, RefreshTokenRequest, LogoutRequest, PasswordChange
 from app.schemas.institution import (
     InstitutionCreate, InstitutionUpdate, InstitutionResponse, InstitutionWithStats
 )
 from app.schemas.user import (
-    UserCreate, UserUpdate, UserResponse, UserWithInstitution, CurrentUser
+    UserCreate, UserUpdate, UserResponse, UserPage, UserWithInstitution, CurrentUser,
+    UserImportRowResult, UserImportReport
 )
 from app.schemas.session import (
-    SessionCreate, SessionUpdate, SessionEnd, SessionResponse, SessionWithDetails, SessionStats
+    SessionCreate, SessionUpdate, SessionEnd, SessionResponse, SessionPage, SessionWithDetails, SessionStats
 )
+from app.schemas.device import DeviceTokenCreate, DeviceTokenResponse, DeviceTokenRevoke
 from app.schemas.lsp import (
     LSPKeypoint, LSPFrame, LSPSequence, LSPPrediction, LSPVocabulary
 )
@@ -21,6 +23,7 @@ __all__ = [
     "TokenPayload",
     "LoginRequest",
     "RefreshTokenRequest",
+    "LogoutRequest",
     "PasswordChange",
     # Institution
     "InstitutionCreate",
@@ -31,15 +34,23 @@ __all__ = [
     "UserCreate",
     "UserUpdate",
     "UserResponse",
+    "UserPage",
     "UserWithInstitution",
     "CurrentUser",
+    "UserImportRowResult",
+    "UserImportReport",
     # Session
     "SessionCreate",
     "SessionUpdate",
     "SessionEnd",
     "SessionResponse",
+    "SessionPage",
     "SessionWithDetails",
     "SessionStats",
+    # Device
+    "DeviceTokenCreate",
+    "DeviceTokenResponse",
+    "DeviceTokenRevoke",
     # LSP
     "LSPKeypoint",
     "LSPFrame",
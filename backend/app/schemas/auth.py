@@ -30,6 +30,11 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    """Logout request schema (the access token comes from the Authorization header)"""
+    refresh_token: Optional[str] = None
+
+
 class PasswordChange(BaseModel):
     """Password change schema"""
     old_password: str = Field(..., min_length=8)
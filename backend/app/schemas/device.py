@@ -0,0 +1,37 @@
+"""
+Device token schemas (kiosks)
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class DeviceTokenCreate(BaseModel):
+    """Schema for issuing a device token"""
+    device_id: str = Field(..., min_length=1, max_length=64)
+    institution_id: Optional[int] = None  # Required for superadmin; admins use their own
+    expires_days: Optional[int] = Field(None, ge=1, le=3650)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "device_id": "kiosk-lobby-1",
+                "institution_id": 1,
+                "expires_days": 90
+            }
+        }
+
+
+class DeviceTokenResponse(BaseModel):
+    """Issued device token (the token is only shown once)"""
+    device_token: str
+    jti: str
+    device_id: str
+    institution_id: int
+    expires_at: datetime
+    token_type: str = "bearer"
+
+
+class DeviceTokenRevoke(BaseModel):
+    """Schema for revoking a device token"""
+    jti: str = Field(..., min_length=1, max_length=64)
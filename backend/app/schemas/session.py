@@ -2,7 +2,7 @@
 Session schemas
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, List, Optional
 from datetime import datetime
 
 
@@ -22,6 +22,17 @@ class SessionUpdate(BaseModel):
     operator_notes: Optional[str] = Field(None, max_length=1000)
 
 
+class SessionMetricsIncrement(BaseModel):
+    """Schema for incrementing session counters (every field is a delta)"""
+    turns_count: int = Field(0, ge=0, le=1000)
+    stt_attempts: int = Field(0, ge=0, le=1000)
+    lsp_failed_attempts: int = Field(0, ge=0, le=1000)
+    text_fallback_count: int = Field(0, ge=0, le=1000)
+    # One entry per new LSP attempt: adds len() to lsp_attempts and folds
+    # the values into avg_confidence (running mean over all attempts)
+    lsp_confidences: List[Annotated[float, Field(ge=0.0, le=1.0)]] = Field(default_factory=list, max_length=1000)
+
+
 class SessionEnd(BaseModel):
     """Schema for ending a session"""
     operator_notes: Optional[str] = Field(None, max_length=1000)
@@ -48,6 +59,12 @@ class SessionResponse(BaseModel):
         from_attributes = True
 
 
+class SessionPage(BaseModel):
+    """One page of sessions, most recently started first"""
+    items: List[SessionResponse]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last one
+
+
 class SessionWithDetails(SessionResponse):
     """Session with operator and institution details"""
     operator_name: Optional[str] = None
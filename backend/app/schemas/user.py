@@ -2,7 +2,7 @@
 User schemas
 """
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.user import UserRole
 
@@ -58,6 +58,12 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserPage(BaseModel):
+    """One page of users, newest first"""
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last one
+
+
 class UserWithInstitution(UserResponse):
     """User response with institution info"""
     institution_name: Optional[str] = None
@@ -79,3 +85,22 @@ class CurrentUser(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class UserImportRowResult(BaseModel):
+    """Outcome of one row of a bulk import"""
+    row: int
+    status: str  # created | valid (dry run) | error
+    email: Optional[str] = None
+    username: Optional[str] = None
+    user_id: Optional[int] = None
+    errors: List[str] = []
+
+
+class UserImportReport(BaseModel):
+    """Bulk import report"""
+    total: int
+    created: int
+    failed: int
+    dry_run: bool = False
+    rows: List[UserImportRowResult]
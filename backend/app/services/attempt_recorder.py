@@ -0,0 +1,176 @@
+"""
+Write-behind recording of LSP attempts
+/lsp/predict enqueues one event per prediction that carries a session_id and
+a device or access token naming an institution; a background flusher
+coalesces them per session and applies them with one bulk UPDATE ... FROM
+(VALUES ...) per batch, so predictions never wait on the database. Memory
+is bounded by the number of distinct sessions pending (not events); anything
+that cannot be buffered or written is counted as lost.
+"""
+import threading
+from typing import Dict, List, Tuple
+from sqlalchemy import Float, Integer, column, update, values
+from app.config import settings
+from app.database import SessionLocal
+from app.models.session import Session as SessionModel
+from app.services.session_service import increment_values
+from app.utils.logger import log_error, log_warning
+from app.utils.metrics import register_stats
+from app.utils.periodic import PeriodicTask
+
+# Sessions per UPDATE statement
+FLUSH_BATCH_SIZE = 1000
+
+# (session_id, institution_id) -> [attempts, failed attempts, confidence sum]
+PendingKey = Tuple[int, int]
+
+
+class AttemptRecorder:
+    """Buffers LSP attempts per session and flushes them in bulk"""
+
+    def __init__(self, interval: float, max_sessions: int):
+        self.max_sessions = max(1, max_sessions)
+        self._pending: Dict[PendingKey, List[float]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._task = PeriodicTask("lsp-attempts", interval, self.flush)
+        self.recorded = 0
+        self.flushed = 0
+        self.dropped = 0  # Buffer full or recorder stopped
+        self.lost = 0  # Flush failed and could not be re-buffered
+        self.flush_errors = 0
+
+    def start(self):
+        self._closed = False
+        self._task.start()
+
+    def stop(self):
+        """Stop the flusher and write what is still buffered"""
+        self._closed = True
+        self._task.stop(run_final=True)
+        with self._lock:
+            left = sum(int(entry[0]) for entry in self._pending.values())
+        if left:
+            self.lost += left
+            log_warning(f"{left} LSP attempt(s) could not be written on shutdown")
+
+    def record(self, session_id: int, institution_id: int, confidence: float, is_confident: bool) -> bool:
+        """
+        Buffer one prediction for a session (never blocks on the database)
+        
+        Args:
+            session_id: Session the prediction belongs to
+            institution_id: Institution claim of the caller's verified token;
+                the update only applies if the session belongs to it and is
+                still active
+            confidence: Prediction confidence
+            is_confident: False counts as a failed attempt
+        
+        Returns:
+            False if the event was dropped
+        """
+        key = (session_id, institution_id)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                if self._closed or len(self._pending) >= self.max_sessions:
+                    self.dropped += 1
+                    return False
+                entry = self._pending[key] = [0, 0, 0.0]
+            entry[0] += 1
+            entry[1] += 0 if is_confident else 1
+            entry[2] += confidence
+            self.recorded += 1
+        return True
+
+    def _requeue(self, batch: Dict[PendingKey, List[float]]):
+        """Put a failed batch back in front of newer events, within the bound"""
+        with self._lock:
+            for key, (attempts, failed, confidence_sum) in batch.items():
+                entry = self._pending.get(key)
+                if entry is None:
+                    if len(self._pending) >= self.max_sessions:
+                        self.lost += int(attempts)
+                        continue
+                    entry = self._pending[key] = [0, 0, 0.0]
+                entry[0] += attempts
+                entry[1] += failed
+                entry[2] += confidence_sum
+
+    def flush(self):
+        """Write every buffered attempt (called by the flusher thread)"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        items = list(batch.items())
+        db = SessionLocal()
+        try:
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                chunk = items[start:start + FLUSH_BATCH_SIZE]
+                rows = values(
+                    column("id", Integer),
+                    column("institution_id", Integer),
+                    column("attempts", Integer),
+                    column("failed", Integer),
+                    column("confidence_sum", Float),
+                    name="pending"
+                ).data([
+                    (session_id, institution_id, int(attempts), int(failed), float(confidence_sum))
+                    for (session_id, institution_id), (attempts, failed, confidence_sum) in chunk
+                ])
+                db.execute(
+                    update(SessionModel)
+                    .where(
+                        SessionModel.id == rows.c.id,
+                        SessionModel.institution_id == rows.c.institution_id,
+                        SessionModel.ended_at.is_(None)  # Like the increment endpoint
+                    )
+                    .values(**increment_values(
+                        {"lsp_failed_attempts": rows.c.failed},
+                        lsp_attempts=rows.c.attempts,
+                        confidence_sum=rows.c.confidence_sum
+                    ))
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            self.flushed += sum(int(entry[0]) for entry in batch.values())
+        except Exception as e:
+            db.rollback()
+            self.flush_errors += 1
+            log_error(f"Could not write {len(batch)} session(s) of LSP attempts, retrying: {str(e)}")
+            self._requeue(batch)
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending_sessions = len(self._pending)
+            pending = sum(int(entry[0]) for entry in self._pending.values())
+        return {
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "pending": pending,
+            "pending_sessions": pending_sessions,
+            "max_sessions": self.max_sessions,
+            "dropped": self.dropped,
+            "lost": self.lost,
+            "flush_errors": self.flush_errors,
+            "flusher": self._task.stats(),
+        }
+
+
+_recorder = None
+
+
+def get_attempt_recorder() -> AttemptRecorder:
+    """Get the shared attempt recorder (created on first use)"""
+    global _recorder
+    if _recorder is None:
+        _recorder = AttemptRecorder(
+            interval=settings.LSP_ATTEMPT_FLUSH_INTERVAL_SECONDS,
+            max_sessions=settings.LSP_ATTEMPT_BUFFER_MAX_SESSIONS
+        )
+        register_stats("lsp_attempts", _recorder.stats)
+    return _recorder
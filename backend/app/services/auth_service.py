@@ -1,21 +1,42 @@
 """
 Authentication service
+Functions that read the database take an AsyncSession and are used by routes
+running on the event loop
 """
 from datetime import datetime
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.auth import LoginRequest, Token
-from app.auth.security import verify_password
-from app.auth.jwt import create_access_token, create_refresh_token, decode_token, verify_token_type
-from app.utils.logger import log_info
+from app.auth.hashing_pool import PasswordHashingUnavailable, get_hashing_pool
+from app.auth.principal_cache import AuthenticatedPrincipal, principal_cache
+from app.auth.jwt import create_access_token, create_refresh_token, decode_token_of_type
+from app.auth.revocation import is_token_revoked, revoke_token
+from app.utils.logger import log_info, log_warning
 
 
-def authenticate_user(db: Session, credentials: LoginRequest) -> User:
-    """Authenticate user with email and password"""
-    user = db.query(User).filter(User.email == credentials.email).first()
-    
-    if not user or not verify_password(credentials.password, user.password_hash):
+def _hashing_unavailable(e: PasswordHashingUnavailable) -> HTTPException:
+    log_warning(f"Password verification rejected: {e.reason}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication temporarily unavailable, retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def _verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Check a password on the hashing pool (awaited, never blocks the loop); 503 when saturated"""
+    try:
+        return await get_hashing_pool().verify_async(plain_password, hashed_password)
+    except PasswordHashingUnavailable as e:
+        raise _hashing_unavailable(e)
+
+
+def _check_login(user: Optional[User], password_ok: bool):
+    """Raise 401/403 unless the credentials matched an active user"""
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -26,18 +47,30 @@ def authenticate_user(db: Session, credentials: LoginRequest) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
+
+
+def _login_succeeded(user: User):
+    # Warm the principal cache with the row we just read
+    principal_cache.put(AuthenticatedPrincipal.from_user(user))
+    log_info(f"User {user.email} authenticated successfully")
+
+
+async def authenticate_user_async(db: AsyncSession, credentials: LoginRequest) -> User:
+    """Authenticate user with email and password (async session)"""
+    user = (await db.execute(select(User).where(User.email == credentials.email))).scalar_one_or_none()
+    _check_login(user, bool(user) and await _verify_password_async(credentials.password, user.password_hash))
     
     # Update last login
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
-    log_info(f"User {user.email} authenticated successfully")
+    _login_succeeded(user)
     return user
 
 
 def create_tokens_for_user(user: User) -> Token:
     """Create access and refresh tokens for user"""
-    access_token = create_access_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": user.id, "inst": user.institution_id})
     refresh_token = create_refresh_token(data={"sub": user.id})
     
     return Token(
@@ -47,28 +80,51 @@ def create_tokens_for_user(user: User) -> Token:
     )
 
 
-def refresh_access_token(refresh_token: str, db: Session) -> Token:
-    """Refresh access token using refresh token"""
-    if not verify_token_type(refresh_token, "refresh"):
+def _refresh_subject(refresh_token: str) -> int:
+    """User id of a valid, unrevoked refresh token"""
+    payload = decode_token_of_type(refresh_token, "refresh")
+    if not payload or is_token_revoked(payload.get("jti")) or payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token"
         )
-    
-    payload = decode_token(refresh_token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
-    
-    user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
-    
+    return payload["sub"]
+
+
+def _tokens_for_refresh(user: Optional[User]) -> Token:
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
-    
     return create_tokens_for_user(user)
+
+
+async def refresh_access_token_async(refresh_token: str, db: AsyncSession) -> Token:
+    """Refresh access token using refresh token (async session)"""
+    user_id = _refresh_subject(refresh_token)
+    user = await db.get(User, user_id)
+    return _tokens_for_refresh(user)
+
+
+def revoke_session_tokens(access_token: Optional[str], refresh_token: Optional[str] = None) -> int:
+    """
+    Revoke the access token (and refresh token, if given) of a session
+    
+    Args:
+        access_token: Bearer access token of the request, if any
+        refresh_token: Refresh token to revoke as well
+        
+    Returns:
+        Number of tokens revoked (invalid or expired tokens are skipped)
+    """
+    revoked = 0
+    for token, token_type in ((access_token, "access"), (refresh_token, "refresh")):
+        payload = decode_token_of_type(token, token_type) if token else None
+        if payload and payload.get("jti"):
+            revoke_token(payload["jti"], float(payload["exp"]))
+            revoked += 1
+    
+    if revoked:
+        log_info(f"Revoked {revoked} token(s) on logout")
+    return revoked
@@ -0,0 +1,210 @@
+"""
+Daily metrics rollup
+Aggregates ended sessions per institution and local day (METRICS_TIMEZONE)
+into metrics_daily with one set-based INSERT ... SELECT ... ON CONFLICT DO
+UPDATE. Each affected day is recomputed in full from sessions, so re-running
+is idempotent.
+
+- rollup_incremental(): days touched by sessions written since the stored
+  high-water mark (sessions.updated_at), up to now() minus a small lag so
+  transactions still in flight are picked up by the next run
+- backfill(): every day of a date range, in chunks of days (one transaction
+  per chunk); leaves the high-water mark alone
+
+Only one worker runs a rollup at a time (transaction-level advisory lock).
+"""
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import Date, DateTime, Float, and_, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.metrics import MetricsDaily, RollupState
+from app.models.session import Session as SessionModel
+from app.utils.logger import log_info
+from app.utils.metrics import register_stats
+from app.utils.periodic import PeriodicTask
+
+ROLLUP_NAME = "metrics_daily"
+
+# pg_try_advisory_xact_lock key ("IT" "MD")
+ROLLUP_LOCK_KEY = 0x4954_4D44
+
+
+@dataclass
+class RollupResult:
+    days: int  # metrics_daily rows written
+    seconds: float
+    skipped: bool = False  # Another worker holds the rollup lock
+    high_water_mark: Optional[datetime] = None
+
+
+def _local_day(column=SessionModel.started_at):
+    """Calendar day of a timestamptz in METRICS_TIMEZONE"""
+    return cast(func.timezone(settings.METRICS_TIMEZONE, column), Date)
+
+
+def _day_start(day):
+    """timestamptz at local midnight of a date (SQL expression)"""
+    return func.timezone(settings.METRICS_TIMEZONE, cast(day, DateTime))
+
+
+def _aggregate_select():
+    """Per institution/day aggregates over ended sessions (filters added by callers)"""
+    attempts = func.coalesce(SessionModel.lsp_attempts, 0)
+    total_attempts = func.sum(attempts)
+    return (
+        select(
+            SessionModel.institution_id,
+            _local_day().label("date"),
+            func.count().label("sessions_count"),
+            (func.coalesce(func.avg(SessionModel.total_duration_seconds), 0) / 60.0).label("avg_duration_minutes"),
+            func.coalesce(func.sum(SessionModel.turns_count), 0).label("total_turns"),
+            func.coalesce(total_attempts, 0).label("lsp_total_attempts"),
+            func.coalesce(func.sum(attempts - func.coalesce(SessionModel.lsp_failed_attempts, 0)), 0).label("lsp_successful_attempts"),
+            func.coalesce(
+                func.sum(func.coalesce(SessionModel.avg_confidence, 0.0) * attempts) / func.nullif(cast(total_attempts, Float), 0),
+                0.0
+            ).label("lsp_avg_confidence"),
+            func.coalesce(func.sum(SessionModel.text_fallback_count), 0).label("text_fallback_count"),
+            func.coalesce(func.avg(SessionModel.turns_count), 0).label("avg_turns_per_session"),
+        )
+        .where(SessionModel.ended_at.isnot(None))
+        .group_by(SessionModel.institution_id, _local_day())
+    )
+
+
+def _upsert(db: Session, aggregates) -> int:
+    """INSERT the aggregate rows into metrics_daily, replacing existing days"""
+    columns = [c.name for c in aggregates.selected_columns]
+    stmt = pg_insert(MetricsDaily).from_select(columns, aggregates)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_metrics_daily_institution_date",
+        set_={name: stmt.excluded[name] for name in columns if name not in ("institution_id", "date")}
+    )
+    return db.execute(stmt).rowcount
+
+
+def _try_lock(db: Session) -> bool:
+    return bool(db.execute(select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_KEY))).scalar())
+
+
+def rollup_incremental(db: Session, lag_seconds: Optional[float] = None, name: str = ROLLUP_NAME) -> RollupResult:
+    """
+    Recompute the days touched since the last run and advance the high-water mark
+    
+    Args:
+        db: Database session
+        lag_seconds: Ignore writes newer than this (default METRICS_ROLLUP_LAG_SECONDS)
+        name: rollup_state row holding the high-water mark
+    
+    Returns:
+        Rows written and the new high-water mark
+    """
+    started = time.perf_counter()
+    lag = settings.METRICS_ROLLUP_LAG_SECONDS if lag_seconds is None else lag_seconds
+    if not _try_lock(db):
+        db.rollback()
+        return RollupResult(days=0, seconds=time.perf_counter() - started, skipped=True)
+
+    state = db.get(RollupState, name, with_for_update=True)
+    since = state.high_water_mark if state else datetime.min.replace(tzinfo=timezone.utc)
+    cutoff = db.execute(select(func.now() - timedelta(seconds=lag))).scalar()
+    if cutoff <= since:
+        db.rollback()
+        return RollupResult(days=0, seconds=time.perf_counter() - started, high_water_mark=since)
+
+    changed = (
+        select(SessionModel.institution_id, _local_day().label("day"))
+        .where(
+            SessionModel.updated_at > since,
+            SessionModel.updated_at <= cutoff,
+            SessionModel.ended_at.isnot(None)
+        )
+        .distinct()
+        .cte("changed")
+    )
+    # Range on started_at (not on the day expression) so the
+    # (institution_id, started_at) index serves each changed day
+    aggregates = _aggregate_select().join(
+        changed,
+        and_(
+            SessionModel.institution_id == changed.c.institution_id,
+            SessionModel.started_at >= _day_start(changed.c.day),
+            SessionModel.started_at < _day_start(changed.c.day + 1)
+        )
+    )
+    days = _upsert(db, aggregates)
+
+    if state is None:
+        db.add(RollupState(name=name, high_water_mark=cutoff))
+    else:
+        state.high_water_mark = cutoff
+    db.commit()
+
+    result = RollupResult(days=days, seconds=time.perf_counter() - started, high_water_mark=cutoff)
+    if days:
+        log_info(f"Metrics rollup: {days} institution-day(s) updated in {result.seconds:.2f}s", rollup=name)
+    return result
+
+
+def backfill(db: Session, start: date, end: date, chunk_days: int = 7, institution_id: Optional[int] = None) -> RollupResult:
+    """
+    Recompute every day in [start, end], one transaction per chunk of days
+    
+    Args:
+        db: Database session
+        start: First day (local, METRICS_TIMEZONE)
+        end: Last day, inclusive
+        chunk_days: Days per transaction
+        institution_id: Limit to one institution
+    
+    Returns:
+        Rows written
+    """
+    started = time.perf_counter()
+    days = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + timedelta(days=max(1, chunk_days) - 1))
+        while not _try_lock(db):
+            db.rollback()
+            time.sleep(1.0)
+
+        aggregates = _aggregate_select().where(
+            SessionModel.started_at >= _day_start(chunk_start),
+            SessionModel.started_at < _day_start(chunk_end + timedelta(days=1))
+        )
+        if institution_id is not None:
+            aggregates = aggregates.where(SessionModel.institution_id == institution_id)
+        written = _upsert(db, aggregates)
+        db.commit()
+
+        days += written
+        log_info(f"Metrics backfill {chunk_start}..{chunk_end}: {written} institution-day(s)")
+        chunk_start = chunk_end + timedelta(days=1)
+
+    return RollupResult(days=days, seconds=time.perf_counter() - started)
+
+
+def _scheduled_rollup():
+    db = SessionLocal()
+    try:
+        rollup_incremental(db)
+    finally:
+        db.close()
+
+
+_rollup_task = None
+
+
+def get_rollup_task() -> PeriodicTask:
+    """In-process scheduler for rollup_incremental (every METRICS_ROLLUP_INTERVAL_SECONDS)"""
+    global _rollup_task
+    if _rollup_task is None:
+        _rollup_task = PeriodicTask("metrics-rollup", settings.METRICS_ROLLUP_INTERVAL_SECONDS, _scheduled_rollup)
+        register_stats("metrics_rollup", _rollup_task.stats)
+    return _rollup_task
@@ -0,0 +1,247 @@
+"""
+Bulk deletion of institution data and old sessions
+Deletes run in chunks of PURGE_CHUNK_SIZE rows, one short transaction each
+(DELETE ... WHERE key IN (SELECT key ... LIMIT n)), so no statement holds
+row locks on millions of rows, replicas keep up and autovacuum can reclaim
+space while the purge goes on. A progress callback is called after every
+chunk.
+
+- purge_institution(): an institution and everything that belongs to it
+- purge_sessions_before(): sessions older than a retention period; whole
+  months go by dropping their partition, the rest in chunks. metrics_daily
+  is kept, so statistics of purged days remain available
+
+Retention runs from the API on a schedule when SESSION_RETENTION_DAYS > 0
+(one worker at a time); purge_institution from scripts/purge_data.py.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.auth.device_tokens import revoke_device_token
+from app.auth.principal_cache import invalidate_principal
+from app.config import settings
+from app.database import SessionLocal
+from app.models.device import DeviceToken
+from app.models.institution import Institution
+from app.models.metrics import MetricsDaily
+from app.models.session import Session as SessionModel
+from app.models.user import User
+from app.services.session_partitions import drop_partitions_before
+from app.utils.logger import log_info
+from app.utils.metrics import register_stats
+from app.utils.periodic import PeriodicTask
+
+# pg_try_advisory_xact_lock key ("IT" "PG")
+RETENTION_LOCK_KEY = 0x4954_5047
+
+
+@dataclass
+class PurgeProgress:
+    table: str
+    deleted: int  # Rows deleted from `table` so far
+    chunks: int
+    seconds: float  # Since the purge started
+
+
+@dataclass
+class PurgeResult:
+    deleted: Dict[str, int] = field(default_factory=dict)  # Table -> rows
+    partitions_dropped: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    skipped: bool = False  # Retention: another worker holds the lock
+
+
+ProgressCallback = Callable[[PurgeProgress], None]
+
+
+def _delete_in_chunks(
+    db: Session,
+    model,
+    key_columns: list,
+    conditions: list,
+    started: float,
+    progress: Optional[ProgressCallback] = None,
+    chunk_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    lock_key: Optional[int] = None
+) -> Optional[int]:
+    """
+    DELETE the rows of `model` matching `conditions`, chunk_size rows per transaction
+    
+    Args:
+        db: Database session
+        model: Mapped class to delete from
+        key_columns: Columns identifying a row (the table's primary key)
+        conditions: WHERE clauses selecting the rows
+        started: perf_counter() at the start of the purge (for progress)
+        progress: Called after every chunk
+        chunk_size: Rows per transaction (default PURGE_CHUNK_SIZE)
+        pause: Seconds to sleep between chunks (default PURGE_CHUNK_PAUSE_SECONDS)
+        lock_key: Advisory lock each chunk must hold; stop when another worker has it
+    
+    Returns:
+        Rows deleted, or None if stopped because the lock was taken
+    """
+    chunk_size = max(1, chunk_size or settings.PURGE_CHUNK_SIZE)
+    pause = settings.PURGE_CHUNK_PAUSE_SECONDS if pause is None else pause
+    keys = select(*key_columns).where(*conditions).limit(chunk_size)
+    target = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+    stmt = delete(model).where(target.in_(keys)).execution_options(synchronize_session=False)
+
+    deleted = chunks = 0
+    while True:
+        if lock_key is not None and not db.execute(select(func.pg_try_advisory_xact_lock(lock_key))).scalar():
+            db.rollback()
+            return None
+        count = db.execute(stmt).rowcount
+        db.commit()
+        deleted += count
+        chunks += 1
+        if progress:
+            progress(PurgeProgress(model.__tablename__, deleted, chunks, time.perf_counter() - started))
+        if count < chunk_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
+
+
+def purge_institution(
+    db: Session,
+    institution_id: int,
+    progress: Optional[ProgressCallback] = None,
+    chunk_size: Optional[int] = None
+) -> PurgeResult:
+    """
+    Delete an institution with its sessions, daily metrics and users
+    
+    Its users are deactivated first (and dropped from every worker's principal
+    cache) and its unexpired device tokens revoked, so no new sessions start
+    meanwhile. Sessions go before users:
+    the other way round, ON DELETE SET NULL would rewrite every session.
+    
+    Args:
+        db: Database session
+        institution_id: Institution to delete
+        progress: Called after every chunk
+        chunk_size: Rows per transaction (default PURGE_CHUNK_SIZE)
+    
+    Returns:
+        Rows deleted per table
+    
+    Raises:
+        HTTPException: 404 if the institution does not exist
+    """
+    started = time.perf_counter()
+    if db.get(Institution, institution_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Institution not found")
+
+    user_ids = db.execute(
+        update(User).where(User.institution_id == institution_id).values(is_active=0).returning(User.id)
+    ).scalars().all()
+    db.commit()
+    for user_id in user_ids:
+        invalidate_principal(user_id)
+
+    # Its kiosks too; ON DELETE CASCADE drops the registry rows with the institution
+    tokens = db.execute(
+        select(DeviceToken.jti, DeviceToken.expires_at).where(
+            DeviceToken.institution_id == institution_id,
+            DeviceToken.expires_at > func.now(),
+        )
+    ).all()
+    for jti, expires_at in tokens:
+        revoke_device_token(jti, expires_at)
+
+    result = PurgeResult()
+    steps = [
+        (SessionModel, [SessionModel.id, SessionModel.started_at], [SessionModel.institution_id == institution_id]),
+        (MetricsDaily, [MetricsDaily.id], [MetricsDaily.institution_id == institution_id]),
+        (User, [User.id], [User.institution_id == institution_id]),
+    ]
+    for model, key_columns, conditions in steps:
+        result.deleted[model.__tablename__] = _delete_in_chunks(
+            db, model, key_columns, conditions, started, progress, chunk_size
+        )
+
+    # Whatever was written meanwhile goes with the row (ON DELETE CASCADE)
+    db.execute(delete(Institution).where(Institution.id == institution_id))
+    db.commit()
+    result.deleted[Institution.__tablename__] = 1
+    result.seconds = time.perf_counter() - started
+
+    log_info(f"Institution {institution_id} purged in {result.seconds:.1f}s", **result.deleted)
+    return result
+
+
+def purge_sessions_before(
+    db: Session,
+    cutoff: datetime,
+    institution_id: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    chunk_size: Optional[int] = None,
+    exclusive: bool = False
+) -> PurgeResult:
+    """
+    Delete sessions started before `cutoff`
+    
+    Args:
+        db: Database session
+        cutoff: Timezone-aware instant; older sessions are deleted
+        institution_id: Limit to one institution (partitions are then never dropped)
+        progress: Called after every chunk
+        chunk_size: Rows per transaction (default PURGE_CHUNK_SIZE)
+        exclusive: Hold the retention lock for every chunk (scheduled runs)
+    
+    Returns:
+        Rows deleted and partitions dropped
+    """
+    started = time.perf_counter()
+    result = PurgeResult()
+    if institution_id is None:
+        result.partitions_dropped = drop_partitions_before(db, cutoff)
+
+    conditions = [SessionModel.started_at < cutoff]
+    if institution_id is not None:
+        conditions.append(SessionModel.institution_id == institution_id)
+    deleted = _delete_in_chunks(
+        db, SessionModel, [SessionModel.id, SessionModel.started_at], conditions, started, progress, chunk_size,
+        lock_key=RETENTION_LOCK_KEY if exclusive else None
+    )
+    result.skipped = deleted is None
+    result.deleted[SessionModel.__tablename__] = deleted or 0
+    result.seconds = time.perf_counter() - started
+
+    if deleted or result.partitions_dropped:
+        log_info(
+            f"Purged sessions before {cutoff.isoformat()} in {result.seconds:.1f}s",
+            deleted=deleted or 0,
+            partitions_dropped=len(result.partitions_dropped)
+        )
+    return result
+
+
+def _scheduled_retention():
+    db = SessionLocal()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SESSION_RETENTION_DAYS)
+        purge_sessions_before(db, cutoff, exclusive=True)
+    finally:
+        db.close()
+
+
+_retention_task = None
+
+
+def get_retention_task() -> PeriodicTask:
+    """In-process scheduler for session retention (every SESSION_RETENTION_CHECK_INTERVAL_SECONDS)"""
+    global _retention_task
+    if _retention_task is None:
+        _retention_task = PeriodicTask(
+            "session-retention", settings.SESSION_RETENTION_CHECK_INTERVAL_SECONDS, _scheduled_retention
+        )
+        register_stats("session_retention", _retention_task.stats)
+    return _retention_task
@@ -0,0 +1,151 @@
+"""
+Streaming export of sessions (GET /sessions/export)
+Rows are read through a server-side cursor (yield_per) as plain column
+tuples, never ORM objects, rendered one fetch at a time as NDJSON or CSV and
+optionally gzip-compressed on the fly, so memory stays flat however many
+sessions an institution has. The export opens its own database session: the
+request's session is closed before a StreamingResponse body is sent.
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence
+from sqlalchemy import and_, case, select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.institution import Institution
+from app.models.session import Session as SessionModel
+from app.models.user import User
+from app.utils.logger import log_error, log_info
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+# Same fields as SessionResponse
+SESSION_COLUMNS = [
+    SessionModel.id,
+    SessionModel.institution_id,
+    SessionModel.operator_id,
+    SessionModel.started_at,
+    SessionModel.ended_at,
+    SessionModel.turns_count,
+    SessionModel.stt_attempts,
+    SessionModel.lsp_attempts,
+    SessionModel.lsp_failed_attempts,
+    SessionModel.text_fallback_count,
+    SessionModel.avg_confidence,
+    SessionModel.total_duration_seconds,
+]
+
+
+def _operator_name():
+    """User.full_name in SQL"""
+    return case(
+        (and_(User.first_name.isnot(None), User.last_name.isnot(None)), User.first_name + " " + User.last_name),
+        else_=User.username
+    )
+
+
+def export_query(
+    institution_id: Optional[int],
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    include_details: bool = False
+):
+    """
+    SELECT of the exported columns, oldest first
+    
+    Args:
+        institution_id: Institution to export (None = all, superadmin only)
+        started_from: Started at or after
+        started_to: Started before
+        include_details: Add operator_name and institution_name (SessionWithDetails)
+    
+    Returns:
+        Select statement
+    """
+    columns = list(SESSION_COLUMNS)
+    if include_details:
+        columns += [_operator_name().label("operator_name"), Institution.name.label("institution_name")]
+    query = select(*columns)
+    if include_details:
+        query = (
+            query.outerjoin(User, User.id == SessionModel.operator_id)
+            .join(Institution, Institution.id == SessionModel.institution_id)
+        )
+    if institution_id is not None:
+        query = query.where(SessionModel.institution_id == institution_id)
+    if started_from is not None:
+        query = query.where(SessionModel.started_at >= started_from)
+    if started_to is not None:
+        query = query.where(SessionModel.started_at < started_to)
+    # Index order ((institution_id, started_at, id)): rows stream without a sort
+    return query.order_by(SessionModel.started_at, SessionModel.id)
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _render(rows: Sequence, fields: List[str], export_format: ExportFormat) -> bytes:
+    """One fetch of rows as NDJSON lines or CSV records"""
+    if export_format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([_plain(v) for v in row] for row in rows)
+        return buffer.getvalue().encode("utf-8")
+    return "".join(
+        json.dumps(dict(zip(fields, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+    ).encode("utf-8")
+
+
+async def stream_sessions(query, export_format: ExportFormat, compress: bool = False) -> AsyncIterator[bytes]:
+    """
+    Body of the export, one chunk per server-side cursor fetch
+    
+    Args:
+        query: Statement from export_query()
+        export_format: NDJSON or CSV (with a header row)
+        compress: gzip the stream (Content-Encoding: gzip)
+    
+    Yields:
+        Encoded (and compressed) chunks
+    """
+    fields = [c.name for c in query.selected_columns]
+    encoder = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    exported = 0
+
+    def encoded(data: bytes) -> bytes:
+        return encoder.compress(data) if encoder else data
+
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=settings.SESSION_EXPORT_BATCH_ROWS))
+            if export_format == ExportFormat.CSV:
+                header = io.StringIO()
+                csv.writer(header).writerow(fields)
+                chunk = encoded(header.getvalue().encode("utf-8"))
+                if chunk:
+                    yield chunk
+            async for rows in result.partitions():
+                chunk = encoded(_render(rows, fields, export_format))
+                exported += len(rows)
+                if chunk:  # Empty while the compressor is still buffering
+                    yield chunk
+        if encoder:
+            yield encoder.flush()
+    except Exception as e:
+        # Headers are already sent: the client sees a truncated body
+        log_error(f"Session export failed after {exported} rows: {str(e)}")
+        raise
+    log_info(f"Session export finished: {exported} rows", format=export_format.value, gzip=compress)
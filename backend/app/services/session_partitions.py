@@ -0,0 +1,213 @@
+"""
+Monthly partitions of the sessions table
+Migration 004 partitions sessions by month on started_at (UTC month bounds)
+with a DEFAULT partition for rows outside every month. ensure_partitions()
+keeps SESSION_PARTITION_MONTHS_AHEAD months ready ahead of time so new
+sessions never land in the default partition; if some already did (the job
+was down for months), they are moved into the new partition as it is
+created. drop_partitions_before() implements retention of whole months.
+Everything is a no-op while sessions is still a plain table.
+
+Only one worker maintains partitions at a time (transaction-level advisory
+lock).
+"""
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.logger import log_info, log_warning
+from app.utils.metrics import register_stats
+from app.utils.periodic import PeriodicTask
+
+PARENT_TABLE = "sessions"
+DEFAULT_PARTITION = "sessions_default"
+
+# pg_try_advisory_xact_lock key ("IT" "SP")
+PARTITION_LOCK_KEY = 0x4954_5350
+
+MONTHLY_PARTITION = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+@dataclass
+class PartitionInfo:
+    name: str
+    bounds: str  # FOR VALUES ... / DEFAULT
+    estimated_rows: int
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def _bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def is_partitioned(db: Session) -> bool:
+    """Whether migration 004 has run (sessions is a partitioned table)"""
+    return bool(db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": PARENT_TABLE}).scalar())
+
+
+def list_partitions(db: Session) -> List[PartitionInfo]:
+    """Partitions of sessions with their bounds and planner row estimates"""
+    rows = db.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), GREATEST(c.reltuples, 0)::bigint
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+        ORDER BY c.relname
+    """), {"table": PARENT_TABLE})
+    return [PartitionInfo(name=name, bounds=bounds, estimated_rows=estimate) for name, bounds, estimate in rows]
+
+
+def _exists(db: Session, name: str) -> bool:
+    return db.execute(select(func.to_regclass(name))).scalar() is not None
+
+
+def _create_partition(db: Session, month: date) -> int:
+    """
+    Create the partition of one month
+    
+    Rows of that month already in the default partition are moved into it
+    (PostgreSQL refuses to add a partition overlapping rows in DEFAULT).
+    
+    Args:
+        db: Database session (the caller commits)
+        month: First day of the month
+    
+    Returns:
+        Rows moved out of the default partition
+    """
+    name, lower, upper = partition_name(month), _bound(month), _bound(add_months(month, 1))
+    in_range = "started_at >= CAST(:lower AS timestamptz) AND started_at < CAST(:upper AS timestamptz)"
+    params = {"lower": lower, "upper": upper}
+
+    stranded = _exists(db, DEFAULT_PARTITION) and db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), params
+    ).scalar()
+    if not stranded:
+        db.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        return 0
+
+    # Build it detached, move the rows, then attach (indexes and foreign keys
+    # are created on attach)
+    db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE"))
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), params).rowcount
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    log_warning(f"Moved {moved} session(s) from {DEFAULT_PARTITION} into new partition {name}")
+    return moved
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Create any missing partition from the current month to `months_ahead` months ahead
+    
+    Args:
+        db: Database session
+        months_ahead: Months after the current one (default SESSION_PARTITION_MONTHS_AHEAD)
+        today: Reference day, UTC (default today)
+    
+    Returns:
+        Names of the partitions created (empty if sessions is not partitioned,
+        nothing was missing or another worker holds the lock)
+    """
+    ahead = settings.SESSION_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(today or datetime.now(timezone.utc).date())
+    if not is_partitioned(db):
+        db.rollback()
+        return []
+    if not db.execute(select(func.pg_try_advisory_xact_lock(PARTITION_LOCK_KEY))).scalar():
+        db.rollback()
+        return []
+
+    created = []
+    for offset in range(ahead + 1):
+        month = add_months(current, offset)
+        if not _exists(db, partition_name(month)):
+            _create_partition(db, month)
+            created.append(partition_name(month))
+    db.commit()
+
+    if created:
+        log_info(f"Created session partition(s): {', '.join(created)}")
+    return created
+
+
+def drop_partitions_before(db: Session, cutoff: datetime) -> List[str]:
+    """
+    Drop every monthly partition whose whole month is before `cutoff`
+    
+    Dropping a partition is a catalog operation: retention of whole months
+    costs the same for ten rows or ten million, with no dead tuples left to
+    vacuum. Rows in partially covered months are left to the caller.
+    
+    Args:
+        db: Database session
+        cutoff: Rows started before this instant may go
+    
+    Returns:
+        Names of the partitions dropped (empty if sessions is not partitioned
+        or another worker holds the lock)
+    """
+    if not is_partitioned(db) or not db.execute(select(func.pg_try_advisory_xact_lock(PARTITION_LOCK_KEY))).scalar():
+        db.rollback()
+        return []
+
+    dropped = []
+    for partition in list_partitions(db):
+        match = MONTHLY_PARTITION.match(partition.name)
+        if not match:
+            continue  # The default partition
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        upper = datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+        if upper <= cutoff:
+            db.execute(text(f"DROP TABLE {partition.name}"))
+            dropped.append(partition.name)
+    db.commit()
+
+    if dropped:
+        log_info(f"Dropped session partition(s): {', '.join(dropped)}")
+    return dropped
+
+
+def _scheduled_maintenance():
+    db = SessionLocal()
+    try:
+        ensure_partitions(db)
+    finally:
+        db.close()
+
+
+_partition_task = None
+
+
+def get_partition_task() -> PeriodicTask:
+    """In-process scheduler for ensure_partitions (every SESSION_PARTITION_CHECK_INTERVAL_SECONDS)"""
+    global _partition_task
+    if _partition_task is None:
+        _partition_task = PeriodicTask(
+            "session-partitions", settings.SESSION_PARTITION_CHECK_INTERVAL_SECONDS, _scheduled_maintenance
+        )
+        register_stats("session_partitions", _partition_task.stats)
+    return _partition_task
@@ -1,76 +1,227 @@
 """
 Session management service
+Functions take an AsyncSession and are used by routes running on the event
+loop; they write with single INSERT/UPDATE ... RETURNING statements (no
+SELECT before, no refresh after)
 """
 from datetime import datetime
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Integer, cast, func, insert, select, update
+from sqlalchemy.sql.expression import ClauseElement
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.session import Session as SessionModel
-from app.models.user import User
-from app.schemas.session import SessionCreate, SessionUpdate, SessionEnd
+from app.auth.middleware import institution_scope
+from app.auth.principal_cache import AuthenticatedPrincipal
+from app.schemas.session import SessionCreate, SessionUpdate, SessionEnd, SessionMetricsIncrement
 from app.utils.logger import log_info
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset_page
 
-
-def create_session(db: Session, operator: User) -> SessionModel:
-    """Create a new attention session"""
-    session = SessionModel(
-        institution_id=operator.institution_id,
-        operator_id=operator.id,
-        started_at=datetime.utcnow()
-    )
-    
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    
-    log_info(f"Session {session.id} started by operator {operator.username}")
-    return session
+# Cursor namespace of session listings
+SESSIONS_CURSOR = "sessions"
 
 
-def get_session(db: Session, session_id: int, current_user: User) -> SessionModel:
-    """Get session by ID"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+def _found(session: Optional[SessionModel]) -> SessionModel:
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    return session
+
+
+def _check_access(session: SessionModel, current_user: AuthenticatedPrincipal):
+    scope = institution_scope(current_user)
+    if scope is not None and session.institution_id != scope:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+
+def _scoped(stmt, current_user: AuthenticatedPrincipal):
+    """Restrict an UPDATE to the caller's institution (the WHERE clause does the access check)"""
+    institution_id = institution_scope(current_user)
+    if institution_id is not None:
+        stmt = stmt.where(SessionModel.institution_id == institution_id)
+    return stmt
+
+
+async def _update_failed(db: AsyncSession, session_id: int, current_user: AuthenticatedPrincipal) -> SessionModel:
+    """An UPDATE matched no row: find out why (only runs on the error path)"""
+    session = _found(await db.get(SessionModel, session_id))
+    _check_access(session, current_user)
+    return session
+
+
+def _nonzero(delta: Any) -> bool:
+    return isinstance(delta, ClauseElement) or bool(delta)
+
+
+def increment_values(counters: Dict[str, Any], lsp_attempts: Any = 0, confidence_sum: Any = 0.0) -> dict:
+    """
+    SET clause adding deltas to session counters
     
-    # Verify access
-    if current_user.role.value not in ["superadmin"]:
-        if session.institution_id != current_user.institution_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    Every expression reads the row's current values, so concurrent increments
+    never lose updates; avg_confidence stays the mean over all LSP attempts.
+    Deltas are numbers or SQL expressions (e.g. columns of a VALUES list for
+    bulk updates).
+    
+    Args:
+        counters: Column name -> delta (turns_count, stt_attempts, ...)
+        lsp_attempts: New LSP attempts
+        confidence_sum: Sum of the confidences of those attempts
+    
+    Returns:
+        Values for update(SessionModel).values(...)
+    """
+    values = {
+        name: func.coalesce(getattr(SessionModel, name), 0) + delta
+        for name, delta in counters.items()
+        if _nonzero(delta)
+    }
+    if _nonzero(lsp_attempts):
+        attempts = func.coalesce(SessionModel.lsp_attempts, 0)
+        values["lsp_attempts"] = attempts + lsp_attempts
+        values["avg_confidence"] = (
+            (func.coalesce(SessionModel.avg_confidence, 0.0) * attempts + confidence_sum)
+            / (attempts + lsp_attempts)
+        )
+    return values
+
+
+async def create_session_async(db: AsyncSession, operator: AuthenticatedPrincipal) -> SessionModel:
+    """Create a new attention session (async session, one INSERT ... RETURNING)"""
+    session = await db.scalar(
+        insert(SessionModel)
+        .values(institution_id=operator.institution_id, operator_id=operator.id, started_at=func.now())
+        .returning(SessionModel)
+    )
+    await db.commit()
     
+    log_info(f"Session {session.id} started by operator {operator.id}")
     return session
 
 
-def update_session_metrics(db: Session, session_id: int, metrics: SessionUpdate) -> SessionModel:
-    """Update session metrics"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+async def get_session_async(db: AsyncSession, session_id: int, current_user: AuthenticatedPrincipal) -> SessionModel:
+    """Get session by ID (async session)"""
+    session = _found(await db.get(SessionModel, session_id))
+    _check_access(session, current_user)
+    return session
+
+
+async def list_sessions_async(
+    db: AsyncSession,
+    current_user: AuthenticatedPrincipal,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    institution_id: Optional[int] = None,
+    operator_id: Optional[int] = None,
+    active: Optional[bool] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None
+) -> Tuple[List[SessionModel], Optional[str]]:
+    """
+    Get one page of sessions, most recently started first (keyset pagination on started_at, id)
     
-    for field, value in metrics.dict(exclude_unset=True).items():
-        setattr(session, field, value)
+    Args:
+        db: Async database session
+        current_user: Caller; non-superadmins only see their institution
+        cursor: next_cursor of the previous page
+        limit: Page size
+        institution_id: Institution filter (superadmin; others get their own)
+        operator_id: Operator filter
+        active: True for sessions not ended yet, False for ended ones
+        started_from: Started at or after
+        started_to: Started before
     
-    db.commit()
-    db.refresh(session)
-    return session
+    Returns:
+        (sessions, next_cursor); next_cursor is None on the last page
+    """
+    institution_id = institution_scope(current_user, institution_id)
+    query = select(SessionModel)
+    if institution_id is not None:
+        query = query.where(SessionModel.institution_id == institution_id)
+    if operator_id is not None:
+        query = query.where(SessionModel.operator_id == operator_id)
+    if active is not None:
+        query = query.where(SessionModel.ended_at.is_(None) if active else SessionModel.ended_at.isnot(None))
+    if started_from is not None:
+        query = query.where(SessionModel.started_at >= started_from)
+    if started_to is not None:
+        query = query.where(SessionModel.started_at < started_to)
+    
+    return await keyset_page(db, query, SESSIONS_CURSOR, SessionModel.started_at, SessionModel.id, cursor, limit)
 
 
-def end_session(db: Session, session_id: int, end_data: SessionEnd) -> SessionModel:
-    """End an attention session"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not session:
+async def update_session_metrics_async(
+    db: AsyncSession,
+    session_id: int,
+    metrics: SessionUpdate,
+    current_user: AuthenticatedPrincipal
+) -> SessionModel:
+    """Update session metrics (async session, one UPDATE ... RETURNING)"""
+    values = metrics.dict(exclude_unset=True)
+    if not values:
+        return await get_session_async(db, session_id, current_user)
+    
+    stmt = update(SessionModel).where(SessionModel.id == session_id).values(**values)
+    session = await db.scalar(_scoped(stmt, current_user).returning(SessionModel))
+    if session is None:
+        await _update_failed(db, session_id, current_user)
+        # Visible now, but moved or deleted concurrently (purge, partition maintenance)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    await db.commit()
+    return session
+
+
+async def increment_session_metrics_async(
+    db: AsyncSession,
+    session_id: int,
+    deltas: SessionMetricsIncrement,
+    current_user: AuthenticatedPrincipal
+) -> SessionModel:
+    """Add deltas to the counters of an active session (async session, one UPDATE ... RETURNING)"""
+    values = increment_values(
+        deltas.model_dump(exclude={"lsp_confidences"}),
+        lsp_attempts=len(deltas.lsp_confidences),
+        confidence_sum=sum(deltas.lsp_confidences)
+    )
+    if not values:
+        return await get_session_async(db, session_id, current_user)
     
-    if session.ended_at:
+    stmt = (
+        update(SessionModel)
+        .where(SessionModel.id == session_id, SessionModel.ended_at.is_(None))
+        .values(**values)
+    )
+    session = await db.scalar(_scoped(stmt, current_user).returning(SessionModel))
+    if session is None:
+        await _update_failed(db, session_id, current_user)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Session already ended")
-    
-    session.ended_at = datetime.utcnow()
-    session.total_duration_seconds = int((session.ended_at - session.started_at).total_seconds())
-    
+    await db.commit()
+    return session
+
+
+async def end_session_async(
+    db: AsyncSession,
+    session_id: int,
+    end_data: SessionEnd,
+    current_user: AuthenticatedPrincipal
+) -> SessionModel:
+    """End an attention session (async session, one UPDATE ... RETURNING)"""
+    values = {
+        "ended_at": func.now(),
+        "total_duration_seconds": cast(func.extract("epoch", func.now() - SessionModel.started_at), Integer),
+    }
     if end_data.operator_notes:
-        session.operator_notes = end_data.operator_notes
+        values["operator_notes"] = end_data.operator_notes
     
-    db.commit()
-    db.refresh(session)
+    stmt = (
+        update(SessionModel)
+        .where(SessionModel.id == session_id, SessionModel.ended_at.is_(None))
+        .values(**values)
+    )
+    session = await db.scalar(_scoped(stmt, current_user).returning(SessionModel))
+    if session is None:
+        # Missing, other institution (404/403) or already ended (400)
+        await _update_failed(db, session_id, current_user)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Session already ended")
+    await db.commit()
     
     log_info(f"Session {session.id} ended (duration: {session.duration_minutes} minutes)")
     return session
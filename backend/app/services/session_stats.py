@@ -0,0 +1,223 @@
+"""
+Session statistics (GET /sessions/stats)
+Closed days come from metrics_daily (filled by the rollup job); the open day,
+plus sessions still active, come from one aggregate query over sessions.
+Results are cached per (institution, range) for SESSION_STATS_CACHE_TTL_SECONDS
+and concurrent misses for the same key share one computation, so dashboards
+polling the endpoint cost at most one pair of queries per key and interval.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.middleware import institution_scope
+from app.auth.principal_cache import AuthenticatedPrincipal
+from app.config import settings
+from app.models.metrics import MetricsDaily
+from app.models.session import Session as SessionModel
+from app.schemas.session import SessionStats
+from app.utils.metrics import register_stats
+
+# Days covered when the caller gives no range
+DEFAULT_RANGE_DAYS = 30
+
+StatsKey = Tuple[Optional[int], date, date]
+
+
+class StatsCache:
+    """Bounded LRU of computed stats with a per-entry TTL and single-flight misses"""
+
+    def __init__(self, max_size: int = 1_000, ttl_seconds: float = 5.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[StatsKey, Tuple[SessionStats, float]]" = OrderedDict()
+        self._inflight: Dict[StatsKey, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+
+    def get(self, key: StatsKey) -> Optional[SessionStats]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: StatsKey, stats: SessionStats):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (stats, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: StatsKey, compute) -> SessionStats:
+        """Cached value, or the result of `await compute()` (one call per key at a time)"""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._shared += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # This request was cancelled
+                # The computing request was cancelled: compute here instead
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._misses += 1
+        try:
+            stats = await compute()
+            self.put(key, stats)
+            future.set_result(stats)
+            return stats
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses + self._shared
+            return {
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "shared_misses": self._shared,
+                "hit_rate": round((self._hits + self._shared) / lookups, 4) if lookups else 0.0,
+            }
+
+
+stats_cache = StatsCache(ttl_seconds=settings.SESSION_STATS_CACHE_TTL_SECONDS)
+register_stats("session_stats_cache", stats_cache.stats)
+
+
+def _local_midnight(day: date) -> datetime:
+    return datetime.combine(day, dt_time.min, tzinfo=ZoneInfo(settings.METRICS_TIMEZONE))
+
+
+def _resolve_scope(
+    current_user: AuthenticatedPrincipal,
+    institution_id: Optional[int],
+    date_from: Optional[date],
+    date_to: Optional[date]
+) -> StatsKey:
+    institution_id = institution_scope(current_user, institution_id)
+
+    today = datetime.now(ZoneInfo(settings.METRICS_TIMEZONE)).date()
+    date_to = date_to or today
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must be on or before date_to")
+    return institution_id, date_from, date_to
+
+
+async def _compute_stats(db: AsyncSession, institution_id: Optional[int], date_from: date, date_to: date) -> SessionStats:
+    today = datetime.now(ZoneInfo(settings.METRICS_TIMEZONE)).date()
+    open_from = max(date_from, today)  # First day not taken from metrics_daily
+    range_start, range_end = _local_midnight(date_from), _local_midnight(date_to + timedelta(days=1))
+
+    # 1. Closed days: sums over metrics_daily rows
+    closed = None
+    if date_from < open_from:
+        query = select(
+            func.coalesce(func.sum(MetricsDaily.sessions_count), 0).label("sessions"),
+            func.coalesce(func.sum(MetricsDaily.avg_duration_minutes * MetricsDaily.sessions_count), 0.0).label("minutes"),
+            func.coalesce(func.sum(MetricsDaily.total_turns), 0).label("turns"),
+            func.coalesce(func.sum(MetricsDaily.lsp_total_attempts), 0).label("attempts"),
+            func.coalesce(func.sum(MetricsDaily.lsp_successful_attempts), 0).label("successful"),
+            func.coalesce(func.sum(MetricsDaily.text_fallback_count), 0).label("fallbacks"),
+        ).where(MetricsDaily.date >= date_from, MetricsDaily.date < min(open_from, date_to + timedelta(days=1)))
+        if institution_id is not None:
+            query = query.where(MetricsDaily.institution_id == institution_id)
+        closed = (await db.execute(query)).one()
+
+    # 2. Open day (ended sessions) and sessions still active, in one pass
+    ended = SessionModel.ended_at.isnot(None)
+    attempts = func.coalesce(SessionModel.lsp_attempts, 0)
+    query = select(
+        func.count().filter(ended).label("sessions"),
+        func.coalesce(func.sum(SessionModel.total_duration_seconds).filter(ended), 0).label("seconds"),
+        func.coalesce(func.sum(SessionModel.turns_count).filter(ended), 0).label("turns"),
+        func.coalesce(func.sum(attempts).filter(ended), 0).label("attempts"),
+        func.coalesce(
+            func.sum(attempts - func.coalesce(SessionModel.lsp_failed_attempts, 0)).filter(ended), 0
+        ).label("successful"),
+        func.coalesce(func.sum(SessionModel.text_fallback_count).filter(ended), 0).label("fallbacks"),
+        func.count().filter(SessionModel.ended_at.is_(None)).label("active"),
+    ).where(
+        SessionModel.started_at >= range_start,
+        SessionModel.started_at < range_end,
+        or_(
+            and_(ended, SessionModel.started_at >= _local_midnight(open_from)),
+            SessionModel.ended_at.is_(None)
+        )
+    )
+    if institution_id is not None:
+        query = query.where(SessionModel.institution_id == institution_id)
+    current = (await db.execute(query)).one()
+
+    ended_sessions = current.sessions + (closed.sessions if closed else 0)
+    minutes = current.seconds / 60.0 + (closed.minutes if closed else 0.0)
+    turns = current.turns + (closed.turns if closed else 0)
+    lsp_attempts = current.attempts + (closed.attempts if closed else 0)
+    successful = current.successful + (closed.successful if closed else 0)
+    fallbacks = current.fallbacks + (closed.fallbacks if closed else 0)
+
+    return SessionStats(
+        total_sessions=ended_sessions + current.active,
+        active_sessions=current.active,
+        avg_duration_minutes=round(minutes / ended_sessions, 2) if ended_sessions else 0.0,
+        avg_turns_per_session=round(turns / ended_sessions, 2) if ended_sessions else 0.0,
+        lsp_success_rate=round(successful / lsp_attempts * 100, 2) if lsp_attempts else 0.0,
+        total_text_fallbacks=fallbacks
+    )
+
+
+async def get_session_stats_async(
+    db: AsyncSession,
+    current_user: AuthenticatedPrincipal,
+    institution_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> SessionStats:
+    """
+    Session statistics for an institution and date range (cached briefly)
+    
+    Args:
+        db: Async database session
+        current_user: Caller; non-superadmins only see their institution
+        institution_id: Institution to report on (superadmin: None = all)
+        date_from: First local day (default: DEFAULT_RANGE_DAYS before date_to)
+        date_to: Last local day, inclusive (default: today)
+    
+    Returns:
+        Aggregated statistics
+    
+    Raises:
+        HTTPException: On an invalid range or another institution
+    """
+    key = _resolve_scope(current_user, institution_id, date_from, date_to)
+    return await stats_cache.get_or_compute(key, lambda: _compute_stats(db, *key))
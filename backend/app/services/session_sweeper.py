@@ -0,0 +1,144 @@
+"""
+Closing of abandoned sessions
+A session whose kiosk went away (browser closed, network lost) is never
+ended by its client. The sweeper ends every active session that started and
+was last written more than SESSION_TIMEOUT_MINUTES ago, in batches of one
+UPDATE each, entirely server-side: ended_at is the last write (updated_at),
+so an abandoned session does not count the hours nobody was there, and
+total_duration_seconds is computed from it.
+
+Candidates come from the partial index on active sessions (ended_at IS NULL),
+which stays small however long the history is. Only one worker sweeps at a
+time (transaction-level advisory lock per batch); rows being written by a
+request are skipped (SKIP LOCKED) and picked up by the next run.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import Integer, cast, func, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.session import Session as SessionModel
+from app.utils.logger import log_info
+from app.utils.metrics import register_stats
+from app.utils.periodic import PeriodicTask
+
+# pg_try_advisory_xact_lock key ("IT" "SW")
+SWEEP_LOCK_KEY = 0x4954_5357
+
+
+@dataclass
+class SweepResult:
+    closed: int
+    batches: int
+    seconds: float
+    skipped: bool = False  # Another worker holds the sweep lock
+
+
+def _sweep_batch(db: Session, timeout: timedelta, batch_size: int) -> Optional[int]:
+    """Close up to batch_size stale sessions in one UPDATE; None if another worker is sweeping"""
+    if not db.execute(select(func.pg_try_advisory_xact_lock(SWEEP_LOCK_KEY))).scalar():
+        db.rollback()
+        return None
+
+    cutoff = func.now() - timeout
+    last_write = func.greatest(SessionModel.started_at, func.coalesce(SessionModel.updated_at, SessionModel.started_at))
+    stale = (
+        select(SessionModel.id, SessionModel.started_at)
+        .where(
+            SessionModel.ended_at.is_(None),
+            SessionModel.started_at < cutoff,  # Served by ix_sessions_active_started_at
+            func.coalesce(SessionModel.updated_at, SessionModel.started_at) < cutoff
+        )
+        .order_by(SessionModel.started_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    # (id, started_at): the primary key of the partitioned table
+    closed = db.execute(
+        update(SessionModel)
+        .where(tuple_(SessionModel.id, SessionModel.started_at).in_(stale))
+        .values(
+            ended_at=last_write,
+            total_duration_seconds=cast(func.extract("epoch", last_write - SessionModel.started_at), Integer)
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return closed
+
+
+def sweep_stale_sessions(
+    db: Session,
+    timeout_minutes: Optional[float] = None,
+    batch_size: Optional[int] = None
+) -> SweepResult:
+    """
+    End every session inactive for longer than the timeout, one batch per transaction
+    
+    Args:
+        db: Database session
+        timeout_minutes: Inactivity before a session is closed (default SESSION_TIMEOUT_MINUTES)
+        batch_size: Sessions per UPDATE (default SESSION_SWEEP_BATCH_SIZE)
+    
+    Returns:
+        Sessions closed and batches run
+    """
+    started = time.perf_counter()
+    timeout = timedelta(minutes=settings.SESSION_TIMEOUT_MINUTES if timeout_minutes is None else timeout_minutes)
+    batch_size = max(1, batch_size or settings.SESSION_SWEEP_BATCH_SIZE)
+
+    closed = batches = 0
+    while True:
+        count = _sweep_batch(db, timeout, batch_size)
+        if count is None:
+            return SweepResult(closed=closed, batches=batches, seconds=time.perf_counter() - started, skipped=True)
+        closed += count
+        batches += 1
+        if count < batch_size:
+            break
+
+    result = SweepResult(closed=closed, batches=batches, seconds=time.perf_counter() - started)
+    if closed:
+        log_info(f"Closed {closed} abandoned session(s) in {result.seconds:.2f}s", batches=batches)
+    return result
+
+
+class SessionSweeper:
+    """Scheduled sweep_stale_sessions with running totals for /metrics"""
+
+    def __init__(self, interval: float):
+        self.task = PeriodicTask("session-sweeper", interval, self.run)
+        self.closed = 0
+        self.skipped = 0
+
+    def run(self):
+        db = SessionLocal()
+        try:
+            result = sweep_stale_sessions(db)
+        finally:
+            db.close()
+        self.closed += result.closed
+        self.skipped += 1 if result.skipped else 0
+
+    def stats(self) -> dict:
+        return {
+            "timeout_minutes": settings.SESSION_TIMEOUT_MINUTES,
+            "closed": self.closed,
+            "skipped_runs": self.skipped,
+            "task": self.task.stats(),
+        }
+
+
+_sweeper = None
+
+
+def get_session_sweeper() -> SessionSweeper:
+    """Get the shared sweeper (runs every SESSION_SWEEP_INTERVAL_SECONDS once started)"""
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = SessionSweeper(settings.SESSION_SWEEP_INTERVAL_SECONDS)
+        register_stats("session_sweeper", _sweeper.stats)
+    return _sweeper
@@ -0,0 +1,240 @@
+"""
+Bulk user import service
+Validates every row up front, checks email/username uniqueness with one
+set-based query, hashes all passwords on the hashing pool in parallel and
+inserts in batches inside a single transaction. Returns a per-row report.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.auth.hashing_pool import PasswordHashingUnavailable, get_hashing_pool
+from app.auth.middleware import institution_scope
+from app.auth.principal_cache import AuthenticatedPrincipal
+from app.auth.security import validate_password_strength
+from app.config import settings
+from app.models.institution import Institution
+from app.models.user import User, UserRole
+from app.schemas.user import UserCreate, UserImportReport, UserImportRowResult
+from app.utils.logger import log_info, log_warning
+
+CSV_FIELDS = ("email", "username", "password", "role", "first_name", "last_name", "institution_id")
+
+
+def parse_user_rows(content: bytes, filename: Optional[str] = None, content_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Parse an import file into raw rows
+    
+    Args:
+        content: File contents (UTF-8, optional BOM)
+        filename: Original file name, used to detect the format
+        content_type: MIME type, used to detect the format
+    
+    Returns:
+        List of row dicts (unvalidated)
+    
+    Raises:
+        HTTPException: If the file cannot be parsed
+    """
+    try:
+        try:
+            text = content.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            # Excel exports Latin-1 / Windows-1252 by default
+            raise ValueError(f"file must be UTF-8 encoded (invalid byte at position {e.start})")
+        is_json = (filename or "").lower().endswith(".json") or "json" in (content_type or "")
+        if not is_json and not (filename or "").lower().endswith(".csv"):
+            is_json = text.lstrip()[:1] in ("[", "{")
+
+        if is_json:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                data = data.get("users", [])
+            if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+                raise ValueError("expected a list of user objects")
+            return data
+
+        reader = csv.DictReader(io.StringIO(text))
+        missing = {"email", "username", "password"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"missing CSV columns: {', '.join(sorted(missing))}")
+        return [
+            {key: (value.strip() if value else None) for key, value in row.items() if key in CSV_FIELDS}
+            for row in reader
+        ]
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid import file: {str(e)}")
+
+
+def import_users(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    creator: AuthenticatedPrincipal,
+    default_institution_id: Optional[int] = None,
+    dry_run: bool = False,
+    batch_size: int = 500
+) -> UserImportReport:
+    """
+    Create many users in one transaction
+    
+    Invalid rows are reported and skipped; valid rows are inserted together.
+    
+    Args:
+        db: Database session
+        rows: Raw rows from parse_user_rows
+        creator: Admin performing the import
+        default_institution_id: Institution for rows without one (admins default to their own)
+        dry_run: Validate only, do not hash or insert
+        batch_size: Rows per INSERT statement
+    
+    Returns:
+        Import report with one entry per input row
+    """
+    if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many rows ({len(rows)} > {settings.USER_IMPORT_MAX_ROWS})"
+        )
+
+    default_institution_id = institution_scope(creator, default_institution_id)
+
+    results = [UserImportRowResult(row=i + 1, status="error") for i in range(len(rows))]
+    candidates: Dict[int, UserCreate] = {}
+
+    # 1. Per-row validation (no queries)
+    for i, raw in enumerate(rows):
+        raw = {k: v for k, v in raw.items() if v not in (None, "")}
+        raw.setdefault("institution_id", default_institution_id)
+        results[i].email = raw.get("email")
+        results[i].username = raw.get("username")
+        try:
+            user_data = UserCreate.model_validate(raw)
+        except ValidationError as e:
+            results[i].errors = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+            continue
+
+        errors = []
+        is_valid, error_msg = validate_password_strength(user_data.password)
+        if not is_valid:
+            errors.append(error_msg)
+        if user_data.role == UserRole.SUPERADMIN:
+            errors.append("Superadmin users cannot be imported")
+        elif not user_data.institution_id:
+            errors.append("Institution ID required")
+        elif creator.role != UserRole.SUPERADMIN and user_data.institution_id != creator.institution_id:
+            errors.append("Cannot create user for different institution")
+
+        if errors:
+            results[i].errors = errors
+        else:
+            candidates[i] = user_data
+
+    # 2. Duplicates inside the file
+    seen_emails: Dict[str, int] = {}
+    seen_usernames: Dict[str, int] = {}
+    for i, user_data in list(candidates.items()):
+        errors = []
+        if user_data.email in seen_emails:
+            errors.append(f"Email duplicated in row {seen_emails[user_data.email] + 1}")
+        if user_data.username in seen_usernames:
+            errors.append(f"Username duplicated in row {seen_usernames[user_data.username] + 1}")
+        seen_emails.setdefault(user_data.email, i)
+        seen_usernames.setdefault(user_data.username, i)
+        if errors:
+            results[i].errors = errors
+            del candidates[i]
+
+    # 3. One query for existing emails/usernames, one for institutions
+    if candidates:
+        emails = {u.email for u in candidates.values()}
+        usernames = {u.username for u in candidates.values()}
+        taken = db.execute(
+            select(User.email, User.username).where(or_(User.email.in_(emails), User.username.in_(usernames)))
+        ).all()
+        taken_emails = {row.email for row in taken}
+        taken_usernames = {row.username for row in taken}
+
+        institution_ids = {u.institution_id for u in candidates.values()}
+        existing_institutions = set(
+            db.execute(select(Institution.id).where(Institution.id.in_(institution_ids))).scalars()
+        )
+
+        for i, user_data in list(candidates.items()):
+            errors = []
+            if user_data.email in taken_emails:
+                errors.append("Email already registered")
+            if user_data.username in taken_usernames:
+                errors.append("Username already taken")
+            if user_data.institution_id not in existing_institutions:
+                errors.append("Institution not found")
+            if errors:
+                results[i].errors = errors
+                del candidates[i]
+
+    if dry_run or not candidates:
+        for i in candidates:
+            results[i].status = "valid"
+        return _report(results, dry_run)
+
+    # 4. Hash every password across the process pool
+    order = sorted(candidates)
+    try:
+        hashes = get_hashing_pool().hash_many([candidates[i].password for i in order])
+    except PasswordHashingUnavailable as e:
+        log_warning(f"User import aborted, hashing unavailable: {e.reason}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password hashing temporarily unavailable, retry shortly",
+            headers={"Retry-After": "5"}
+        )
+
+    # 5. Batched INSERT ... RETURNING in a single transaction
+    values = [
+        {
+            "email": candidates[i].email,
+            "username": candidates[i].username,
+            "password_hash": password_hash,
+            "role": candidates[i].role,
+            "first_name": candidates[i].first_name,
+            "last_name": candidates[i].last_name,
+            "institution_id": candidates[i].institution_id,
+            "is_active": 1,
+        }
+        for i, password_hash in zip(order, hashes)
+    ]
+    stmt = insert(User).returning(User.id, User.email)
+    created_ids: Dict[str, int] = {}
+    try:
+        for start in range(0, len(values), batch_size):
+            for row in db.execute(stmt, values[start:start + batch_size]):
+                created_ids[row.email] = row.id
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Users were created concurrently with this import; nothing was imported, retry"
+        )
+
+    for i in order:
+        results[i].status = "created"
+        results[i].user_id = created_ids.get(candidates[i].email)
+
+    report = _report(results, dry_run)
+    log_info(f"User import by user {creator.id}: {report.created} created, {report.failed} failed")
+    return report
+
+
+def _report(results: List[UserImportRowResult], dry_run: bool) -> UserImportReport:
+    return UserImportReport(
+        total=len(results),
+        created=sum(1 for r in results if r.status == "created"),
+        failed=sum(1 for r in results if r.status == "error"),
+        dry_run=dry_run,
+        rows=results
+    )
@@ -1,95 +1,177 @@
 """
 User management service
+Functions take an AsyncSession and are used by routes running on the event
+loop (the bulk import, app.services.user_import, runs on a sync Session)
 """
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.user import User, UserRole
 from app.models.institution import Institution
 from app.schemas.user import UserCreate, UserUpdate
-from app.auth.security import get_password_hash, validate_password_strength
+from app.auth.security import validate_password_strength
+from app.auth.hashing_pool import PasswordHashingUnavailable, get_hashing_pool
+from app.auth.middleware import institution_scope
+from app.auth.principal_cache import invalidate_principal
 from app.utils.logger import log_info, log_error
+from app.utils.executors import Workload, run_in
+from app.utils.pagination import DEFAULT_PAGE_SIZE, keyset_page
 
+# Cursor namespace of user listings
+USERS_CURSOR = "users"
 
-def create_user(db: Session, user_data: UserCreate, creator: User) -> User:
-    """Create a new user"""
+
+def _validate_new_user(user_data: UserCreate, creator: User):
+    """Checks that need no database access"""
     # Validate password strength
     is_valid, error_msg = validate_password_strength(user_data.password)
     if not is_valid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
     
-    # Check if email already exists
-    existing = db.query(User).filter(User.email == user_data.email).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    
-    # Check username
-    existing = db.query(User).filter(User.username == user_data.username).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken")
+    if user_data.role == UserRole.SUPERADMIN and creator.role != UserRole.SUPERADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only a superadmin can create superadmins")
     
-    # Verify institution access
     if user_data.role != UserRole.SUPERADMIN:
         if not user_data.institution_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Institution ID required")
         
-        # Verify institution exists
-        institution = db.query(Institution).filter(Institution.id == user_data.institution_id).first()
-        if not institution:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Institution not found")
-        
         # Only superadmin or same institution admin can create users
-        if creator.role != UserRole.SUPERADMIN:
-            if creator.institution_id != user_data.institution_id:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot create user for different institution")
-    
-    # Create user
-    user = User(
-        email=user_data.email,
-        username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
-        role=user_data.role,
-        first_name=user_data.first_name,
-        last_name=user_data.last_name,
-        institution_id=user_data.institution_id
+        institution_scope(creator, user_data.institution_id)
+
+
+def _hashing_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Password hashing temporarily unavailable, retry shortly",
+        headers={"Retry-After": "1"}
     )
-    
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    
-    log_info(f"User created: {user.email} (role: {user.role})")
-    return user
 
 
-def get_users(db: Session, current_user: User, skip: int = 0, limit: int = 100) -> List[User]:
-    """Get list of users"""
-    query = db.query(User)
+def _users_query(
+    current_user: User,
+    institution_id: Optional[int] = None,
+    role: Optional[UserRole] = None,
+    is_active: Optional[int] = None
+):
+    """SELECT of the users the caller may list, with optional filters"""
+    query = select(User)
     
     # Filter by institution for non-superadmin
-    if current_user.role != UserRole.SUPERADMIN:
-        query = query.filter(User.institution_id == current_user.institution_id)
-    
-    return query.offset(skip).limit(limit).all()
+    institution_id = institution_scope(current_user, institution_id)
+    if institution_id is not None:
+        query = query.where(User.institution_id == institution_id)
+    if role is not None:
+        query = query.where(User.role == role)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    return query
 
 
-def update_user(db: Session, user_id: int, update_data: UserUpdate, current_user: User) -> User:
-    """Update user"""
-    user = db.query(User).filter(User.id == user_id).first()
+def _check_user_access(user: Optional[User], current_user: User) -> User:
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
     # Check permissions
-    if current_user.role != UserRole.SUPERADMIN:
-        if user.institution_id != current_user.institution_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    scope = institution_scope(current_user)
+    if scope is not None and user.institution_id != scope:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return user
+
+
+async def create_user_async(db: AsyncSession, user_data: UserCreate, creator: User) -> User:
+    """Create a new user (async session; one check query, one INSERT ... RETURNING)"""
+    _validate_new_user(user_data, creator)
+    
+    # Email, username and institution checks in a single round trip
+    email_taken, username_taken, institution_exists = (await db.execute(select(
+        exists().where(User.email == user_data.email),
+        exists().where(User.username == user_data.username),
+        exists().where(Institution.id == user_data.institution_id)
+    ))).one()
+    if email_taken:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    if username_taken:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken")
+    if user_data.role != UserRole.SUPERADMIN and not institution_exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Institution not found")
+    
+    try:
+        password_hash = await get_hashing_pool().hash_async(user_data.password)
+    except PasswordHashingUnavailable:
+        raise _hashing_unavailable()
+    
+    user = await db.scalar(
+        insert(User)
+        .values(
+            email=user_data.email,
+            username=user_data.username,
+            password_hash=password_hash,
+            role=user_data.role,
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            institution_id=user_data.institution_id
+        )
+        .returning(User)
+    )
+    await db.commit()
+    
+    log_info(f"User created: {user.email} (role: {user.role})")
+    return user
+
+
+async def get_users_async(
+    db: AsyncSession,
+    current_user: User,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    institution_id: Optional[int] = None,
+    role: Optional[UserRole] = None,
+    is_active: Optional[int] = None
+) -> Tuple[List[User], Optional[str]]:
+    """
+    Get one page of users, newest first (keyset pagination on created_at, id)
+    
+    Args:
+        db: Async database session
+        current_user: Caller; non-superadmins only see their institution
+        cursor: next_cursor of the previous page
+        limit: Page size
+        institution_id: Institution filter (superadmin; others get their own)
+        role: Role filter
+        is_active: Active flag filter
+    
+    Returns:
+        (users, next_cursor); next_cursor is None on the last page
+    """
+    return await keyset_page(
+        db, _users_query(current_user, institution_id, role, is_active),
+        USERS_CURSOR, User.created_at, User.id, cursor, limit
+    )
+
+
+async def update_user_async(db: AsyncSession, user_id: int, update_data: UserUpdate, current_user: User) -> User:
+    """Update user (async session, one UPDATE ... RETURNING)"""
+    values = update_data.dict(exclude_unset=True)
+    if values.get("role") == UserRole.SUPERADMIN and current_user.role != UserRole.SUPERADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only a superadmin can grant superadmin")
+    stmt = update(User).where(User.id == user_id)
+    institution_id = institution_scope(current_user)
+    if institution_id is not None:
+        stmt = stmt.where(User.institution_id == institution_id)
     
-    # Update fields
-    for field, value in update_data.dict(exclude_unset=True).items():
-        setattr(user, field, value)
+    user = await db.scalar(stmt.values(**values).returning(User)) if values else None
+    if user is None:
+        # Nothing to update, or no row matched: 404/403, nothing is written
+        user = _check_user_access(await db.get(User, user_id), current_user)
+        if values:
+            # Visible now, but changed or deleted concurrently before the UPDATE
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        return user
+    await db.commit()
     
-    db.commit()
-    db.refresh(user)
+    # Role, institution or active flag may have changed (the broadcast may hit Redis)
+    await run_in(Workload.DB, invalidate_principal, user.id)
     
     log_info(f"User updated: {user.email}")
     return user
@@ -1,7 +1,7 @@
 """
 Utilities package
 """
-from app.utils.logger import log_info, log_warning, log_error, log_debug, logger
+from app.utils.logger import log_info, log_warning, log_error, log_debug, logger, get_logger
 from app.utils.rate_limiter import limiter, get_limiter
 
 __all__ = [
@@ -10,6 +10,7 @@ __all__ = [
     "log_error",
     "log_debug",
     "logger",
+    "get_logger",
     "limiter",
     "get_limiter",
 ]
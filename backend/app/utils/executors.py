@@ -0,0 +1,161 @@
+"""
+Workload-isolated executors
+Blocking work runs on a dedicated, sized thread pool per workload class so a
+heavy admin query or a burst of logins cannot delay kiosk predictions.
+"""
+import asyncio
+import contextvars
+import enum
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from app.config import settings
+from app.utils.metrics import LatencyHistogram, register_stats
+
+
+class Workload(str, enum.Enum):
+    """Workload classes, one executor each"""
+    INFERENCE = "inference"  # Interactive LSP feature extraction and model calls
+    PASSWORD = "password"  # bcrypt hashing and verification
+    DB = "db"  # Request-scoped database I/O
+    BACKGROUND = "background"  # Reports, exports and periodic jobs
+
+
+class InstrumentedExecutor:
+    """ThreadPoolExecutor that tracks queue length and queue wait time"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self.wait_time = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        submitted_at = time.monotonic()
+        with self._lock:
+            self._queued += 1
+
+        def run():
+            started_at = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+            self.wait_time.observe(started_at - submitted_at)
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self._failed += 1
+                raise
+            finally:
+                self.run_time.observe(time.monotonic() - started_at)
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+            return result
+
+        return self._executor.submit(run)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "active": self._active,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_time": self.wait_time.snapshot(),
+                "run_time": self.run_time.snapshot(),
+            }
+
+
+_executors: Dict[Workload, InstrumentedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _executor_size(workload: Workload) -> int:
+    return {
+        Workload.INFERENCE: settings.EXECUTOR_INFERENCE_WORKERS,
+        Workload.PASSWORD: settings.EXECUTOR_PASSWORD_WORKERS,
+        Workload.DB: settings.EXECUTOR_DB_WORKERS,
+        Workload.BACKGROUND: settings.EXECUTOR_BACKGROUND_WORKERS,
+    }[workload]
+
+
+def get_executor(workload: Workload) -> InstrumentedExecutor:
+    """Get (creating on first use) the executor for a workload class"""
+    executor = _executors.get(workload)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(workload)
+            if executor is None:
+                executor = InstrumentedExecutor(workload.value, _executor_size(workload))
+                _executors[workload] = executor
+    return executor
+
+
+async def run_in(workload: Workload, fn: Callable, *args, **kwargs):
+    """
+    Run a blocking callable on the executor of a workload class
+
+    Args:
+        workload: Workload class to run under
+        fn: Blocking callable
+        *args, **kwargs: Arguments for fn
+
+    Returns:
+        Whatever fn returns
+    """
+    # Propagate contextvars (request-scoped state) like Starlette's run_in_threadpool
+    ctx = contextvars.copy_context()
+    future = get_executor(workload).submit(ctx.run, functools.partial(fn, *args, **kwargs))
+    return await asyncio.wrap_future(future)
+
+
+def workload(kind: Workload):
+    """
+    Declare the workload class of a sync route.
+    The route is exposed to FastAPI as async and its body runs on that class's executor.
+
+    Usage:
+        @router.post("/start")
+        @workload(Workload.DB)
+        def start_session(...): ...
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return await run_in(kind, endpoint, *args, **kwargs)
+
+        wrapper.workload = kind
+        return wrapper
+
+    return decorator
+
+
+def shutdown_executors(wait: bool = False):
+    """Shut down all executors (application shutdown)"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def executor_stats() -> dict:
+    return {workload.value: get_executor(workload).stats() for workload in Workload}
+
+
+register_stats("executors", executor_stats)
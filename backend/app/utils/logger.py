@@ -1,51 +1,204 @@
 """
 Centralized logging configuration
+Request threads and the event loop only put records on a bounded in-memory
+queue (QueueHandler); a single QueueListener thread formats them and does the
+console/file I/O. Records are JSON lines (LOG_FORMAT=json) or plain text, the
+log file rotates by size, and DEBUG records of noisy loggers can be sampled
+(LOG_SAMPLING) before they ever reach the queue.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
 from app.config import settings
+from app.utils.metrics import register_stats
 
-# Create logger
-logger = logging.getLogger("inclutalk")
-logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+ROOT_LOGGER = "inclutalk"
 
-# Create console handler
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG records per logger
+    Rates are matched on the longest logger-name prefix, e.g.
+    {"inclutalk.auth": 0.01} keeps 1% of DEBUG records from inclutalk.auth.*
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.sampled_out = 0
+
+    def _rate(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
 
-# Create file handler
-file_handler = logging.FileHandler(settings.LOG_FILE)
-file_handler.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not self.rates:
+            return True
+        if random.random() < self._rate(record.name):
+            return True
+        self.sampled_out += 1
+        return False
 
-# Create formatter
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback in the caller's thread (args may be
+        # mutated later), but leave formatting to the listener's handlers
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT.lower() == "json":
+        return JsonFormatter()
+    return logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+level = getattr(logging, settings.LOG_LEVEL.upper())
+formatter = _build_formatter()
+
+# Writer-side handlers (run on the listener thread only)
+console_handler = logging.StreamHandler(sys.stdout)
+console_handler.setLevel(level)
 console_handler.setFormatter(formatter)
+
+if settings.LOG_MAX_BYTES > 0:
+    file_handler = logging.handlers.RotatingFileHandler(
+        settings.LOG_FILE,
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+else:
+    file_handler = logging.FileHandler(settings.LOG_FILE, encoding="utf-8")
+file_handler.setLevel(level)
 file_handler.setFormatter(formatter)
 
-# Add handlers to logger
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+# Caller-side handler: sample, then enqueue without blocking
+log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+sampling_filter = SamplingFilter(settings.LOG_SAMPLING)
+queue_handler.addFilter(sampling_filter)
+
+listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+
+# Create logger
+logger = logging.getLogger(ROOT_LOGGER)
+logger.setLevel(level)
+logger.addHandler(queue_handler)
+logger.propagate = False
+
+_listener_lock = threading.Lock()
+_listener_running = False
+
+
+def start_logging():
+    """Start the writer thread (idempotent; done on import)"""
+    global _listener_running
+    with _listener_lock:
+        if not _listener_running:
+            listener.start()
+            _listener_running = True
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener_running
+    with _listener_lock:
+        if _listener_running:
+            listener.stop()
+            _listener_running = False
+
+
+start_logging()
+atexit.register(shutdown_logging)
+
+
+def logging_stats() -> dict:
+    return {
+        "queued": log_queue.qsize(),
+        "queue_size": log_queue.maxsize,
+        "dropped": queue_handler.dropped,
+        "sampled_out": sampling_filter.sampled_out,
+    }
+
+
+register_stats("logging", logging_stats)
+
+
+def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """Child logger of the app logger (e.g. get_logger("auth") -> inclutalk.auth)"""
+    return logger.getChild(name) if name else logger
 
 
-def log_info(message: str):
+def log_info(message: str, **fields):
     """Log info message"""
-    logger.info(message)
+    logger.info(message, extra=fields or None)
 
 
-def log_warning(message: str):
+def log_warning(message: str, **fields):
     """Log warning message"""
-    logger.warning(message)
+    logger.warning(message, extra=fields or None)
 
 
-def log_error(message: str, exc_info=False):
+def log_error(message: str, exc_info=False, **fields):
     """Log error message"""
-    logger.error(message, exc_info=exc_info)
+    logger.error(message, exc_info=exc_info, extra=fields or None)
 
 
-def log_debug(message: str):
+def log_debug(message: str, **fields):
     """Log debug message"""
-    logger.debug(message)
+    logger.debug(message, extra=fields or None)
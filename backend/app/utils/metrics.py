@@ -0,0 +1,76 @@
+"""
+In-process runtime metrics
+Components register a stats callback here and /metrics exposes them as JSON
+"""
+import threading
+from typing import Callable, Dict, List, Optional
+
+# Default latency buckets in milliseconds
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_registry: Dict[str, Callable[[], dict]] = {}
+_registry_lock = threading.Lock()
+
+
+class LatencyHistogram:
+    """Thread-safe cumulative latency histogram (milliseconds)"""
+
+    def __init__(self, buckets_ms: Optional[List[float]] = None):
+        self.buckets_ms = tuple(buckets_ms or DEFAULT_BUCKETS_MS)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one observation given in seconds"""
+        ms = seconds * 1000.0
+        with self._lock:
+            self._count += 1
+            self._sum_ms += ms
+            if ms > self._max_ms:
+                self._max_ms = ms
+            for i, bound in enumerate(self.buckets_ms):
+                if ms <= bound:
+                    self._counts[i] += 1
+                    break
+            else:
+                self._counts[-1] += 1
+
+    def snapshot(self) -> dict:
+        """Return count, sum, max and cumulative bucket counts"""
+        with self._lock:
+            cumulative = {}
+            running = 0
+            for bound, n in zip(self.buckets_ms, self._counts):
+                running += n
+                cumulative[str(bound)] = running
+            cumulative["+Inf"] = running + self._counts[-1]
+            return {
+                "count": self._count,
+                "sum_ms": round(self._sum_ms, 3),
+                "avg_ms": round(self._sum_ms / self._count, 3) if self._count else 0.0,
+                "max_ms": round(self._max_ms, 3),
+                "buckets": cumulative,
+            }
+
+
+def register_stats(name: str, provider: Callable[[], dict]):
+    """Register (or replace) a stats provider under a name"""
+    with _registry_lock:
+        _registry[name] = provider
+
+
+def collect_stats() -> Dict[str, dict]:
+    """Collect a snapshot from every registered provider"""
+    with _registry_lock:
+        providers = list(_registry.items())
+
+    stats = {}
+    for name, provider in providers:
+        try:
+            stats[name] = provider()
+        except Exception as e:
+            stats[name] = {"error": str(e)}
+    return stats
@@ -0,0 +1,112 @@
+"""
+Keyset (cursor) pagination
+Pages are ordered newest first by (timestamp, id) and continue with a row-value
+comparison, (ts, id) < (last_ts, last_id), so every page is a bounded index
+range scan no matter how deep it is (OFFSET reads and discards every row
+before the page). Cursors are opaque: base64 of the last row's key, signed
+with SECRET_KEY so clients cannot forge positions or reuse a cursor across
+listings.
+"""
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Truncated HMAC-SHA256; enough to reject tampered cursors
+_SIGNATURE_BYTES = 12
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(settings.SECRET_KEY.encode(), payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(kind: str, ts: datetime, row_id: int) -> str:
+    """Opaque cursor for the position after the row (ts, row_id) of a `kind` listing"""
+    payload = json.dumps([kind, ts.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(_sign(payload) + payload).rstrip(b"=").decode()
+
+
+def decode_cursor(kind: str, cursor: str) -> Tuple[datetime, int]:
+    """
+    Position stored in a cursor
+    
+    Args:
+        kind: Listing the cursor must belong to
+        cursor: Token from a previous page's next_cursor
+    
+    Returns:
+        (timestamp, id) of the last row of that page
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed, forged or from another listing
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        signature, payload = raw[:_SIGNATURE_BYTES], raw[_SIGNATURE_BYTES:]
+        if hmac.compare_digest(signature, _sign(payload)):
+            cursor_kind, ts, row_id = json.loads(payload)
+            if cursor_kind == kind:
+                return datetime.fromisoformat(ts), int(row_id)
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_select(query: Select, kind: str, ts_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """Order `query` newest first, continue after `cursor`, fetch one row past the page"""
+    if cursor:
+        query = query.where(tuple_(ts_column, id_column) < tuple_(*decode_cursor(kind, cursor)))
+    # The extra row tells whether another page exists without a COUNT
+    return query.order_by(ts_column.desc(), id_column.desc()).limit(page_size(limit) + 1)
+
+
+def keyset_result(rows: Sequence[Any], kind: str, ts_column, id_column, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Split the rows of keyset_select() into the page and the cursor of the next one"""
+    limit = page_size(limit)
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = list(rows[:limit])
+    last = rows[-1]
+    return rows, encode_cursor(kind, getattr(last, ts_column.key), getattr(last, id_column.key))
+
+
+def page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+async def keyset_page(
+    db: AsyncSession,
+    query: Select,
+    kind: str,
+    ts_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of `query`, newest first
+    
+    Args:
+        db: Async database session
+        query: SELECT of one ORM entity, already filtered and scoped
+        kind: Cursor namespace (one per listing)
+        ts_column: Timestamp column of the sort key (NOT NULL in practice)
+        id_column: Primary key, breaks ties between equal timestamps
+        cursor: next_cursor of the previous page (None for the first page)
+        limit: Page size (clamped to MAX_PAGE_SIZE)
+    
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    stmt = keyset_select(query, kind, ts_column, id_column, cursor, limit)
+    rows = (await db.execute(stmt)).scalars().all()
+    return keyset_result(rows, kind, ts_column, id_column, limit)
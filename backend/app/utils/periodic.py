@@ -0,0 +1,86 @@
+"""
+Periodic background tasks
+Runs a callable every `interval` seconds on a daemon thread, for jobs that use
+the sync database engine (write-behind flushes, rollups, sweepers). stop()
+wakes the thread and, optionally, runs the callable one last time.
+"""
+import threading
+import time
+from typing import Callable, Optional
+from app.utils.logger import log_error, log_info
+from app.utils.metrics import LatencyHistogram
+
+
+class PeriodicTask:
+    """Call `fn()` every `interval` seconds until stopped"""
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], object]):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+        self.runs = 0
+        self.errors = 0
+        self.duration = LatencyHistogram()
+
+    def start(self, run_now: bool = False):
+        """
+        Start the background thread (no-op if already running)
+        
+        Args:
+            run_now: First run right away instead of after one interval (for
+                long intervals that restarts would otherwise keep postponing)
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(run_now,), name=f"periodic-{self.name}", daemon=True
+        )
+        self._thread.start()
+        log_info(f"Periodic task '{self.name}' started (every {self.interval:g}s)")
+
+    def _loop(self, run_now: bool = False):
+        if run_now:
+            self.run_once()
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self):
+        """Run the callable now (serialized with the background runs)"""
+        with self._run_lock:
+            started = time.perf_counter()
+            try:
+                self.fn()
+            except Exception as e:
+                self.errors += 1
+                log_error(f"Periodic task '{self.name}' failed: {str(e)}", exc_info=True)
+            finally:
+                self.runs += 1
+                self.duration.observe(time.perf_counter() - started)
+
+    def stop(self, run_final: bool = True, timeout: float = 10.0):
+        """
+        Stop the background thread
+        
+        Args:
+            run_final: Run the callable once more after the thread exits
+            timeout: Seconds to wait for a run in progress
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if run_final:
+            self.run_once()
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "runs": self.runs,
+            "errors": self.errors,
+            "duration": self.duration.snapshot(),
+        }
@@ -0,0 +1,97 @@
+"""
+Cross-worker event broadcast
+Redis pub/sub when Redis is configured, otherwise an in-process stand-in
+(enough for a single uvicorn worker or local development)
+"""
+import json
+import threading
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from app.utils.logger import log_error, log_warning
+from app.utils.redis_client import get_redis
+
+CHANNEL = "inclutalk:events"
+
+# Identifies this process so it can ignore its own echoes
+_ORIGIN = uuid.uuid4().hex
+
+
+class Broadcaster:
+    """In-process broadcaster: handlers of this process only"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, handler: Callable[[dict], None]):
+        """Call handler(data) for every event published on topic"""
+        with self._lock:
+            self._handlers[topic].append(handler)
+
+    def publish(self, topic: str, data: dict):
+        """Deliver locally right away, then to other workers"""
+        self._dispatch(topic, data)
+        self._send(topic, data)
+
+    def _dispatch(self, topic: str, data: dict):
+        with self._lock:
+            handlers = list(self._handlers.get(topic, ()))
+        for handler in handlers:
+            try:
+                handler(data)
+            except Exception as e:
+                log_error(f"Event handler for '{topic}' failed: {str(e)}", exc_info=True)
+
+    def _send(self, topic: str, data: dict):
+        pass
+
+
+class RedisBroadcaster(Broadcaster):
+    """Broadcaster that also fans events out to other workers through Redis pub/sub"""
+
+    def __init__(self, client):
+        super().__init__()
+        self._client = client
+        self._listener = None
+
+    def subscribe(self, topic: str, handler: Callable[[dict], None]):
+        super().subscribe(topic, handler)
+        self._ensure_listener()
+
+    def _ensure_listener(self):
+        if self._listener is not None:
+            return
+        try:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CHANNEL: self._on_message})
+            self._listener = pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+        except Exception as e:
+            log_warning(f"Redis pub/sub unavailable, events stay local to this worker: {str(e)}")
+
+    def _on_message(self, message: dict):
+        try:
+            event = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if event.get("origin") == _ORIGIN:
+            return
+        self._dispatch(event.get("topic", ""), event.get("data") or {})
+
+    def _send(self, topic: str, data: dict):
+        try:
+            self._client.publish(CHANNEL, json.dumps({"origin": _ORIGIN, "topic": topic, "data": data}))
+        except Exception as e:
+            log_warning(f"Could not publish '{topic}' to Redis: {str(e)}")
+
+
+_broadcaster: Optional[Broadcaster] = None
+
+
+def get_broadcaster() -> Broadcaster:
+    """Get the process-wide broadcaster"""
+    global _broadcaster
+    if _broadcaster is None:
+        client = get_redis()
+        _broadcaster = RedisBroadcaster(client) if client is not None else Broadcaster()
+    return _broadcaster
@@ -0,0 +1,147 @@
+"""
+Per-request database query counting and timing
+SQLAlchemy cursor events on both engines add every statement to the stats of
+the current request (a contextvar set by the HTTP middleware in main.py).
+Per-endpoint totals are exposed under /metrics; `count_queries` /
+`assert_query_budget` capture the statements run inside a block, for tests
+and query-budget checks.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.metrics import LatencyHistogram, register_stats
+
+
+@dataclass
+class QueryStats:
+    """Statements run during one request (or one capture block)"""
+    count: int = 0
+    elapsed: float = 0.0
+    statements: List[str] = field(default_factory=list)
+    keep_statements: bool = False
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.elapsed += elapsed
+        if self.keep_statements:
+            self.statements.append(statement)
+
+
+# Most statements take well under the default 5 ms first bucket
+DB_TIME_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    elapsed = time.perf_counter() - started
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _captures:
+        with _captures_lock:
+            for capture in _captures:
+                capture.record(statement, elapsed)
+
+
+def instrument_engine(engine: Engine):
+    """Count the statements of a (sync) engine; pass async_engine.sync_engine for async"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def begin_request() -> QueryStats:
+    """Start counting for the current request (middleware)"""
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+class EndpointQueryStats:
+    """Per-endpoint query count and DB time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, dict] = {}
+
+    def observe(self, endpoint: str, stats: QueryStats):
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    "requests": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "db_time": LatencyHistogram(DB_TIME_BUCKETS_MS),
+                }
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+        entry["db_time"].observe(stats.elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": e["requests"],
+                    "avg_queries": round(e["queries"] / e["requests"], 2) if e["requests"] else 0.0,
+                    "max_queries": e["max_queries"],
+                    "db_time": e["db_time"].snapshot(),
+                }
+                for endpoint, e in self._endpoints.items()
+            }
+
+
+endpoint_query_stats = EndpointQueryStats()
+register_stats("db_queries", endpoint_query_stats.stats)
+
+
+@contextmanager
+def count_queries():
+    """
+    Capture every statement run (by any request or thread) inside the block
+
+    Usage:
+        with count_queries() as stats:
+            client.get("/api/v1/auth/me", headers=...)
+        print(stats.count, stats.statements)
+    """
+    stats = QueryStats(keep_statements=True)
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, label: str = ""):
+    """
+    Fail (AssertionError) if the block runs more than `max_queries` statements
+
+    Usage:
+        with assert_query_budget(2, "POST /sessions/start"):
+            client.post("/api/v1/sessions/start", headers=...)
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        listing = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(stats.statements))
+        raise AssertionError(
+            f"{label or 'block'} ran {stats.count} queries (budget {max_queries}):\n{listing}"
+        )
@@ -1,16 +1,239 @@
 """
 Rate limiting utilities
+Token buckets keyed by caller (user, device, institution or login email)
+with a budget per route group. With Redis configured every worker shares the
+buckets through one atomic Lua script per check; otherwise, or while Redis is
+unreachable, each worker keeps its own buckets in memory. Async routes use
+check_async(), which runs the Redis round trip on the DB executor so a slow
+Redis never stalls the event loop.
 """
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, status
 from app.config import settings
+from app.utils.logger import log_warning
+from app.utils.executors import Workload, run_in
+from app.utils.metrics import register_stats
+from app.utils.redis_client import get_redis
+
+REDIS_KEY_PREFIX = "inclutalk:rl"
+
+# After a Redis error, use the local buckets for this long before retrying
+REDIS_RETRY_SECONDS = 5.0
+
+# KEYS[1] bucket; ARGV: refill rate (tokens/s), capacity, cost.
+# Uses the Redis clock so workers never disagree on elapsed time; floats are
+# returned as strings (Lua numbers are truncated to integers otherwise).
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Sustained rate and burst size of one route group"""
+    name: str
+    per_minute: int
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0 and self.burst > 0
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+BUDGETS: Dict[str, Budget] = {
+    "predict": Budget("predict", settings.RATE_LIMIT_PREDICT_PER_MINUTE, settings.RATE_LIMIT_PREDICT_BURST),
+    "predict_institution": Budget(
+        "predict_institution",
+        settings.RATE_LIMIT_PREDICT_INSTITUTION_PER_MINUTE,
+        settings.RATE_LIMIT_PREDICT_INSTITUTION_BURST
+    ),
+    "login": Budget("login", settings.RATE_LIMIT_LOGIN_PER_MINUTE, settings.RATE_LIMIT_LOGIN_BURST),
+    "login_ip": Budget("login_ip", settings.RATE_LIMIT_LOGIN_IP_PER_MINUTE, settings.RATE_LIMIT_LOGIN_IP_BURST),
+    "sessions": Budget("sessions", settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_SESSIONS_BURST),
+}
+
+
+class LocalBuckets:
+    """In-process token buckets (LRU-bounded; an evicted bucket starts full again)"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max(1, max_keys)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, budget: Budget, cost: float = 1.0) -> RateLimitDecision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (budget.burst, now))
+            tokens = min(budget.burst, tokens + (now - ts) * budget.rate)
+            if tokens >= cost:
+                tokens -= cost
+                decision = RateLimitDecision(True, tokens, 0.0)
+            else:
+                decision = RateLimitDecision(False, tokens, (cost - tokens) / budget.rate)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return decision
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class TokenBucketLimiter:
+    """Token-bucket limiter on Redis with an in-process fallback"""
+
+    def __init__(self, enabled: bool = True, local_max_keys: int = 100000):
+        self.enabled = enabled
+        self.local = LocalBuckets(local_max_keys)
+        self._script = None
+        self._redis_down_until = 0.0
+        self._lock = threading.Lock()
+        self._allowed: Dict[str, int] = {}
+        self._rejected: Dict[str, int] = {}
+        self._redis_errors = 0
+
+    def _redis_usable(self) -> bool:
+        return time.monotonic() >= self._redis_down_until and get_redis() is not None
+
+    def _redis_hit(self, key: str, budget: Budget, cost: float) -> Optional[RateLimitDecision]:
+        if not self._redis_usable():
+            return None
+        client = get_redis()
+        try:
+            if self._script is None:
+                self._script = client.register_script(TOKEN_BUCKET_LUA)
+            allowed, remaining, retry_after = self._script(
+                keys=[f"{REDIS_KEY_PREFIX}:{budget.name}:{key}"],
+                args=[budget.rate, budget.burst, cost],
+                client=client
+            )
+            return RateLimitDecision(bool(int(allowed)), float(remaining), float(retry_after))
+        except Exception as e:
+            with self._lock:
+                self._redis_errors += 1
+            self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+            log_warning(f"Rate limiter falling back to local buckets for {REDIS_RETRY_SECONDS:.0f}s: {str(e)}")
+            return None
+
+    def _decide(self, budget: Budget, key: str, cost: float, use_redis: bool) -> RateLimitDecision:
+        decision = (use_redis and self._redis_hit(key, budget, cost)) or self.local.hit(f"{budget.name}:{key}", budget, cost)
+        counters = self._allowed if decision.allowed else self._rejected
+        with self._lock:
+            counters[budget.name] = counters.get(budget.name, 0) + 1
+        return decision
+
+    def hit(self, budget_name: str, key: str, cost: float = 1.0) -> RateLimitDecision:
+        """
+        Take `cost` tokens from the caller's bucket (blocks on Redis; see hit_async)
+        
+        Args:
+            budget_name: Key of BUDGETS
+            key: Caller identity, e.g. "user:42" or "dev:3:kiosk-1"
+            cost: Tokens this request consumes
+        
+        Returns:
+            Decision (allowed, tokens left, seconds until enough tokens)
+        """
+        budget = BUDGETS[budget_name]
+        if not (self.enabled and budget.enabled):
+            return RateLimitDecision(True, float(budget.burst), 0.0)
+        return self._decide(budget, key, cost, use_redis=True)
+
+    async def hit_async(self, budget_name: str, key: str, cost: float = 1.0) -> RateLimitDecision:
+        """hit() for the event loop: the Redis script runs on the DB executor, local buckets inline"""
+        budget = BUDGETS[budget_name]
+        if not (self.enabled and budget.enabled):
+            return RateLimitDecision(True, float(budget.burst), 0.0)
+        if not self._redis_usable():
+            return self._decide(budget, key, cost, use_redis=False)
+        return await run_in(Workload.DB, self._decide, budget, key, cost, True)
+
+    @staticmethod
+    def _enforce(budget_name: str, decision: RateLimitDecision) -> RateLimitDecision:
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded ({budget_name}), retry shortly",
+                headers={"Retry-After": str(max(1, int(decision.retry_after + 0.999)))}
+            )
+        return decision
+
+    def check(self, budget_name: str, key: str, cost: float = 1.0):
+        """
+        Like hit(), but raises 429 with Retry-After when the bucket is empty
+        
+        Raises:
+            HTTPException: If the caller is over budget
+        """
+        return self._enforce(budget_name, self.hit(budget_name, key, cost))
+
+    async def check_async(self, budget_name: str, key: str, cost: float = 1.0):
+        """
+        check() for async routes and dependencies (never blocks the event loop on Redis)
+        
+        Raises:
+            HTTPException: If the caller is over budget
+        """
+        return self._enforce(budget_name, await self.hit_async(budget_name, key, cost))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": "redis" if self._redis_usable() else "local",
+                "allowed": dict(self._allowed),
+                "rejected": dict(self._rejected),
+                "redis_errors": self._redis_errors,
+                "local_buckets": len(self.local),
+                "budgets": {
+                    name: {"per_minute": b.per_minute, "burst": b.burst}
+                    for name, b in BUDGETS.items()
+                },
+            }
+
 
 # Initialize rate limiter
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=[f"{settings.RATE_LIMIT_PER_MINUTE}/minute"] if settings.RATE_LIMIT_ENABLED else [],
-    enabled=settings.RATE_LIMIT_ENABLED
+limiter = TokenBucketLimiter(
+    enabled=settings.RATE_LIMIT_ENABLED,
+    local_max_keys=settings.RATE_LIMIT_LOCAL_MAX_KEYS
 )
+register_stats("rate_limits", limiter.stats)
 
 
 def get_limiter():
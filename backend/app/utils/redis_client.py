@@ -0,0 +1,34 @@
+"""
+Shared Redis client (optional)
+Returns None unless REDIS_ENABLED, REDIS_URL and the redis package are all present
+"""
+from typing import Optional
+from app.config import settings
+from app.utils.logger import log_info, log_warning
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+_client: Optional["redis.Redis"] = None
+
+
+def get_redis() -> Optional["redis.Redis"]:
+    """Get the shared Redis client, or None when Redis is not configured"""
+    global _client
+    if not (settings.REDIS_ENABLED and settings.REDIS_URL):
+        return None
+    if not REDIS_AVAILABLE:
+        log_warning("REDIS_ENABLED=True but the redis package is not installed. Using in-process fallbacks.")
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=1.0,
+            socket_connect_timeout=1.0,
+            decode_responses=True
+        )
+        log_info("Redis client configured")
+    return _client
@@ -0,0 +1 @@
+"""Benchmark suite (run from backend/: python benchmarks/<bench>.py --help)"""
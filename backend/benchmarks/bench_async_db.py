@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Async vs sync database access load test
+
+Serves the same principal lookup (`SELECT ... FROM users WHERE id = ?`, plus an
+optional server-side delay via pg_sleep to emulate a slow database) three ways
+from one in-process ASGI app, and hammers each with `--concurrency` clients:
+- sync_on_loop:    async route calling the sync Session directly (what
+                   get_current_user used to do; blocks the event loop)
+- sync_threadpool: sync route (FastAPI thread pool + sync Session)
+- async:           async route on the asyncpg engine (AsyncSession)
+
+For each mode it reports throughput, request p50/p99 and event-loop lag
+(p99/max overshoot of a 10 ms ticker), which is what other requests on the
+same worker feel while the database is busy.
+
+Needs a reachable PostgreSQL (DATABASE_URL) with at least one user.
+
+Usage:
+    python benchmarks/bench_async_db.py --concurrency 200 --requests 5000
+    python benchmarks/bench_async_db.py --query-delay-ms 5 --baseline benchmarks/baselines/async_db.json
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (
+    bootstrap_app_env,
+    compare_to_baseline,
+    load_results,
+    percentile,
+    print_table,
+    save_results,
+    summarize,
+)
+
+MODES = ("sync_on_loop", "sync_threadpool", "async")
+TICK_SECONDS = 0.010
+
+
+def build_app(delay_s: float):
+    from fastapi import FastAPI
+    from sqlalchemy import func, select
+    from app.database import AsyncSessionLocal, SessionLocal
+    from app.models.user import User
+
+    app = FastAPI()
+
+    def statement(user_id: int):
+        stmt = select(User.id, User.role, User.institution_id, User.is_active).where(User.id == user_id)
+        if delay_s:
+            stmt = stmt.add_columns(func.pg_sleep(delay_s))
+        return stmt
+
+    def lookup_sync(user_id: int):
+        db = SessionLocal()
+        try:
+            return db.execute(statement(user_id)).first() is not None
+        finally:
+            db.close()
+
+    @app.get("/sync_on_loop/{user_id}")
+    async def sync_on_loop(user_id: int):
+        return {"found": lookup_sync(user_id)}
+
+    @app.get("/sync_threadpool/{user_id}")
+    def sync_threadpool(user_id: int):
+        return {"found": lookup_sync(user_id)}
+
+    @app.get("/async/{user_id}")
+    async def async_lookup(user_id: int):
+        async with AsyncSessionLocal() as db:
+            return {"found": (await db.execute(statement(user_id))).first() is not None}
+
+    return app
+
+
+async def _loop_lag(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - t0 - TICK_SECONDS))
+
+
+async def run_mode(client, mode: str, user_id: int, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            t0 = time.perf_counter()
+            response = await client.get(f"/{mode}/{user_id}")
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                errors += 1
+
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(_loop_lag(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    row = summarize(latencies)
+    lags.sort()
+    row.update({
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "loop_lag_p99_ms": round(percentile(lags, 0.99) * 1000, 3),
+        "loop_lag_max_ms": round((lags[-1] if lags else 0.0) * 1000, 3),
+    })
+    return row
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal, async_engine, engine
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        user_id = (await db.execute(select(User.id).limit(1))).scalar_one_or_none()
+    if user_id is None:
+        raise SystemExit("No users in the database; run scripts/seed_data.py first")
+
+    app = build_app(args.query_delay_ms / 1000)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in args.modes:
+            await run_mode(client, mode, user_id, min(200, args.requests), min(20, args.concurrency))  # warm pools
+            results[f"{mode}/c={args.concurrency}"] = await run_mode(
+                client, mode, user_id, args.requests, args.concurrency
+            )
+
+    await async_engine.dispose()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag and throughput: sync vs async DB access")
+    parser.add_argument("--modes", default=",".join(MODES), type=lambda v: [m for m in v.split(",") if m])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--query-delay-ms", type=float, default=2.0, help="Server-side pg_sleep per query")
+    parser.add_argument("--output", default="bench_results/async_db.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING")
+    results = asyncio.run(run(args))
+
+    print_table(results, columns=("throughput_per_s", "p50_ms", "p99_ms", "loop_lag_p99_ms", "loop_lag_max_ms", "errors"))
+
+    params = vars(args)
+    save_results(args.output, "async_db", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "async_db", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results, load_results(args.baseline), tolerance=args.tolerance, metrics=("p50_ms", "p99_ms", "loop_lag_p99_ms")
+        )
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Bulk user import benchmark
+
+Creates N users (default 1,000) in a throwaway institution two ways:
+- per_user: create_user_async() once per row, what POST /users does
+            (uniqueness/institution check, one bcrypt hash, INSERT and
+            commit per user)
+- bulk:     import_users() (one uniqueness query, hash_many on the process
+            pool, batched INSERT ... RETURNING, one commit)
+
+Needs a reachable PostgreSQL (DATABASE_URL). Everything created is deleted at
+the end. Reports total seconds and users/s per mode, and the speedup.
+
+Usage:
+    python benchmarks/bench_bulk_import.py --users 1000
+    python benchmarks/bench_bulk_import.py --users 200 --modes bulk --baseline benchmarks/baselines/bulk_import.json
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import bootstrap_app_env, compare_to_baseline, load_results, print_table, save_results
+
+
+def _rows(prefix: str, count: int, institution_id: int):
+    return [
+        {
+            "email": f"{prefix}-{i}@bench.inclutalk.com",
+            "username": f"{prefix}-{i}",
+            "password": f"Bench{i:05d}Pass!",
+            "role": "operator",
+            "first_name": "Bench",
+            "last_name": str(i),
+            "institution_id": institution_id,
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-user creation vs bulk import")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--modes", default="per_user,bulk", help="Comma-separated: per_user, bulk")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--output", default="bench_results/bulk_import.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING")
+
+    from app.database import AsyncSessionLocal, SessionLocal
+    from app.models.institution import Institution
+    from app.models.user import UserRole
+    from app.auth.hashing_pool import get_hashing_pool
+    from app.auth.principal_cache import AuthenticatedPrincipal
+    from app.schemas.user import UserCreate
+    from app.services.user_service import create_user_async
+    from app.services.user_import import import_users
+
+    creator = AuthenticatedPrincipal(id=0, role=UserRole.SUPERADMIN, institution_id=None, is_active=1)
+
+    async def create_one_by_one(rows):
+        async with AsyncSessionLocal() as adb:
+            for row in rows:
+                await create_user_async(adb, UserCreate.model_validate(row), creator)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    db = SessionLocal()
+    institution = Institution(name=f"bench-import-{uuid.uuid4().hex[:8]}")
+    db.add(institution)
+    db.commit()
+
+    results = {}
+    try:
+        # Spawn hashing workers outside the timed region
+        get_hashing_pool().hash_many(["Warmup123!"] * 4)
+
+        for mode in modes:
+            rows = _rows(f"{mode}-{uuid.uuid4().hex[:6]}", args.users, institution.id)
+            started = time.perf_counter()
+            if mode == "per_user":
+                asyncio.run(create_one_by_one(rows))
+                created = len(rows)
+            elif mode == "bulk":
+                report = import_users(db, rows, creator, batch_size=args.batch_size)
+                created = report.created
+            else:
+                raise SystemExit(f"Unknown mode: {mode}")
+            elapsed = time.perf_counter() - started
+            results[f"{mode}/users={args.users}"] = {
+                "created": created,
+                "seconds": round(elapsed, 3),
+                "users_per_s": round(created / elapsed, 2) if elapsed else 0.0,
+            }
+    finally:
+        # Users go with the institution (ON DELETE CASCADE)
+        db.delete(institution)
+        db.commit()
+        db.close()
+        get_hashing_pool().shutdown()
+
+    print_table(results, columns=("created", "seconds", "users_per_s"))
+    per_user = results.get(f"per_user/users={args.users}")
+    bulk = results.get(f"bulk/users={args.users}")
+    if per_user and bulk and bulk["seconds"]:
+        print(f"\nbulk speedup: {per_user['seconds'] / bulk['seconds']:.1f}x")
+
+    params = vars(args)
+    save_results(args.output, "bulk_import", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "bulk_import", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results, load_results(args.baseline), tolerance=args.tolerance, metrics=("seconds",)
+        )
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
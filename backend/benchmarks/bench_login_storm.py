@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Login storm benchmark
+
+Checks that a burst of logins (bcrypt) does not degrade unrelated requests.
+Runs against a live server:
+- baseline: steady /lsp/predict traffic alone
+- storm:    the same predict traffic while `--logins` concurrent logins hammer /auth/login
+
+Reports p50/p99 predict latency per phase (plus login latency and status codes
+during the storm). With the hashing pool enabled, predict p99 in the storm phase
+should stay close to the baseline; with PASSWORD_HASH_POOL_ENABLED=False it
+shows how much bcrypt steals from the request path.
+
+Usage:
+    uvicorn app.main:app --port 8000 &
+    python benchmarks/bench_login_storm.py --email admin@inclutalk.com --password 'Admin123!'
+    python benchmarks/bench_login_storm.py --logins 200 --baseline benchmarks/baselines/login_storm.json
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.common import compare_to_baseline, load_results, print_table, save_results, summarize
+from benchmarks.synthetic import LandmarkGenerator
+
+
+async def _predict_loop(client: httpx.AsyncClient, url: str, payloads, stop: asyncio.Event, latencies, statuses):
+    i = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        response = await client.post(url, json=payloads[i % len(payloads)])
+        latencies.append(time.perf_counter() - t0)
+        statuses[response.status_code] += 1
+        i += 1
+
+
+async def _predict_phase(client, url, payloads, concurrency: int, duration: float, during=None):
+    """Run predict traffic for `duration` seconds, optionally alongside `during` (a coroutine)"""
+    stop = asyncio.Event()
+    latencies, statuses = [], Counter()
+    loops = [asyncio.create_task(_predict_loop(client, url, payloads, stop, latencies, statuses)) for _ in range(concurrency)]
+    extra = None
+    if during is not None:
+        extra = await during  # the storm itself lasts at least `duration`
+    else:
+        await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*loops)
+    return latencies, statuses, extra
+
+
+async def _login_burst(client: httpx.AsyncClient, url: str, email: str, password: str, count: int, min_time: float):
+    """Fire `count` logins at once (repeating until min_time elapsed); return latencies and statuses"""
+    latencies, statuses = [], Counter()
+
+    async def one():
+        t0 = time.perf_counter()
+        response = await client.post(url, json={"email": email, "password": password})
+        latencies.append(time.perf_counter() - t0)
+        statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    while True:
+        await asyncio.gather(*(one() for _ in range(count)))
+        if time.perf_counter() - started >= min_time:
+            break
+    return latencies, statuses
+
+
+async def run(args):
+    base = args.url.rstrip("/") + args.prefix
+    predict_url = f"{base}/lsp/predict"
+    login_url = f"{base}/auth/login"
+    payloads = LandmarkGenerator(seed=args.seed).sequences(32)
+
+    limits = httpx.Limits(max_connections=args.concurrency + args.logins + 8)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        # Warm up the model and connection pool
+        await _predict_phase(client, predict_url, payloads, args.concurrency, 1.0)
+
+        baseline_lat, baseline_status, _ = await _predict_phase(
+            client, predict_url, payloads, args.concurrency, args.duration
+        )
+        storm = _login_burst(client, login_url, args.email, args.password, args.logins, args.duration)
+        storm_lat, storm_status, (login_lat, login_status) = await _predict_phase(
+            client, predict_url, payloads, args.concurrency, args.duration, during=storm
+        )
+
+    results = {
+        "predict/baseline": {**summarize(baseline_lat), "status": dict(baseline_status)},
+        "predict/storm": {**summarize(storm_lat), "status": dict(storm_status)},
+        "login/storm": {**summarize(login_lat), "status": dict(login_status)},
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict latency under a concurrent login storm")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--prefix", default="/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=100, help="Concurrent logins per burst")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent predict clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results/login_storm.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print_table(results, columns=("calls", "p50_ms", "p99_ms", "throughput_per_s"))
+    for case, row in results.items():
+        print(f"{case}: status codes {row['status']}")
+    base_p99 = results["predict/baseline"]["p99_ms"]
+    if base_p99:
+        print(f"\npredict p99 storm/baseline: {results['predict/storm']['p99_ms'] / base_p99:.2f}x")
+
+    params = {k: v for k, v in vars(args).items() if k != "password"}
+    save_results(args.output, "login_storm", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "login_storm", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_results(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
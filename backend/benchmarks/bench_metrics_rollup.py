@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Daily metrics rollup benchmark
+
+Generates `--sessions` ended sessions (default 2,000,000) spread over
+`--institutions` throwaway institutions and `--days` days with one
+INSERT ... SELECT generate_series, then times:
+- backfill:              every day of the range, --chunk-days per transaction
+- incremental/initial:   first incremental pass (no high-water mark yet)
+- incremental/idle:      second pass, nothing changed
+- incremental/touched=N: after updating N% of the sessions
+
+Needs a reachable PostgreSQL (DATABASE_URL) migrated to revision 002.
+Everything created is deleted at the end (sessions and metrics_daily rows go
+with the institutions).
+
+Usage:
+    python benchmarks/bench_metrics_rollup.py --sessions 2000000
+    python benchmarks/bench_metrics_rollup.py --sessions 200000 --baseline benchmarks/baselines/metrics_rollup.json
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import bootstrap_app_env, compare_to_baseline, load_results, print_table, save_results
+
+GENERATE_SQL = """
+INSERT INTO sessions (
+    institution_id, started_at, ended_at, updated_at, turns_count, stt_attempts,
+    lsp_attempts, lsp_failed_attempts, text_fallback_count, avg_confidence, total_duration_seconds
+)
+SELECT
+    (:ids)[1 + g % :k],
+    started,
+    started + make_interval(secs => duration),
+    started + make_interval(secs => duration),
+    g % 12, g % 5, attempts, attempts / 4, g % 3,
+    0.5 + (g % 50) / 100.0,
+    duration
+FROM (
+    SELECT g,
+           now() - make_interval(secs => (g::bigint * 7919) % (:days * 86400)) AS started,
+           60 + g % 900 AS duration,
+           g % 20 AS attempts
+    FROM generate_series(1, :n) AS g
+) AS src
+"""
+
+TOUCH_SQL = """
+UPDATE sessions SET turns_count = turns_count + 1, updated_at = now()
+WHERE institution_id = ANY(:ids) AND id % 10000 < :per_10000
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the metrics_daily rollup")
+    parser.add_argument("--sessions", type=int, default=2_000_000)
+    parser.add_argument("--institutions", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--chunk-days", type=int, default=7)
+    parser.add_argument("--touch-percent", type=float, default=1.0, help="Sessions changed before the last pass")
+    parser.add_argument("--output", default="bench_results/metrics_rollup.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING")
+
+    from sqlalchemy import text
+    from app.database import SessionLocal
+    from app.models.institution import Institution
+    from app.models.metrics import RollupState
+    from app.services.metrics_rollup import backfill, rollup_incremental
+
+    db = SessionLocal()
+    prefix = f"bench-rollup-{uuid.uuid4().hex[:8]}"
+    state_name = prefix
+    institutions = [Institution(name=f"{prefix}-{i}") for i in range(args.institutions)]
+    db.add_all(institutions)
+    db.commit()
+    ids = [i.id for i in institutions]
+
+    results = {}
+
+    def timed(case: str, fn):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        results[case] = {
+            "seconds": round(elapsed, 3),
+            "days_written": result.days,
+            "sessions_per_s": round(args.sessions / elapsed, 1) if elapsed else 0.0,
+        }
+
+    try:
+        started = time.perf_counter()
+        db.execute(text(GENERATE_SQL), {"ids": ids, "k": len(ids), "days": args.days, "n": args.sessions})
+        db.commit()
+        db.execute(text("ANALYZE sessions"))
+        db.commit()
+        print(f"Generated {args.sessions} sessions in {time.perf_counter() - started:.1f}s")
+
+        today = date.today()
+        timed(
+            f"backfill/chunk={args.chunk_days}d",
+            lambda: backfill(db, today - timedelta(days=args.days + 1), today, chunk_days=args.chunk_days)
+        )
+        timed("incremental/initial", lambda: rollup_incremental(db, lag_seconds=0, name=state_name))
+        timed("incremental/idle", lambda: rollup_incremental(db, lag_seconds=0, name=state_name))
+
+        per_10000 = int(args.touch_percent * 100)
+        db.execute(text(TOUCH_SQL), {"ids": ids, "per_10000": per_10000})
+        db.commit()
+        timed(f"incremental/touched={args.touch_percent:g}%", lambda: rollup_incremental(db, lag_seconds=0, name=state_name))
+    finally:
+        db.rollback()
+        db.query(RollupState).filter(RollupState.name == state_name).delete()
+        db.execute(text("DELETE FROM institutions WHERE id = ANY(:ids)"), {"ids": ids})
+        db.commit()
+        db.close()
+
+    print_table(results, columns=("seconds", "days_written", "sessions_per_s"))
+
+    params = vars(args)
+    save_results(args.output, "metrics_rollup", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "metrics_rollup", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results, load_results(args.baseline), tolerance=args.tolerance, metrics=("seconds",)
+        )
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
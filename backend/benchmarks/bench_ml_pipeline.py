@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+ML pipeline benchmark
+
+Measures each stage of the LSP prediction path on synthetic sequences:
+- parse:      JSON payload -> LSPSequence (pydantic validation)
+- extract:    extract_sequence_features
+- model:      LSPModel.predict_batch on stacked features
+- end_to_end: predict_lsp_sequence (sync path, one call per sequence)
+
+For every stage and batch size it reports p50/p99 latency per batch, throughput
+(sequences/s) and Python heap allocations. Results are saved as JSON and can be
+compared against a stored baseline to flag regressions.
+
+Usage:
+    python benchmarks/bench_ml_pipeline.py --batch 1,8,32 --output bench_results/ml_pipeline.json
+    python benchmarks/bench_ml_pipeline.py --baseline benchmarks/baselines/ml_pipeline.json
+    python benchmarks/bench_ml_pipeline.py --holistic --save-baseline benchmarks/baselines/ml_pipeline.json
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (
+    bootstrap_app_env,
+    compare_to_baseline,
+    load_results,
+    measure,
+    measure_allocations,
+    print_table,
+    save_results,
+    summarize,
+)
+from benchmarks.synthetic import LandmarkGenerator
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LSP ML pipeline per stage")
+    parser.add_argument("--batch", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds per measurement")
+    parser.add_argument("--holistic", action="store_true", help="Include face/pose landmarks in payloads")
+    parser.add_argument("--missing-hand-prob", type=float, default=0.15)
+    parser.add_argument("--demo-mode", action="store_true", help="Skip the Keras model (fallback predictions)")
+    parser.add_argument("--output", default="bench_results/ml_pipeline.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(ML_DEMO_MODE=args.demo_mode, LOG_LEVEL="WARNING")
+
+    import numpy as np
+    from app.schemas.lsp import LSPSequence
+    from app.ml.feature_extraction import extract_sequence_features
+    from app.ml.model import get_model
+    from app.ml.predict import predict_lsp_sequence
+    from app.config import settings
+
+    generator = LandmarkGenerator(seed=args.seed, missing_hand_prob=args.missing_hand_prob, holistic=args.holistic)
+    model = get_model()
+    seq_len = settings.ML_SEQUENCE_LENGTH
+
+    results = {}
+    for batch_size in args.batch:
+        payloads = generator.sequences(batch_size)
+        sequences = [LSPSequence.model_validate(p) for p in payloads]
+        features = np.stack([extract_sequence_features(s.frames, sequence_length=seq_len) for s in sequences])
+
+        stages = {
+            "parse": lambda: [LSPSequence.model_validate(p) for p in payloads],
+            "extract": lambda: [extract_sequence_features(s.frames, sequence_length=seq_len) for s in sequences],
+            "model": lambda: model.predict_batch(features, 3),
+            "end_to_end": lambda: [predict_lsp_sequence(s) for s in sequences],
+        }
+
+        for stage, fn in stages.items():
+            latencies = measure(fn, min_time=args.min_time)
+            row = summarize(latencies, items_per_call=batch_size)
+            row.update(measure_allocations(fn))
+            results[f"{stage}/batch={batch_size}"] = row
+
+    print(f"Model loaded: {model.is_loaded} | holistic payloads: {args.holistic}\n")
+    print_table(results, columns=("p50_ms", "p99_ms", "throughput_per_s", "alloc_peak_bytes"))
+
+    params = vars(args)
+    save_results(args.output, "ml_pipeline", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "ml_pipeline", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_results(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
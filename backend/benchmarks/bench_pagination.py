@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Session listing pagination benchmark: OFFSET vs keyset
+
+Generates `--sessions` sessions (default 1,000,000) for one throwaway
+institution, then times fetching one page of `--limit` rows at increasing
+depths with:
+- offset/depth=N: ORDER BY started_at DESC, id DESC OFFSET N LIMIT k
+- keyset/depth=N: the same page through keyset_select() and a cursor
+
+OFFSET latency grows with the depth (every skipped row is read); keyset
+pages should stay flat. Needs a reachable PostgreSQL (DATABASE_URL) migrated
+to revision 003. Everything created is deleted at the end.
+
+Usage:
+    python benchmarks/bench_pagination.py --sessions 1000000
+    python benchmarks/bench_pagination.py --baseline benchmarks/baselines/pagination.json
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (
+    bootstrap_app_env,
+    compare_to_baseline,
+    load_results,
+    measure,
+    print_table,
+    save_results,
+    summarize
+)
+
+GENERATE_SQL = """
+INSERT INTO sessions (institution_id, started_at, ended_at, turns_count, total_duration_seconds)
+SELECT :institution_id,
+       now() - make_interval(secs => g::bigint * 13),
+       now() - make_interval(secs => g::bigint * 13 - 300),
+       g % 12,
+       300
+FROM generate_series(1, :n) AS g
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OFFSET vs keyset pagination of sessions")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--depths", default="0,1000,10000,100000,500000", help="Comma-separated row offsets")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds measured per case")
+    parser.add_argument("--output", default="bench_results/pagination.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING")
+
+    from sqlalchemy import select, text
+    from app.database import SessionLocal
+    from app.models.institution import Institution
+    from app.models.session import Session as SessionModel
+    from app.utils.pagination import encode_cursor, keyset_result, keyset_select
+    from app.services.session_service import SESSIONS_CURSOR
+
+    db = SessionLocal()
+    institution = Institution(name=f"bench-pagination-{uuid.uuid4().hex[:8]}")
+    db.add(institution)
+    db.commit()
+    institution_id = institution.id
+
+    depths = [int(d) for d in args.depths.split(",") if int(d) < args.sessions]
+    base = select(SessionModel).where(SessionModel.institution_id == institution_id)
+    ordered = base.order_by(SessionModel.started_at.desc(), SessionModel.id.desc())
+    results = {}
+
+    try:
+        started = time.perf_counter()
+        db.execute(text(GENERATE_SQL), {"institution_id": institution_id, "n": args.sessions})
+        db.commit()
+        db.execute(text("ANALYZE sessions"))
+        db.commit()
+        print(f"Generated {args.sessions} sessions in {time.perf_counter() - started:.1f}s")
+
+        for depth in depths:
+            def offset_page():
+                rows = db.execute(ordered.offset(depth).limit(args.limit)).scalars().all()
+                db.expunge_all()
+                return rows
+
+            # Cursor of the row just before the page (not timed)
+            cursor = None
+            if depth:
+                last = db.execute(ordered.offset(depth - 1).limit(1)).scalars().one()
+                cursor = encode_cursor(SESSIONS_CURSOR, last.started_at, last.id)
+
+            def keyset_page():
+                stmt = keyset_select(base, SESSIONS_CURSOR, SessionModel.started_at, SessionModel.id, cursor, args.limit)
+                rows = db.execute(stmt).scalars().all()
+                db.expunge_all()
+                return keyset_result(rows, SESSIONS_CURSOR, SessionModel.started_at, SessionModel.id, args.limit)
+
+            # Both strategies must return the same page
+            assert [s.id for s in offset_page()] == [s.id for s in keyset_page()[0]]
+
+            results[f"offset/depth={depth}"] = summarize(measure(offset_page, min_time=args.min_time))
+            results[f"keyset/depth={depth}"] = summarize(measure(keyset_page, min_time=args.min_time))
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM institutions WHERE id = :id"), {"id": institution_id})
+        db.commit()
+        db.close()
+
+    print_table(results, columns=("p50_ms", "p99_ms", "calls"))
+
+    params = vars(args)
+    save_results(args.output, "pagination", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "pagination", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_results(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
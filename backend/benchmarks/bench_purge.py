@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Institution purge benchmark
+
+Deletes a throwaway institution holding `--sessions` sessions (default
+1,000,000) and `--users` operators in three ways, each on freshly generated
+data:
+- orm_cascade:   load institution.users and .sessions and delete through the
+                 ORM, one DELETE per row (what relationship cascades did
+                 before passive_deletes); runs on --orm-sessions rows only
+- single_delete: DELETE FROM institutions (ON DELETE CASCADE), one transaction
+- chunked:       purge_institution(), --chunk-size rows per transaction
+
+seconds is the whole purge; max_txn_ms is the longest single transaction,
+i.e. how long rows stay locked (and replicas fall behind) at a time.
+
+Needs a reachable PostgreSQL (DATABASE_URL) migrated to head.
+
+Usage:
+    python benchmarks/bench_purge.py --sessions 1000000
+    python benchmarks/bench_purge.py --sessions 200000 --chunk-size 10000 --skip-orm
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import bootstrap_app_env, compare_to_baseline, load_results, print_table, save_results
+
+GENERATE_USERS_SQL = """
+INSERT INTO users (institution_id, email, username, password_hash, role, is_active)
+SELECT :institution_id, :prefix || '-' || g || '@bench.inclutalk.com', :prefix || '-' || g, 'x', 'OPERATOR', 1
+FROM generate_series(1, :n) AS g
+"""
+
+GENERATE_SESSIONS_SQL = """
+INSERT INTO sessions (institution_id, operator_id, started_at, ended_at, turns_count, total_duration_seconds)
+SELECT :institution_id, (:operator_ids)[1 + g % cardinality(:operator_ids)],
+       now() - make_interval(secs => g::bigint * 3),
+       now() - make_interval(secs => g::bigint * 3 - 300),
+       g % 12, 300
+FROM generate_series(1, :n) AS g
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deleting an institution and its data")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--orm-sessions", type=int, default=20_000, help="Sessions for the (slow) ORM case")
+    parser.add_argument("--skip-orm", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--pause", type=float, default=0.0, help="PURGE_CHUNK_PAUSE_SECONDS for the chunked case")
+    parser.add_argument("--output", default="bench_results/purge.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING", PURGE_CHUNK_PAUSE_SECONDS=args.pause)
+
+    from sqlalchemy import text
+    from app.database import SessionLocal
+    from app.models.institution import Institution
+    from app.services.purge import purge_institution
+
+    db = SessionLocal()
+    results = {}
+    created = []
+
+    def generate(sessions: int) -> int:
+        prefix = f"bench-purge-{uuid.uuid4().hex[:8]}"
+        institution = Institution(name=prefix)
+        db.add(institution)
+        db.commit()
+        created.append(institution.id)
+        db.execute(text(GENERATE_USERS_SQL), {"institution_id": institution.id, "prefix": prefix, "n": args.users})
+        operator_ids = db.execute(
+            text("SELECT id FROM users WHERE institution_id = :id"), {"id": institution.id}
+        ).scalars().all()
+        db.execute(text(GENERATE_SESSIONS_SQL), {
+            "institution_id": institution.id, "operator_ids": list(operator_ids), "n": sessions
+        })
+        db.commit()
+        db.execute(text("ANALYZE sessions"))
+        db.commit()
+        return institution.id
+
+    def record(case: str, rows: int, seconds: float, max_txn: float):
+        results[case] = {
+            "rows": rows,
+            "seconds": round(seconds, 2),
+            "rows_per_s": round(rows / seconds, 1) if seconds else 0.0,
+            "max_txn_ms": round(max_txn * 1000, 1),
+        }
+        print(f"{case}: {results[case]}")
+
+    try:
+        if not args.skip_orm:
+            institution_id = generate(args.orm_sessions)
+            started = time.perf_counter()
+            institution = db.get(Institution, institution_id)
+            rows = len(institution.sessions) + len(institution.users)  # Loads both collections
+            db.delete(institution)
+            db.commit()
+            elapsed = time.perf_counter() - started
+            record("orm_cascade", rows, elapsed, elapsed)
+
+        institution_id = generate(args.sessions)
+        started = time.perf_counter()
+        db.execute(text("DELETE FROM institutions WHERE id = :id"), {"id": institution_id})
+        db.commit()
+        elapsed = time.perf_counter() - started
+        record("single_delete", args.sessions + args.users, elapsed, elapsed)
+
+        institution_id = generate(args.sessions)
+        chunk_times = []
+        last = [time.perf_counter()]
+
+        def on_chunk(step):
+            now = time.perf_counter()
+            chunk_times.append(now - last[0] - args.pause)
+            last[0] = now
+
+        result = purge_institution(db, institution_id, progress=on_chunk, chunk_size=args.chunk_size)
+        rows = sum(result.deleted.values()) - 1  # Minus the institution row
+        record(f"chunked/{args.chunk_size}", rows, result.seconds, max(chunk_times, default=0.0))
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM institutions WHERE id = ANY(:ids)"), {"ids": created})
+        db.commit()
+        db.close()
+
+    print_table(results, columns=("rows", "seconds", "rows_per_s", "max_txn_ms"))
+
+    params = vars(args)
+    save_results(args.output, "purge", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "purge", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results, load_results(args.baseline), tolerance=args.tolerance, metrics=("seconds", "max_txn_ms")
+        )
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Rate limiter overhead benchmark
+
+Times TokenBucketLimiter.hit() per call:
+- local: in-process buckets (no Redis, or Redis unreachable)
+- redis: the atomic Lua script on REDIS_URL (skipped if Redis is unreachable)
+
+Each backend runs with `--keys` distinct callers (round robin) from
+`--threads` threads. Budgets are raised so no call is rejected and the timing
+covers the allow path. Redis keys written by the benchmark expire on their own.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py --calls 20000 --keys 1000
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/bench_rate_limiter.py --baseline benchmarks/baselines/rate_limiter.json
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import bootstrap_app_env, compare_to_baseline, load_results, print_table, save_results, summarize
+
+
+def run_backend(limiter, calls: int, keys: int, threads: int) -> dict:
+    prefix = uuid.uuid4().hex[:8]
+    latencies, rejected = [], 0
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        nonlocal rejected
+        local_latencies, local_rejected = [], 0
+        for i in range(offset, calls, threads):
+            key = f"bench:{prefix}:{i % keys}"
+            t0 = time.perf_counter()
+            decision = limiter.hit("predict", key)
+            local_latencies.append(time.perf_counter() - t0)
+            local_rejected += 0 if decision.allowed else 1
+        with lock:
+            latencies.extend(local_latencies)
+            rejected += local_rejected
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    row = summarize(latencies)
+    row["throughput_per_s"] = round(len(latencies) / elapsed, 2) if elapsed else 0.0
+    row["p50_us"] = round(row["p50_ms"] * 1000, 2)
+    row["p99_us"] = round(row["p99_ms"] * 1000, 2)
+    row["rejected"] = rejected
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call overhead of the token-bucket rate limiter")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000, help="Distinct callers")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--backends", default="local,redis", help="Comma-separated: local, redis")
+    parser.add_argument("--output", default="bench_results/rate_limiter.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    # High budgets: measure the allow path, not rejections
+    bootstrap_app_env(
+        LOG_LEVEL="WARNING",
+        RATE_LIMIT_ENABLED=True,
+        RATE_LIMIT_PREDICT_PER_MINUTE=10_000_000,
+        RATE_LIMIT_PREDICT_BURST=10_000_000,
+        REDIS_ENABLED=bool(os.environ.get("REDIS_URL")),
+    )
+
+    from app.utils.rate_limiter import TokenBucketLimiter
+    from app.utils.redis_client import get_redis
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    results = {}
+    for backend in backends:
+        limiter = TokenBucketLimiter(enabled=True, local_max_keys=max(args.keys, 1))
+        if backend == "local":
+            limiter._redis_down_until = float("inf")  # never try Redis
+        elif backend == "redis":
+            client = get_redis()
+            try:
+                if client is None or not client.ping():
+                    raise RuntimeError("REDIS_URL not set")
+            except Exception as e:
+                print(f"Skipping redis backend: {e}")
+                continue
+        else:
+            raise SystemExit(f"Unknown backend: {backend}")
+
+        run_backend(limiter, min(1000, args.calls), args.keys, 1)  # warm up (script load, buckets)
+        row = run_backend(limiter, args.calls, args.keys, args.threads)
+        if backend == "redis" and limiter.stats()["redis_errors"]:
+            print("Warning: Redis errors during the run; some calls used the local buckets")
+        results[f"{backend}/keys={args.keys}/threads={args.threads}"] = row
+
+    print_table(results, columns=("p50_us", "p99_us", "throughput_per_s", "rejected"))
+
+    params = vars(args)
+    save_results(args.output, "rate_limiter", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "rate_limiter", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_results(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Session export benchmark: throughput and memory of the streaming export
+
+Generates `--sessions` sessions (default 5,000,000) for one throwaway
+institution, then drains stream_sessions() (the body of GET /sessions/export)
+for each format and reports rows/s, output size and resident memory sampled
+while streaming. rss_growth_mb is the peak minus the RSS before the export
+started; it should stay flat whatever --sessions is (run with two sizes to
+check). The RSS at 25/50/75/100% of the rows shows the same from inside one
+run.
+
+Needs a reachable PostgreSQL (DATABASE_URL). Everything created is deleted at
+the end.
+
+Usage:
+    python benchmarks/bench_session_export.py --sessions 5000000
+    python benchmarks/bench_session_export.py --sessions 500000 --formats ndjson
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import bootstrap_app_env, compare_to_baseline, load_results, print_table, save_results
+
+GENERATE_SQL = """
+INSERT INTO sessions (
+    institution_id, operator_id, started_at, ended_at, turns_count, stt_attempts,
+    lsp_attempts, lsp_failed_attempts, text_fallback_count, avg_confidence, total_duration_seconds
+)
+SELECT :institution_id, :operator_id,
+       now() - make_interval(secs => g::bigint * 7),
+       now() - make_interval(secs => g::bigint * 7 - 420),
+       g % 12, g % 5, g % 20, g % 4, g % 3, 0.5 + (g % 50) / 100.0, 420
+FROM generate_series(1, :n) AS g
+"""
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux /proc; peak RSS elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def drain(query, export_format, compress: bool, expected_rows: int) -> dict:
+    from app.config import settings
+    from app.services.session_export import stream_sessions
+
+    rss_before = peak = rss_mb()
+    checkpoints = {}
+    out_bytes = 0
+    chunks = 0
+    batch = settings.SESSION_EXPORT_BATCH_ROWS
+    started = time.perf_counter()
+    async for chunk in stream_sessions(query, export_format, compress):
+        out_bytes += len(chunk)
+        chunks += 1
+        current = rss_mb()
+        peak = max(peak, current)
+        # Rows so far, approximated by fetches (one chunk per fetch, plus the CSV header)
+        done = min(1.0, chunks * batch / expected_rows)
+        for q in (25, 50, 75, 100):
+            if done * 100 >= q and f"rss_at_{q}pct_mb" not in checkpoints:
+                checkpoints[f"rss_at_{q}pct_mb"] = round(current, 1)
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(expected_rows / elapsed, 1) if elapsed else 0.0,
+        "output_mb": round(out_bytes / 2**20, 1),
+        "rss_growth_mb": round(peak - rss_before, 1),
+        **checkpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming session export")
+    parser.add_argument("--sessions", type=int, default=5_000_000)
+    parser.add_argument("--formats", default="ndjson,csv,ndjson+gzip,csv+gzip")
+    parser.add_argument("--details", action="store_true", help="Join operator and institution names")
+    parser.add_argument("--output", default="bench_results/session_export.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING")
+
+    from sqlalchemy import text
+    from app.database import SessionLocal, async_engine
+    from app.models.institution import Institution
+    from app.models.user import User, UserRole
+    from app.services.session_export import ExportFormat, export_query
+
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:8]
+    institution = Institution(name=f"bench-export-{suffix}")
+    db.add(institution)
+    db.flush()
+    operator = User(
+        email=f"export-{suffix}@bench.inclutalk.com",
+        username=f"export-{suffix}",
+        password_hash="x",
+        role=UserRole.OPERATOR,
+        institution_id=institution.id,
+        first_name="Bench",
+        last_name="Export"
+    )
+    db.add(operator)
+    db.commit()
+    institution_id = institution.id
+    results = {}
+
+    async def run_all():
+        query = export_query(institution_id, include_details=args.details)
+        for case in args.formats.split(","):
+            name, _, gz = case.partition("+")
+            results[case] = await drain(query, ExportFormat(name), gz == "gzip", args.sessions)
+            print(f"{case}: {results[case]}")
+        await async_engine.dispose()
+
+    try:
+        started = time.perf_counter()
+        db.execute(text(GENERATE_SQL), {"institution_id": institution_id, "operator_id": operator.id, "n": args.sessions})
+        db.commit()
+        db.execute(text("ANALYZE sessions"))
+        db.commit()
+        print(f"Generated {args.sessions} sessions in {time.perf_counter() - started:.1f}s")
+
+        asyncio.run(run_all())
+    finally:
+        db.rollback()
+        db.execute(text("DELETE FROM institutions WHERE id = :id"), {"id": institution_id})
+        db.commit()
+        db.close()
+
+    print_table(results, columns=("seconds", "rows_per_s", "output_mb", "rss_growth_mb", "rss_at_100pct_mb"))
+
+    params = vars(args)
+    save_results(args.output, "session_export", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "session_export", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results, load_results(args.baseline), tolerance=args.tolerance, metrics=("seconds", "rss_growth_mb")
+        )
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Sessions table layout benchmark: one heap vs monthly partitions with BRIN
+
+Loads the same `--sessions` rows (default 5,000,000, spread over `--months`
+months) into two throwaway tables shaped like sessions before and after
+migration 004:
+- heap:        PRIMARY KEY (id), btree (institution_id, started_at, id), (started_at, id)
+- partitioned: PRIMARY KEY (id, started_at), same btrees, BRIN (started_at),
+               one partition per month
+
+and times the same queries on both:
+- month_report:     per-institution counts/averages over one month
+- quarter_report:   the same over three months
+- institution_week: one institution, one week
+- latest_page:      newest 50 sessions across institutions (keyset first page)
+- by_id:            one session by id (no partition pruning: the cost of partitioning)
+
+Also reports the on-disk size of each layout. Needs a reachable PostgreSQL
+(DATABASE_URL); the tables are dropped at the end.
+
+Usage:
+    python benchmarks/bench_session_partitions.py --sessions 5000000 --months 24
+    python benchmarks/bench_session_partitions.py --baseline benchmarks/baselines/session_partitions.json
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (
+    bootstrap_app_env,
+    compare_to_baseline,
+    load_results,
+    measure,
+    print_table,
+    save_results,
+    summarize
+)
+
+HEAP = "bench_sessions_heap"
+PARTITIONED = "bench_sessions_part"
+
+COLUMNS = """
+    id bigint NOT NULL,
+    institution_id integer NOT NULL,
+    operator_id integer,
+    started_at timestamptz NOT NULL,
+    ended_at timestamptz,
+    turns_count integer,
+    lsp_attempts integer,
+    total_duration_seconds integer
+"""
+
+GENERATE_SQL = f"""
+INSERT INTO {HEAP}
+SELECT g, 1 + g % :institutions, g % 500,
+       started, started + make_interval(secs => 60 + g % 900),
+       g % 12, g % 20, 60 + g % 900
+FROM (
+    SELECT g, now() - make_interval(secs => ((:n - g)::bigint * :span) / :n) AS started
+    FROM generate_series(1, :n) AS g
+) AS src
+"""
+
+QUERIES = {
+    "month_report": """
+        SELECT institution_id, count(*), avg(total_duration_seconds), sum(turns_count)
+        FROM {table} WHERE started_at >= :month_start AND started_at < :month_end
+        GROUP BY institution_id
+    """,
+    "quarter_report": """
+        SELECT institution_id, count(*), avg(total_duration_seconds), sum(turns_count)
+        FROM {table} WHERE started_at >= :quarter_start AND started_at < :month_end
+        GROUP BY institution_id
+    """,
+    "institution_week": """
+        SELECT count(*), avg(total_duration_seconds)
+        FROM {table} WHERE institution_id = :institution_id
+          AND started_at >= :week_start AND started_at < :week_end
+    """,
+    "latest_page": """
+        SELECT * FROM {table} ORDER BY started_at DESC, id DESC LIMIT 50
+    """,
+    "by_id": """
+        SELECT * FROM {table} WHERE id = :session_id
+    """,
+}
+
+
+def add_months(month: date, months: int) -> date:
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sessions as one heap vs monthly partitions")
+    parser.add_argument("--sessions", type=int, default=5_000_000)
+    parser.add_argument("--months", type=int, default=24, help="History spread over this many months")
+    parser.add_argument("--institutions", type=int, default=50)
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds measured per case")
+    parser.add_argument("--output", default="bench_results/session_partitions.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING")
+
+    from sqlalchemy import text
+    from app.database import engine
+
+    today = datetime.now(timezone.utc).date()
+    first_month = add_months(today.replace(day=1), -args.months)
+    report_month = add_months(today.replace(day=1), -max(1, args.months // 2))
+    week_start = datetime.combine(report_month + timedelta(days=7), datetime.min.time(), tzinfo=timezone.utc)
+    rng = random.Random(7)
+    params = {
+        "month_start": datetime.combine(report_month, datetime.min.time(), tzinfo=timezone.utc),
+        "month_end": datetime.combine(add_months(report_month, 1), datetime.min.time(), tzinfo=timezone.utc),
+        "quarter_start": datetime.combine(add_months(report_month, -2), datetime.min.time(), tzinfo=timezone.utc),
+        "week_start": week_start,
+        "week_end": week_start + timedelta(days=7),
+        "institution_id": 1 + rng.randrange(args.institutions),
+        "session_id": 1 + rng.randrange(args.sessions),
+    }
+    results = {}
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        def run(sql: str, **bind):
+            return conn.execute(text(sql), bind)
+
+        try:
+            run(f"DROP TABLE IF EXISTS {HEAP}, {PARTITIONED}")
+            run(f"CREATE TABLE {HEAP} ({COLUMNS}, PRIMARY KEY (id))")
+            run(f"CREATE TABLE {PARTITIONED} ({COLUMNS}, PRIMARY KEY (id, started_at)) PARTITION BY RANGE (started_at)")
+            month = first_month
+            while month <= add_months(today.replace(day=1), 1):
+                upper = add_months(month, 1)
+                run(f"CREATE TABLE {PARTITIONED}_p{month:%Y_%m} PARTITION OF {PARTITIONED} "
+                    f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{upper} 00:00:00+00')")
+                month = upper
+            run(f"CREATE TABLE {PARTITIONED}_default PARTITION OF {PARTITIONED} DEFAULT")
+
+            started = time.perf_counter()
+            span = int((datetime.now(timezone.utc) - datetime.combine(first_month, datetime.min.time(), tzinfo=timezone.utc)).total_seconds())
+            run(GENERATE_SQL, n=args.sessions, institutions=args.institutions, span=span)
+            run(f"INSERT INTO {PARTITIONED} SELECT * FROM {HEAP}")
+            for table in (HEAP, PARTITIONED):
+                run(f"CREATE INDEX ON {table} (institution_id, started_at, id)")
+                run(f"CREATE INDEX ON {table} (started_at, id)")
+            run(f"CREATE INDEX ON {PARTITIONED} USING brin (started_at)")
+            run(f"VACUUM ANALYZE {HEAP}")
+            run(f"VACUUM ANALYZE {PARTITIONED}")
+            print(f"Loaded {args.sessions} sessions into both layouts in {time.perf_counter() - started:.1f}s")
+
+            sizes = {
+                HEAP: run(f"SELECT pg_total_relation_size('{HEAP}')").scalar(),
+                PARTITIONED: run(
+                    f"SELECT sum(pg_total_relation_size(relid)) FROM pg_partition_tree('{PARTITIONED}')"
+                ).scalar(),
+            }
+
+            for name, sql in QUERIES.items():
+                for layout, table in (("heap", HEAP), ("partitioned", PARTITIONED)):
+                    statement = text(sql.format(table=table))
+                    bind = {k: v for k, v in params.items() if f":{k}" in sql}
+                    results[f"{layout}/{name}"] = summarize(
+                        measure(lambda: conn.execute(statement, bind).all(), min_time=args.min_time)
+                    )
+        finally:
+            run(f"DROP TABLE IF EXISTS {HEAP}, {PARTITIONED}")
+
+    print_table(results, columns=("p50_ms", "p99_ms", "calls"))
+    for table, size in sizes.items():
+        print(f"{table}: {int(size) / 2**20:.1f} MB (table + indexes)")
+
+    run_params = vars(args)
+    save_results(args.output, "session_partitions", results, run_params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "session_partitions", results, run_params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, load_results(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
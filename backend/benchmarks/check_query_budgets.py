@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint query budget check
+
+Drives the hot endpoints in-process (TestClient) as a throwaway operator and
+counts the SQL statements each request runs (app.utils.query_stats). The
+principal cache is disabled so every request pays the worst case (one users
+lookup for authentication). Exits 1 when an endpoint runs more statements
+than its budget in QUERY_BUDGETS, or more than in --baseline.
+
+Needs a reachable PostgreSQL (DATABASE_URL). Everything created is deleted at
+the end.
+
+Usage:
+    python benchmarks/check_query_budgets.py
+    python benchmarks/check_query_budgets.py --verbose --baseline benchmarks/baselines/query_budgets.json
+"""
+import argparse
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import bootstrap_app_env, compare_to_baseline, load_results, print_table, save_results
+
+# Statements per request, principal cache disabled (authentication included)
+QUERY_BUDGETS = {
+    "POST /auth/login": 2,                 # SELECT user, UPDATE last_login
+    "POST /auth/refresh": 1,               # SELECT user
+    "GET /auth/me": 2,                     # auth, SELECT user JOIN institution
+    "POST /sessions/start": 2,             # auth, INSERT ... RETURNING
+    "GET /sessions/{id}": 2,               # auth, SELECT session
+    "GET /sessions": 2,                    # auth, one keyset page
+    "GET /sessions/stats": 3,              # auth, metrics_daily sums, open-day aggregate
+    "PATCH /sessions/{id}/metrics": 2,     # auth, UPDATE ... RETURNING
+    "POST /sessions/{id}/metrics/increment": 2,  # auth, UPDATE ... RETURNING
+    "POST /sessions/{id}/end": 2,          # auth, UPDATE ... RETURNING
+}
+
+PASSWORD = "Budget1234!"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check SQL statements per request against budgets")
+    parser.add_argument("--verbose", action="store_true", help="Print the statements of every request")
+    parser.add_argument("--output", default="bench_results/query_budgets.json")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Allowed increase in queries (0.0 = none)")
+    args = parser.parse_args()
+
+    bootstrap_app_env(LOG_LEVEL="WARNING", AUTH_PRINCIPAL_CACHE_TTL_SECONDS=0)
+
+    from fastapi.testclient import TestClient
+    from app.auth.security import get_password_hash
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.institution import Institution
+    from app.models.user import User, UserRole
+    from app.utils.query_stats import count_queries
+
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:8]
+    institution = Institution(name=f"bench-budget-{suffix}")
+    db.add(institution)
+    db.flush()
+    email = f"budget-{suffix}@bench.inclutalk.com"
+    db.add(User(
+        email=email,
+        username=f"budget-{suffix}",
+        password_hash=get_password_hash(PASSWORD),
+        role=UserRole.OPERATOR,
+        institution_id=institution.id,
+        is_active=1
+    ))
+    db.commit()
+
+    api = settings.API_V1_PREFIX
+    results = {}
+
+    def call(label: str, method: str, path: str, **kwargs):
+        with count_queries() as stats:
+            response = client.request(method, f"{api}{path}", **kwargs)
+        if response.status_code >= 400:
+            raise SystemExit(f"{label} failed: {response.status_code} {response.text}")
+        results[label] = {"queries": stats.count, "budget": QUERY_BUDGETS[label], "db_ms": round(stats.elapsed * 1000, 3)}
+        if args.verbose:
+            print(f"{label}:")
+            for statement in stats.statements:
+                print(f"    {' '.join(statement.split())}")
+        return response.json()
+
+    try:
+        with TestClient(app) as client:
+            tokens = call("POST /auth/login", "POST", "/auth/login", json={"email": email, "password": PASSWORD})
+            call("POST /auth/refresh", "POST", "/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+            call("GET /auth/me", "GET", "/auth/me", headers=headers)
+            session_id = call("POST /sessions/start", "POST", "/sessions/start", headers=headers)["id"]
+            call("GET /sessions/{id}", "GET", f"/sessions/{session_id}", headers=headers)
+            call("GET /sessions", "GET", "/sessions", headers=headers)
+            call("GET /sessions/stats", "GET", "/sessions/stats", headers=headers)
+            call("PATCH /sessions/{id}/metrics", "PATCH", f"/sessions/{session_id}/metrics",
+                 headers=headers, json={"turns_count": 3, "lsp_attempts": 2})
+            call("POST /sessions/{id}/metrics/increment", "POST", f"/sessions/{session_id}/metrics/increment",
+                 headers=headers, json={"turns_count": 1, "lsp_confidences": [0.8, 0.6]})
+            call("POST /sessions/{id}/end", "POST", f"/sessions/{session_id}/end", headers=headers, json={})
+    finally:
+        # Users and sessions go with the institution (ON DELETE CASCADE)
+        db.delete(institution)
+        db.commit()
+        db.close()
+
+    print_table(results, columns=("queries", "budget", "db_ms"))
+
+    params = vars(args)
+    save_results(args.output, "query_budgets", results, params)
+    print(f"\nResults saved to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, "query_budgets", results, params)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    failures = [
+        f"{label}: {row['queries']} queries (budget {row['budget']})"
+        for label, row in results.items()
+        if row["queries"] > row["budget"]
+    ]
+    if args.baseline:
+        failures += compare_to_baseline(
+            results, load_results(args.baseline), tolerance=args.tolerance, metrics=("queries",)
+        )
+    if failures:
+        print(f"\n{len(failures)} endpoint(s) over budget:")
+        for line in failures:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\nAll endpoints within their query budgets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Seeded generator of realistic MediaPipe-style landmark sequences
+
+Produces LSPSequence-shaped payloads (plain dicts, as the API receives them):
+- Hands follow smooth wrist trajectories with per-frame jitter and a finger
+  curl that opens/closes over time, so features are not constant
+- Hands can be missing for a whole sequence or drop out in bursts
+- Frame counts vary per sequence
+- Holistic-style payloads also carry face (468) and pose (33) landmarks
+"""
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+# Open right hand, offsets from the wrist in units of hand size (MediaPipe order)
+_OPEN_HAND = [
+    (0.00, 0.00),
+    (-0.20, -0.10), (-0.35, -0.25), (-0.45, -0.40), (-0.55, -0.52),  # thumb
+    (-0.15, -0.50), (-0.17, -0.72), (-0.18, -0.86), (-0.19, -0.98),  # index
+    (0.00, -0.52), (0.00, -0.77), (0.00, -0.92), (0.00, -1.05),  # middle
+    (0.14, -0.48), (0.16, -0.70), (0.17, -0.84), (0.18, -0.95),  # ring
+    (0.27, -0.42), (0.31, -0.58), (0.33, -0.68), (0.35, -0.78),  # pinky
+]
+# Curled fingertips collapse towards the palm center
+_PALM_CENTER = (0.0, -0.45)
+
+FACE_POINTS = 468
+POSE_POINTS = 33
+
+
+def _clamp(v: float) -> float:
+    return min(1.0, max(0.0, v))
+
+
+class LandmarkGenerator:
+    """Deterministic (seeded) generator of synthetic sign sequences"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        min_frames: int = 10,
+        max_frames: int = 60,
+        missing_hand_prob: float = 0.15,
+        dropout_prob: float = 0.05,
+        holistic: bool = False,
+    ):
+        self.rng = random.Random(seed)
+        self.min_frames = min_frames
+        self.max_frames = max_frames
+        self.missing_hand_prob = missing_hand_prob
+        self.dropout_prob = dropout_prob
+        self.holistic = holistic
+
+    # ------------------------------------------------------------------ #
+    # Landmarks
+    # ------------------------------------------------------------------ #
+    def _hand(self, wrist: Tuple[float, float], size: float, angle: float, curl: float, mirror: bool) -> List[Dict]:
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        points = []
+        for i, (dx, dy) in enumerate(_OPEN_HAND):
+            # Fingertip joints curl more than knuckles
+            joint_curl = curl * ((i % 4) / 3.0 if i else 0.0)
+            dx = dx + (_PALM_CENTER[0] - dx) * joint_curl
+            dy = dy + (_PALM_CENTER[1] - dy) * joint_curl
+            if mirror:
+                dx = -dx
+            rx = dx * cos_a - dy * sin_a
+            ry = dx * sin_a + dy * cos_a
+            points.append({
+                "x": _clamp(wrist[0] + rx * size + self.rng.gauss(0, 0.002)),
+                "y": _clamp(wrist[1] + ry * size + self.rng.gauss(0, 0.002)),
+                "z": -0.05 * joint_curl + self.rng.gauss(0, 0.005),
+                "visibility": 1.0,
+            })
+        return points
+
+    def _cloud(self, n: int, center: Tuple[float, float], rx: float, ry: float) -> List[Dict]:
+        points = []
+        for _ in range(n):
+            theta = self.rng.uniform(0, 2 * math.pi)
+            r = math.sqrt(self.rng.random())
+            points.append({
+                "x": _clamp(center[0] + r * rx * math.cos(theta)),
+                "y": _clamp(center[1] + r * ry * math.sin(theta)),
+                "z": self.rng.gauss(0, 0.02),
+                "visibility": round(self.rng.uniform(0.6, 1.0), 3),
+            })
+        return points
+
+    # ------------------------------------------------------------------ #
+    # Sequences
+    # ------------------------------------------------------------------ #
+    def sequence(self, n_frames: Optional[int] = None, session_id: Optional[int] = None) -> Dict:
+        """One LSPSequence payload"""
+        rng = self.rng
+        n_frames = n_frames or rng.randint(self.min_frames, self.max_frames)
+        fps = 30.0
+
+        has_left = rng.random() >= self.missing_hand_prob
+        has_right = rng.random() >= self.missing_hand_prob
+        if not has_left and not has_right:
+            has_right = True  # at least one hand signs
+
+        # Per-hand trajectory parameters
+        hands = {}
+        for side, base_x in (("left", 0.35), ("right", 0.65)):
+            hands[side] = {
+                "center": (base_x + rng.uniform(-0.05, 0.05), 0.55 + rng.uniform(-0.05, 0.05)),
+                "amp": (rng.uniform(0.02, 0.12), rng.uniform(0.02, 0.10)),
+                "freq": rng.uniform(0.5, 2.0),
+                "phase": rng.uniform(0, 2 * math.pi),
+                "size": rng.uniform(0.10, 0.18),
+                "curl_freq": rng.uniform(0.3, 1.5),
+            }
+
+        frames = []
+        dropout_left = dropout_right = 0
+        for f in range(n_frames):
+            t = f / fps
+            frame = {"timestamp": round(t, 4)}
+
+            for side, present in (("left", has_left), ("right", has_right)):
+                # Dropout bursts: the tracker loses the hand for a few frames
+                if side == "left":
+                    if dropout_left == 0 and rng.random() < self.dropout_prob:
+                        dropout_left = rng.randint(1, 5)
+                    lost = dropout_left > 0
+                    dropout_left = max(0, dropout_left - 1)
+                else:
+                    if dropout_right == 0 and rng.random() < self.dropout_prob:
+                        dropout_right = rng.randint(1, 5)
+                    lost = dropout_right > 0
+                    dropout_right = max(0, dropout_right - 1)
+
+                key = f"{side}_hand_landmarks"
+                if not present or lost:
+                    frame[key] = None
+                    continue
+
+                h = hands[side]
+                w = 2 * math.pi * h["freq"] * t + h["phase"]
+                wrist = (h["center"][0] + h["amp"][0] * math.sin(w), h["center"][1] + h["amp"][1] * math.cos(w))
+                curl = 0.5 + 0.5 * math.sin(2 * math.pi * h["curl_freq"] * t)
+                frame[key] = self._hand(wrist, h["size"], angle=0.3 * math.sin(w), curl=curl, mirror=(side == "left"))
+
+            if self.holistic:
+                frame["face_landmarks"] = self._cloud(FACE_POINTS, (0.5, 0.25), 0.08, 0.11)
+                frame["pose_landmarks"] = self._cloud(POSE_POINTS, (0.5, 0.55), 0.25, 0.4)
+
+            frames.append(frame)
+
+        payload = {"frames": frames}
+        if session_id is not None:
+            payload["session_id"] = session_id
+        return payload
+
+    def sequences(self, count: int, **kwargs) -> List[Dict]:
+        """A list of LSPSequence payloads"""
+        return [self.sequence(**kwargs) for _ in range(count)]
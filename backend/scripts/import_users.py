@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Bulk user import from a CSV or JSON file (same rules as POST /users/import)
+
+CSV columns: email, username, password, role, first_name, last_name, institution_id
+JSON: a list of objects with the same keys (or {"users": [...]})
+
+Usage:
+    python scripts/import_users.py operadores.csv --institution-id 1
+    python scripts/import_users.py operadores.json --dry-run --report report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from app.database import SessionLocal
+from app.models.user import UserRole
+from app.auth.hashing_pool import get_hashing_pool
+from app.auth.principal_cache import AuthenticatedPrincipal
+from app.services.user_import import import_users, parse_user_rows
+
+# The CLI runs with platform-level rights
+CLI_PRINCIPAL = AuthenticatedPrincipal(id=0, role=UserRole.SUPERADMIN, institution_id=None, is_active=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV or JSON")
+    parser.add_argument("file", help="CSV or JSON file")
+    parser.add_argument("--institution-id", type=int, default=None, help="Institution for rows without one")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per INSERT")
+    parser.add_argument("--report", default=None, help="Write the per-row report to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        content = f.read()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        rows = parse_user_rows(content, filename=args.file)
+        report = import_users(
+            db,
+            rows,
+            CLI_PRINCIPAL,
+            default_institution_id=args.institution_id,
+            dry_run=args.dry_run,
+            batch_size=args.batch_size
+        )
+    except HTTPException as e:
+        print(f"Import failed: {e.detail}")
+        sys.exit(1)
+    finally:
+        db.close()
+        get_hashing_pool().shutdown()
+    elapsed = time.perf_counter() - started
+
+    for row in report.rows:
+        if row.status == "error":
+            print(f"  row {row.row} ({row.email or '-'}): {'; '.join(row.errors)}")
+    verb = "valid" if args.dry_run else "created"
+    print(f"\n{report.total} rows: {report.total - report.failed} {verb}, {report.failed} failed ({elapsed:.2f}s)")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.model_dump(), f, indent=2, ensure_ascii=False)
+        print(f"Report saved to {args.report}")
+
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
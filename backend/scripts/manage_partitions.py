@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Monthly partitions of the sessions table from the command line
+
+Without options, creates any missing partition from the current month to
+--months-ahead months ahead (what the in-process scheduler does, for
+deployments that disable it with SESSION_PARTITIONS_ENABLED=False).
+--list prints every partition with its bounds and estimated rows.
+
+Usage:
+    python scripts/manage_partitions.py
+    python scripts/manage_partitions.py --months-ahead 12
+    python scripts/manage_partitions.py --list
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.session_partitions import ensure_partitions, is_partitioned, list_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of sessions")
+    parser.add_argument("--months-ahead", type=int, default=None, help="Months to prepare after the current one")
+    parser.add_argument("--list", action="store_true", help="List partitions and exit")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not is_partitioned(db):
+            print("sessions is not partitioned (run `alembic upgrade head`)")
+            sys.exit(1)
+        if args.list:
+            for partition in list_partitions(db):
+                print(f"{partition.name:<24} {partition.estimated_rows:>12} rows  {partition.bounds}")
+            return
+
+        created = ensure_partitions(db, months_ahead=args.months_ahead)
+        print(f"Created: {', '.join(created)}" if created else "Nothing to create")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
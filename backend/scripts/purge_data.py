@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Bulk deletion of institution data or old sessions, in chunks
+
+--institution-id alone deletes that institution with its sessions, daily
+metrics and users (asks for --yes). --older-than-days deletes sessions
+started before that many days ago (whole months by dropping partitions),
+optionally for one institution. Progress is printed as chunks complete.
+
+Usage:
+    python scripts/purge_data.py --institution-id 12 --yes
+    python scripts/purge_data.py --older-than-days 730
+    python scripts/purge_data.py --older-than-days 365 --institution-id 12 --chunk-size 10000
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from app.database import SessionLocal
+from app.services.purge import PurgeProgress, purge_institution, purge_sessions_before
+
+
+def print_progress(step: PurgeProgress):
+    print(f"  {step.table:<14} {step.deleted:>12} rows  {step.chunks:>6} chunk(s)  {step.seconds:8.1f}s", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete an institution's data or old sessions in chunks")
+    parser.add_argument("--institution-id", type=int, default=None, help="Institution to purge (or to limit --older-than-days to)")
+    parser.add_argument("--older-than-days", type=int, default=None, help="Delete sessions started before this many days ago")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per transaction (default PURGE_CHUNK_SIZE)")
+    parser.add_argument("--yes", action="store_true", help="Confirm deleting a whole institution")
+    args = parser.parse_args()
+
+    if args.older_than_days is None and args.institution_id is None:
+        parser.error("give --institution-id and/or --older-than-days")
+    if args.older_than_days is None and not args.yes:
+        parser.error(f"deleting institution {args.institution_id} and all its data needs --yes")
+
+    db = SessionLocal()
+    try:
+        if args.older_than_days is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+            print(f"Deleting sessions started before {cutoff.isoformat()}")
+            result = purge_sessions_before(
+                db, cutoff, institution_id=args.institution_id, progress=print_progress, chunk_size=args.chunk_size
+            )
+            if result.partitions_dropped:
+                print(f"Dropped partitions: {', '.join(result.partitions_dropped)}")
+        else:
+            print(f"Deleting institution {args.institution_id}")
+            result = purge_institution(db, args.institution_id, progress=print_progress, chunk_size=args.chunk_size)
+    except HTTPException as e:
+        print(f"Purge failed: {e.detail}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    counts = ", ".join(f"{table}: {rows}" for table, rows in result.deleted.items())
+    print(f"Done in {result.seconds:.1f}s ({counts})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Daily metrics rollup (metrics_daily) from the command line
+
+Without options, runs one incremental pass: the days touched by sessions
+written since the last run. With --from/--to, recomputes every day of the
+range in chunks (backfill). --watch keeps running incremental passes, for
+deployments that disable the in-process scheduler (METRICS_ROLLUP_ENABLED).
+
+Usage:
+    python scripts/rollup_metrics.py
+    python scripts/rollup_metrics.py --from 2024-01-01 --to 2024-06-30 --chunk-days 14
+    python scripts/rollup_metrics.py --watch --interval 300
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.metrics_rollup import backfill, rollup_incremental
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up ended sessions into metrics_daily")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, default=None, help="Backfill from this day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, default=None, help="Backfill up to this day, inclusive (default today)")
+    parser.add_argument("--chunk-days", type=int, default=7, help="Days per backfill transaction")
+    parser.add_argument("--institution-id", type=int, default=None, help="Backfill one institution only")
+    parser.add_argument("--lag-seconds", type=float, default=None, help="Incremental: ignore writes newer than this")
+    parser.add_argument("--watch", action="store_true", help="Run incremental passes until interrupted")
+    parser.add_argument("--interval", type=float, default=300.0, help="Seconds between --watch passes")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.start:
+            result = backfill(
+                db,
+                args.start,
+                args.end or date.today(),
+                chunk_days=args.chunk_days,
+                institution_id=args.institution_id
+            )
+            print(f"Backfill: {result.days} institution-day(s) in {result.seconds:.2f}s")
+            return
+
+        while True:
+            result = rollup_incremental(db, lag_seconds=args.lag_seconds)
+            if result.skipped:
+                print("Another rollup is running; skipped")
+            else:
+                print(f"Rollup: {result.days} institution-day(s) in {result.seconds:.2f}s "
+                      f"(high-water mark {result.high_water_mark})")
+            if not args.watch:
+                return
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+CPU threading autotuner for LSP inference
+
+Benchmarks the real Keras model on synthetic (N, 30, 126) batches across
+uvicorn worker counts, TensorFlow intra/inter-op threads, BLAS threads and
+batch sizes, then recommends the fastest configuration whose p99 latency fits
+the budget. The recommendation is written as an env file that Settings loads
+(ml_tuning.env by default), so LSPModel applies it at load time.
+
+Usage:
+    python scripts/tune_inference.py
+    python scripts/tune_inference.py --workers 1,2,4 --intra 1,2,4 --inter 1,2 \
+        --blas 1 --batch 1,4,8,16 --duration 5 --p99-budget-ms 250
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import platform
+import socket
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_MODEL_PATH = os.path.join("app", "ml", "models", "lsp_model.h5")
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _bench_process(model_path, intra, inter, blas, batch_sizes, duration, seed, barrier, results):
+    """
+    Child process: one simulated uvicorn worker.
+    Threading must be configured before TensorFlow/NumPy start their pools, so
+    every configuration runs in fresh processes.
+    """
+    for var in BLAS_ENV_VARS:
+        os.environ[var] = str(blas)
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import numpy as np
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra)
+    tf.config.threading.set_inter_op_parallelism_threads(inter)
+    model = tf.keras.models.load_model(model_path)
+    _, seq_len, feat_dim = model.input_shape
+    rng = np.random.default_rng(seed)
+
+    out = {}
+    for batch_size in batch_sizes:
+        batch = rng.random((batch_size, seq_len, feat_dim), dtype=np.float32)
+        model.predict(batch, verbose=0)  # warm-up (graph tracing)
+
+        # All workers measure the same batch size at the same time
+        barrier.wait()
+        latencies = []
+        started = time.perf_counter()
+        while time.perf_counter() - started < duration:
+            t0 = time.perf_counter()
+            model.predict(batch, verbose=0)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - started
+        out[batch_size] = {"latencies_ms": latencies, "elapsed": elapsed}
+
+    results.put(out)
+
+
+def run_configuration(model_path, workers, intra, inter, blas, batch_sizes, duration):
+    """Run one (workers, intra, inter, blas) configuration; return per-batch-size results"""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=_bench_process,
+            args=(model_path, intra, inter, blas, batch_sizes, duration, seed, barrier, results),
+        )
+        for seed in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    per_worker = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    summary = {}
+    for batch_size in batch_sizes:
+        latencies = sorted(l for w in per_worker for l in w[batch_size]["latencies_ms"])
+        calls = len(latencies)
+        elapsed = max(w[batch_size]["elapsed"] for w in per_worker)
+        summary[batch_size] = {
+            "calls": calls,
+            "throughput_seq_per_s": round(calls * batch_size / elapsed, 2),
+            "p50_ms": round(_percentile(latencies, 0.50), 3),
+            "p99_ms": round(_percentile(latencies, 0.99), 3),
+        }
+    return summary
+
+
+def write_env_file(path, values, header):
+    """Update (or create) an env file, replacing existing keys in place"""
+    lines = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    remaining = dict(values)
+    updated = []
+    for line in lines:
+        key = line.split("=", 1)[0].strip()
+        if key in remaining:
+            updated.append(f"{key}={remaining.pop(key)}")
+        else:
+            updated.append(line)
+
+    if remaining:
+        updated.append(header)
+        updated.extend(f"{k}={v}" for k, v in remaining.items())
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(updated) + "\n")
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark and tune CPU threading for LSP inference")
+    parser.add_argument("--model", default=os.getenv("ML_MODEL_PATH", DEFAULT_MODEL_PATH))
+    parser.add_argument("--workers", type=_int_list, default=sorted({1, 2, max(1, cpus // 4), max(1, cpus // 2)}))
+    parser.add_argument("--intra", type=_int_list, default=sorted({1, 2, 4, max(1, cpus // 2)}))
+    parser.add_argument("--inter", type=_int_list, default=[1, 2])
+    parser.add_argument("--blas", type=_int_list, default=[1])
+    parser.add_argument("--batch", type=_int_list, default=[1, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per batch size measurement")
+    parser.add_argument("--p99-budget-ms", type=float, default=250.0)
+    parser.add_argument("--output", default="ml_tuning.env", help="Env file to write the recommendation to")
+    parser.add_argument("--report", default=None, help="Optional JSON file with every measurement")
+    parser.add_argument("--dry-run", action="store_true", help="Print the recommendation without writing it")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"Model not found at {args.model}")
+        sys.exit(1)
+
+    configs = [
+        (w, intra, inter, blas)
+        for w, intra, inter, blas in itertools.product(args.workers, args.intra, args.inter, args.blas)
+        if w * (intra + inter) <= cpus * 2  # skip configurations that are oversubscribed by design
+    ]
+    print(f"Host: {socket.gethostname()} ({cpus} CPUs, {platform.processor() or platform.machine()})")
+    print(f"Testing {len(configs)} configurations x batch sizes {args.batch}\n")
+
+    measurements = []
+    for workers, intra, inter, blas in configs:
+        summary = run_configuration(args.model, workers, intra, inter, blas, args.batch, args.duration)
+        for batch_size, m in summary.items():
+            row = {"workers": workers, "intra": intra, "inter": inter, "blas": blas, "batch": batch_size, **m}
+            measurements.append(row)
+            print(
+                f"workers={workers:<2} intra={intra:<2} inter={inter:<2} blas={blas:<2} batch={batch_size:<3} "
+                f"-> {m['throughput_seq_per_s']:>9.1f} seq/s  p50={m['p50_ms']:>8.2f}ms  p99={m['p99_ms']:>8.2f}ms"
+            )
+
+    eligible = [m for m in measurements if m["p99_ms"] <= args.p99_budget_ms]
+    if not eligible:
+        print(f"\nNo configuration met p99 <= {args.p99_budget_ms}ms; picking the lowest p99 instead")
+        best = min(measurements, key=lambda m: m["p99_ms"])
+    else:
+        best = max(eligible, key=lambda m: m["throughput_seq_per_s"])
+
+    recommendation = {
+        "WEB_CONCURRENCY": best["workers"],
+        "ML_TF_INTRA_OP_THREADS": best["intra"],
+        "ML_TF_INTER_OP_THREADS": best["inter"],
+        "ML_BLAS_THREADS": best["blas"],
+        "ML_BATCH_MAX_SIZE": best["batch"],
+    }
+
+    print("\nRecommended configuration:")
+    for key, value in recommendation.items():
+        print(f"  {key}={value}")
+    print(f"  ({best['throughput_seq_per_s']} seq/s, p99 {best['p99_ms']}ms)")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"cpus": cpus, "measurements": measurements, "recommendation": recommendation}, f, indent=2)
+
+    if not args.dry_run:
+        header = (
+            f"# Generated by scripts/tune_inference.py on {socket.gethostname()} "
+            f"({cpus} CPUs) at {datetime.now().isoformat(timespec='seconds')}"
+        )
+        write_env_file(args.output, recommendation, header)
+        print(f"\nWritten to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
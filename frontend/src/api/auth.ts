@@ -46,7 +46,7 @@ export const refreshToken = async (refresh_token: string) => {
 
 export const logout = async () => {
   try {
-    await client.post('/auth/logout');
+    await client.post('/auth/logout', { refresh_token: localStorage.getItem('refresh_token') });
   } catch (error: any) {
     console.error('Logout error:', error.response?.data || error.message);
   }
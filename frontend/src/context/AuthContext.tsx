@@ -1,6 +1,6 @@
 import React, { createContext, useState, useEffect, ReactNode } from 'react';
 import { User } from '../types';
-import { login as apiLogin, getMe } from '../api/auth';
+import { login as apiLogin, logout as apiLogout, getMe } from '../api/auth';
 
 interface AuthContextType {
   user: User | null;
@@ -70,8 +70,11 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
   };
 
   const logout = () => {
-    localStorage.removeItem('access_token');
-    localStorage.removeItem('refresh_token');
+    // Revoke server-side first; the request still needs both tokens
+    apiLogout().finally(() => {
+      localStorage.removeItem('access_token');
+      localStorage.removeItem('refresh_token');
+    });
     setUser(null);
   };
 